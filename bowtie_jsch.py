@@ -1,25 +1,432 @@
 #!/usr/bin/env python3
 from classes import *
-from dataclasses import dataclass
-from importlib import metadata
+from codegen import load_validator
+from iterative import validate_iteratively
+from dataclasses import dataclass, field
+from optimizer import optimize_schema
+from snapshot import SNAPSHOT_PATH, load_snapshot
 import io
 import json
+import os
+import queue
 import sys
+import threading
+import time
 import traceback
 
+SCHEMA_CACHE_SIZE = 1024
+"""Maximum number of case validators kept by the runner."""
+
+WORKERS = int(os.environ.get("JSCH_WORKERS", "0"))
+"""Number of worker processes used to run cases. 0 runs every case in the runner's own process."""
+
+TIMINGS = os.environ.get("JSCH_TIMINGS", "") not in ("", "0")
+"""Whether compile, resolve and validation times are recorded for every case."""
+
+OPTIMIZE = os.environ.get("JSCH_OPTIMIZE", "") not in ("", "0")
+"""Whether schemas are simplified by the optimizer before they're built."""
+
+TIMINGS_FILE = os.environ.get("JSCH_TIMINGS_FILE") or None
+"""JSONL file where case timings are written. If it's not set, timings are added to the run responses."""
+
+ANY_OF_ORDERS_FILE = os.environ.get("JSCH_ANY_OF_ORDERS_FILE") or None
+"""JSON file with the anyOf branch orders learned by earlier runs, which the compiled case schemas start with. The
+orders learned by a runner without workers are written back to it when it stops."""
+
+_any_of_orders = None
+"""Orders read from `ANY_OF_ORDERS_FILE`, once they're needed."""
+
+ENGINE = os.environ.get("JSCH_ENGINE") or "compiled"
+"""Engine that validates the tests of every case: "compiled" uses `Schema.compile_is_valid`, "codegen" the python
+modules generated by codegen.py and "iterative" `validate_iteratively`, which has no nesting depth limit."""
+
+_worker_schemas = LRUCache(SCHEMA_CACHE_SIZE)
+"""Validator cache of a worker process."""
+
+READ_CHUNK_SIZE = 1 << 16
+"""Maximum number of bytes read from stdin at once."""
+
+FLUSH_SIZE = 1 << 16
+"""Number of buffered response characters that forces a flush."""
+
+FLUSH_DELAY = 0.05
+"""Seconds after which buffered responses are flushed even if more input is ready."""
+
+
+def read_lines(stdin, on_idle=None):
+    """
+    Reads stdin in large chunks and yields its non empty lines.
+    :param stdin: text stream. Its binary buffer is read directly when there is one.
+    :param on_idle: function called every time all the input read so far was consumed, right before waiting for more.
+    :return: generator of lines.
+    """
+
+    source = getattr(stdin, "buffer", stdin)
+    read = getattr(source, "read1", source.read)
+    rest = None
+    while True:
+        if on_idle is not None:
+            on_idle()
+        chunk = read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        lines = chunk.split(b"\n" if isinstance(chunk, bytes) else "\n")
+        if rest:
+            lines[0] = rest + lines[0]
+        rest = lines.pop()
+        for line in lines:
+            if line:
+                yield line
+    if rest:
+        yield rest
+
+
+class ResponseWriter:
+    """
+    Buffers responses and writes them to a stream in batches.
+    """
+
+    def __init__(self, stream, flush_size=FLUSH_SIZE, flush_delay=FLUSH_DELAY):
+        """
+        :param stream: text stream responses are written to.
+        :param flush_size: number of buffered characters that forces a flush.
+        :param flush_delay: seconds after the last flush that force a flush on the next write.
+        """
+
+        self.stream = stream
+        self.flush_size = flush_size
+        self.flush_delay = flush_delay
+        self.buffered = []
+        self.size = 0
+        self.last_flush = time.monotonic()
+
+    def write(self, response):
+        """
+        Buffers a response, flushing if the size or time threshold was reached.
+        :param response: json serializable response.
+        """
+
+        line = f"{json.dumps(response)}\n"
+        self.buffered.append(line)
+        self.size += len(line)
+        if self.size >= self.flush_size or time.monotonic() - self.last_flush >= self.flush_delay:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes every buffered response and flushes the stream.
+        """
+
+        if self.buffered:
+            self.stream.write("".join(self.buffered))
+            self.stream.flush()
+            self.buffered.clear()
+            self.size = 0
+        self.last_flush = time.monotonic()
+
+
+def build_validator(schema):
+    """
+    Builds the function that checks documents against a case schema with the engine set by `ENGINE`, optimizing the
+    schema first if `OPTIMIZE` is set.
+    :param schema: Dict representing a json schema.
+    :return: tuple with the Schema object the function validates against (None if it doesn't use one) and the
+    function, which receives a document and returns a bool.
+    """
+
+    if OPTIMIZE:
+        schema = optimize_schema(schema)[0]
+    if ENGINE == "codegen":
+        validate = load_validator(schema)
+        return None, lambda document: validate(document).is_valid
+    if ENGINE == "iterative":
+        built = get_schema(schema)
+        return built, lambda document: validate_iteratively(built, document).is_valid
+    if ENGINE != "compiled":
+        raise ValueError(f"Unknown engine {ENGINE!r}.")
+    built = get_schema(schema)
+    if ANY_OF_ORDERS_FILE is not None:
+        load_any_of_orders(built, read_any_of_orders(), freeze=False)
+    return built, built.compile_is_valid()
+
+
+def read_any_of_orders():
+    """
+    Reads the anyOf branch orders of `ANY_OF_ORDERS_FILE` the first time they're needed.
+    :return: dict returned by `export_any_of_orders`. It's empty if the file doesn't exist or can't be read.
+    """
+
+    global _any_of_orders
+    if _any_of_orders is None:
+        try:
+            with open(ANY_OF_ORDERS_FILE, encoding="utf-8") as orders_file:
+                _any_of_orders = json.load(orders_file)
+        except (OSError, ValueError):
+            _any_of_orders = {}
+        if not isinstance(_any_of_orders, dict):
+            _any_of_orders = {}
+    return _any_of_orders
+
+
+def write_any_of_orders(schemas, path):
+    """
+    Writes the anyOf branch orders learned by some schemas to a file, together with the orders it already had for
+    other schemas.
+    :param schemas: iterable of Schema objects.
+    :param path: path of the JSON file.
+    """
+
+    orders = dict(read_any_of_orders())
+    for schema in schemas:
+        orders.update(export_any_of_orders(schema))
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as orders_file:
+        json.dump(orders, orders_file)
+    os.replace(temporary_path, path)
+
+
+def run_case(case, seq, schemas, timings=False):
+    """
+    Validates every test of a bowtie case.
+    :param case: bowtie case dict.
+    :param seq: sequence number of the case.
+    :param schemas: LRUCache of the validators built by `build_validator`.
+    :param timings: if True the response has a `timings` dict with the time (monotonic ns) spent compiling the
+    schema, loading the documents of its remote references and validating each test.
+    :return: bowtie run response dict.
+    """
+
+    schema = case["schema"]
+    if timings:
+        misses = schemas.misses
+        resolved_ns = RESOLUTION_STOPWATCH.elapsed_ns
+        start = time.monotonic_ns()
+    is_valid = schemas.get_or_build(schema_hash(schema), lambda: build_validator(schema))[1]
+    if timings:
+        # Remote documents may be loaded while compiling or while validating a test. Their loading time is only
+        # counted in `resolve_ns`, and taken out of the window it happened in.
+        resolve_ns = RESOLUTION_STOPWATCH.elapsed_ns - resolved_ns
+        compile_ns = time.monotonic_ns() - start - resolve_ns
+        validate_ns = []
+    results = []
+    for test in case["tests"]:
+        if timings:
+            resolved_ns = RESOLUTION_STOPWATCH.elapsed_ns
+            start = time.monotonic_ns()
+        valid = is_valid(test["instance"])
+        if timings:
+            test_resolve_ns = RESOLUTION_STOPWATCH.elapsed_ns - resolved_ns
+            validate_ns.append(time.monotonic_ns() - start - test_resolve_ns)
+            resolve_ns += test_resolve_ns
+        results.append({"valid": valid})
+
+    if timings:
+        return dict(seq=seq, results=results, timings=dict(cached=schemas.misses == misses, compile_ns=compile_ns,
+                                                           resolve_ns=resolve_ns, validate_ns=validate_ns))
+    return dict(seq=seq, results=results)
+
+
+def run_case_safely(case, seq, schemas, timings=False):
+    """
+    Runs a bowtie case. Errors are reported as an errored response instead of being raised.
+    :param case: bowtie case dict.
+    :param seq: sequence number of the case.
+    :param schemas: LRUCache of the validators built by `build_validator`.
+    :param timings: whether the response includes the case timings.
+    :return: bowtie run response dict.
+    """
+
+    try:
+        return run_case(case, seq, schemas, timings)
+    except Exception:
+        return errored_response(seq)
+
+
+def run_case_in_worker(case, seq, timings=False):
+    """
+    Runs a bowtie case inside a worker process, with the worker's schema cache.
+    :param case: bowtie case dict.
+    :param seq: sequence number of the case.
+    :param timings: whether the response includes the case timings.
+    :return: bowtie run response dict.
+    """
+
+    return run_case_safely(case, seq, _worker_schemas, timings)
+
+
+def register_snapshot(path=SNAPSHOT_PATH):
+    """
+    Registers the loaders of the metaschemas snapshot. Workers run it when they start, since they import this script
+    under another name and never run its main block.
+    :param path: path of the snapshot file.
+    """
+
+    register_remote_loaders(load_snapshot(path))
+
+
+def worker_pool(workers, snapshot_path=SNAPSHOT_PATH):
+    """
+    Starts the pool of processes that validate cases.
+    :param workers: number of worker processes.
+    :param snapshot_path: path of the metaschemas snapshot every worker registers.
+    :return: ProcessPoolExecutor object.
+    """
+
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing
+
+    return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("forkserver"),
+                               initializer=register_snapshot, initargs=(snapshot_path,))
+
+
+def errored_response(seq):
+    """
+    Builds the response of a case that raised the exception being handled.
+    :param seq: sequence number of the case.
+    :return: bowtie errored response dict.
+    """
+
+    return dict(seq=seq, errored=True, context=dict(traceback=traceback.format_exc()))
+
+
 @dataclass
 class Runner:
     _started: bool = False
     _stdout: io.TextIOWrapper = sys.stdout
+    _schemas: LRUCache = field(default_factory=lambda: LRUCache(SCHEMA_CACHE_SIZE))
+    _workers: int = 0
+    _timings: bool = False
+    _timings_file: str = None
+    _timings_summary: dict = None
+    _pool: "ProcessPoolExecutor" = None
+    _pending: queue.Queue = None
+    _writer: threading.Thread = None
 
 
     def run(self, stdin=sys.stdin):
-        for line in stdin:
-            each = json.loads(line)
-            cmd = each.pop("cmd")
-            response = getattr(self, f"cmd_{cmd}")(**each)
-            self._stdout.write(f"{json.dumps(response)}\n")
-            self._stdout.flush()
+        if self._workers > 0:
+            self.run_pipelined(stdin)
+            return
+        writer = ResponseWriter(self._stdout)
+        try:
+            for line in read_lines(stdin, on_idle=writer.flush):
+                each = json.loads(line)
+                cmd = each.pop("cmd")
+                writer.write(self.record_timings(getattr(self, f"cmd_{cmd}")(**each)))
+        finally:
+            writer.flush()
+
+
+    def run_pipelined(self, stdin=sys.stdin):
+        """
+        Reads commands while previous cases are still being validated by the worker pool. Responses are written by
+        a separate thread in the same order their commands were received, each one as soon as it and every
+        response before it are done.
+        """
+
+        from concurrent.futures import Future
+
+        with worker_pool(self._workers) as self._pool:
+            self._pending = queue.Queue()
+            self._writer = threading.Thread(target=self.write_responses, daemon=True)
+            self._writer.start()
+            for line in read_lines(stdin):
+                each = json.loads(line)
+                cmd = each.pop("cmd")
+                if cmd == "stop":
+                    self.finish_pending_responses()
+                response = getattr(self, f"cmd_{cmd}")(**each)
+                if not isinstance(response, Future):
+                    done = Future()
+                    done.set_result(response)
+                    response = done
+                self._pending.put((each.get("seq"), response))
+            self.finish_pending_responses()
+
+
+    def write_responses(self):
+        """
+        Writes the responses of the pending queue in order, waiting for each one to be completed. Responses are
+        flushed before waiting, either for the next pending response or for the current one to be completed. A
+        response that can't be retrieved (for instance because the pool broke) is written as an errored response.
+        """
+
+        writer = ResponseWriter(self._stdout)
+        while True:
+            if self._pending.empty():
+                writer.flush()
+            pending = self._pending.get()
+            if pending is None:
+                writer.flush()
+                return
+            seq, response = pending
+            if not response.done():
+                writer.flush()
+            try:
+                result = response.result()
+            except Exception:
+                result = errored_response(seq)
+            writer.write(self.record_timings(result))
+
+
+    def finish_pending_responses(self):
+        """
+        Waits until every pending response has been written.
+        """
+
+        if self._writer is not None:
+            self._pending.put(None)
+            self._writer.join()
+            self._writer = None
+
+
+    def record_timings(self, response):
+        """
+        Adds the timings of a run response to the summary. If there's a timings file the timings are moved from the
+        response to that file.
+        :param response: bowtie response dict.
+        :return: the response to write.
+        """
+
+        timings = response.get("timings")
+        if timings is None:
+            return response
+        if self._timings_summary is None:
+            self._timings_summary = dict(cases=0, cached=0, tests=0, compile_ns=0, resolve_ns=0, validate_ns=0,
+                                         slowest_seq=None, slowest_ns=0)
+        summary = self._timings_summary
+        validate_ns = sum(timings["validate_ns"])
+        total_ns = timings["compile_ns"] + timings["resolve_ns"] + validate_ns
+        summary["cases"] += 1
+        summary["cached"] += timings["cached"]
+        summary["tests"] += len(timings["validate_ns"])
+        summary["compile_ns"] += timings["compile_ns"]
+        summary["resolve_ns"] += timings["resolve_ns"]
+        summary["validate_ns"] += validate_ns
+        if total_ns > summary["slowest_ns"]:
+            summary["slowest_seq"] = response["seq"]
+            summary["slowest_ns"] = total_ns
+        if self._timings_file is not None:
+            del response["timings"]
+            with open(self._timings_file, "a", encoding="utf-8") as timings_file:
+                timings_file.write(f"{json.dumps(dict(seq=response['seq'], **timings))}\n")
+        return response
+
+
+    def dump_timings_summary(self):
+        """
+        Writes the timings summary to the timings file, or to stderr if there's none.
+        """
+
+        summary = dict(self._timings_summary or {})
+        if self._pool is None:
+            summary["schema_cache"] = self._schemas.stats()
+        line = f"{json.dumps(dict(summary=summary))}\n"
+        if self._timings_file is not None:
+            with open(self._timings_file, "a", encoding="utf-8") as timings_file:
+                timings_file.write(line)
+        else:
+            sys.stderr.write(line)
 
 
     def cmd_start(self, version):
@@ -54,18 +461,23 @@ class Runner:
 
     def cmd_run(self, case, seq):
         assert self._started, "Not started!"
-        schema = case["schema"]
-        schemas_schema = get_schema(schema)
-        results = []
-        for test in case["tests"]:
-            result = schemas_schema.validate(test["instance"])
-            results.append({"valid": result.is_valid})
-
-        return dict(seq=seq, results=results)
+        if self._pool is not None:
+            try:
+                return self._pool.submit(run_case_in_worker, case, seq, self._timings)
+            except Exception:
+                return errored_response(seq)
+        return run_case_safely(case, seq, self._schemas, self._timings)
 
     def cmd_stop(self):
         assert self._started, "Not started!"
+        if self._timings:
+            self.dump_timings_summary()
+        if ANY_OF_ORDERS_FILE is not None and self._pool is None:
+            write_any_of_orders((schema for schema, _ in self._schemas.entries.values() if schema is not None),
+                                ANY_OF_ORDERS_FILE)
         sys.exit(0)
 
 
-Runner().run()
+if __name__ == "__main__":
+    register_snapshot()
+    Runner(_workers=WORKERS, _timings=TIMINGS, _timings_file=TIMINGS_FILE).run()
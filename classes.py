@@ -1,6 +1,5 @@
 from utils import *
 import json
-from urllib.request import urlopen
 
 
 OBJECT_KEYWORDS = ["properties", "required", "additionalProperties", "minProperties", "maxProperties", "dependencies",
@@ -16,15 +15,49 @@ STRING_KEYWORDS = ["minLength", "maxLength", "pattern", "format"]
 NUMBER_KEYWORDS = ["multipleOf", "minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum"]
 """Number schema keywords."""
 
+INTERNED = "interned"
+"""First element of the `definitions` keys of interned child schemas, followed by their structural key. Those keys are
+tuples, so they never collide with references, which are strings."""
+
+CHILD_KEYS = ("child keys",)
+"""Key of `definitions` that holds the memo of `structural_key` shared by every child schema of the whole schema."""
+
+NO_FINGERPRINTS = frozenset()
+"""Enum fingerprints of schemas without an enum keyword. Every empty frozenset is a new object, so they share this one."""
+
+ANY_OF_WARM_UP = 1000
+"""Number of documents valid against an anyOf that are counted before its branches are first reordered."""
+
+ANY_OF_REORDER_PERIOD = 10000
+"""Number of documents valid against an anyOf that are counted between later reorderings of its branches."""
+
+KEY_MEMO_SIZE = 1024
+"""Maximum number of document keys whose classification is remembered by each object schema with patternProperties."""
+
+REMOTE_SCHEMAS = {}
+"""Schema objects of remote documents that are already built, by url (without an empty fragment)."""
+
+REMOTE_SCHEMA_LOADERS = {}
+"""Functions without arguments that load an already built Schema object of a remote document, by url (without an empty
+fragment). A loader is only called the first time its url is looked up, and returns None if its schema can't be
+loaded."""
+
 
 class Schema:
     """
     Base class for all schemas.
     """
 
+    __slots__ = ("dict_schema", "whole_schema", "definitions", "path", "type", "enum", "enum_fingerprints", "const",
+                 "const_fingerprint", "anyOf", "allOf", "oneOf", "notThis", "compiled", "compiled_is_valid",
+                 "any_of_order", "value_digests")
+
     COUNT = 0
     RESPONSE = 1
 
+    TYPE_NAME = None
+    """Schema type every document valid against this class of schema has, or None if it can be any."""
+
     def __init__(self, json_schema, whole_schema, definitions, path):
         """
         :param json_schema: schema as a python dict object.
@@ -44,17 +77,40 @@ class Schema:
         self.definitions = definitions
         self.path = path
         self.type = ""
-        self.enum = []
-        self.anyOf = []
-        self.allOf = []
-        self.oneOf = []
+        self.enum = ()
+        self.enum_fingerprints = NO_FINGERPRINTS
+        """Set with the `typed_fingerprint` of each enum value."""
+
+        self.const = None
+        self.const_fingerprint = None
+        """`typed_fingerprint` of the const value, or None if this schema has no const keyword."""
+
+        self.anyOf = ()
+        self.allOf = ()
+        self.oneOf = ()
         self.notThis = None
+        self.compiled = None
+        """Function returned by `compile_tagged()` once this schema has been compiled."""
+
+        self.compiled_is_valid = None
+        """Function returned by `compile_is_valid_tagged()` once this schema has been compiled."""
+
+        self.any_of_order = None
+        """BranchOrder of the anyOf branches, created when they're compiled."""
+
+        self.value_digests = None
+        """Tuple returned by `enum_and_const_digests`, once it's needed."""
+
         if not self.path_is_empty():
             self.definitions[self.path] = self
         if has_key(json_schema, "type"):
             self.type = json_schema['type']
         if has_key(json_schema, "enum"):
-            self.enum = json_schema['enum']
+            self.enum = tuple(json_schema['enum'])
+            self.enum_fingerprints = frozenset(typed_fingerprint(value) for value in self.enum)
+        if has_key(json_schema, "const"):
+            self.const = json_schema["const"]
+            self.const_fingerprint = typed_fingerprint(self.const)
         if has_key(json_schema, "anyOf"):
             self.__build_any_of(json_schema["anyOf"])
         if has_key(json_schema, "allOf"):
@@ -73,25 +129,41 @@ class Schema:
         return self.path == ""
 
     def __build_all_of(self, all_of):
-        for json_schema in all_of:
-            self.allOf.append(self.build_child_schema(json_schema))
+        self.allOf = tuple(self.build_child_schema(json_schema) for json_schema in all_of)
 
     def build_child_schema(self, child_schema, path=""):
-        if has_key(child_schema, "$ref"):
+        if child_schema is True or child_schema == {}:
+            return TRUE_SCHEMA
+        elif has_key(child_schema, "$ref"):
             return self.__build_child_schema_from_reference(child_schema)
+        elif path == "":
+            return self.__build_interned_child_schema(child_schema)
         else:
             return self.__build_child_schema_normally(child_schema, path=path)
 
+    def __build_interned_child_schema(self, child_schema):
+        """
+        Builds a child schema that isn't the target of a reference. Identical child schemas of the same whole schema
+        share the Schema object built for the first one, since validating against them is the same (references are
+        resolved against the whole schema and failure pointers are relative to each schema). The structural keys of
+        every sub schema are computed once, the first time one of their parents is interned.
+        :param child_schema: dict representing a schema.
+        :return: Schema object.
+        """
+
+        keys = self.definitions.get(CHILD_KEYS)
+        if keys is None:
+            keys = self.definitions[CHILD_KEYS] = {}
+        key = (INTERNED, structural_key(child_schema, keys))
+        if key not in self.definitions:
+            self.definitions[key] = self.__build_child_schema_normally(child_schema)
+        return self.definitions[key]
+
     def __build_child_schema_from_reference(self, child_schema):
         reference = child_schema["$ref"]
-        if has_key(self.definitions, reference):
-            return self.definitions[reference]
-        elif JSONPointer.is_json_pointer(reference):
-            return self.build_child_schema(JSONPointer(self.whole_schema, reference).get_json(), path=reference)
-        elif is_valid_url(reference):
-            return get_schema_from_url(reference)
-        else:
-            return get_schema_from_file(reference)
+        if not has_key(self.definitions, reference):
+            self.definitions[reference] = ReferenceSchema(reference, self.whole_schema, self.definitions)
+        return self.definitions[reference]
 
     def __build_child_schema_normally(self, child_schema, path=""):
         schema_type = infer_type(child_schema)
@@ -109,48 +181,56 @@ class Schema:
             return BooleanSchema(child_schema, self.whole_schema, self.definitions, path)
         elif schema_type == "null":
             return NullSchema(child_schema, self.whole_schema, self.definitions, path)
+        elif is_type_list(schema_type):
+            return MultiTypeSchema(child_schema, self.whole_schema, self.definitions, path)
         else:
             return Schema(child_schema, self.whole_schema, self.definitions, path)
 
     def __build_any_of(self, any_of):
-        for json_schema in any_of:
-            self.anyOf.append(self.build_child_schema(json_schema))
+        self.anyOf = tuple(self.build_child_schema(json_schema) for json_schema in any_of)
 
     def __build_one_of(self, one_of):
-        for json_schema in one_of:
-            self.oneOf.append(self.build_child_schema(json_schema))
+        self.oneOf = tuple(self.build_child_schema(json_schema) for json_schema in one_of)
 
     def __build_not(self, not_this):
         self.notThis = self.build_child_schema(not_this)
 
-    def validate(self, document):
+    def validate(self, document, tag=None):
         """
         Validates a document against this schema.
         :param document: document to validate.
+        :param tag: type tag of the document, if it's already known.
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
+        if tag is None:
+            tag = type_tag(document)
+
         if self.has_any_of():
-            validate_any_of = self.validate_any_of(document)
+            validate_any_of = self.validate_any_of(document, tag)
             if not validate_any_of.is_valid:
                 return validate_any_of
         if self.has_one_of():
-            validate_one_of = self.validate_one_of(document)
+            validate_one_of = self.validate_one_of(document, tag)
             if not validate_one_of.is_valid:
                 return validate_one_of
         if self.has_all_of():
-            validate_all_of = self.validate_all_of(document)
+            validate_all_of = self.validate_all_of(document, tag)
             if not validate_all_of.is_valid:
                 return validate_all_of
         if self.has_not():
-            validate_not = self.validate_not(document)
+            validate_not = self.validate_not(document, tag)
             if not validate_not.is_valid:
                 return validate_not
         if self.has_enum():
             validate_enum = self.validate_enum(document)
             if not validate_enum.is_valid:
                 return validate_enum
-        return Response(True, None, None)
+        if self.has_const():
+            validate_const = self.validate_const(document)
+            if not validate_const.is_valid:
+                return validate_const
+        return VALID
 
     def has_any_of(self):
         """
@@ -160,14 +240,15 @@ class Schema:
 
         return len(self.anyOf) > 0
 
-    def validate_any_of(self, document):
+    def validate_any_of(self, document, tag=None):
         """
         Validates a document against the anyOf keyword of this schema.
         :param document: Dictionary.
+        :param tag: type tag of the document, if it's already known.
         :return: Response object.
         """
 
-        count_and_validate = count_and_validate_schema_array(self.anyOf, document)
+        count_and_validate = count_and_validate_schema_array(self.anyOf, document, limit=1, tag=tag)
         count = count_and_validate[Schema.COUNT]
         response = count_and_validate[Schema.RESPONSE]
         if count >= 1:
@@ -199,14 +280,15 @@ class Schema:
 
         return len(self.oneOf) > 0
 
-    def validate_one_of(self, document):
+    def validate_one_of(self, document, tag=None):
         """
         Validates a document against the oneOf keyword of this schema.
         :param document: Dictionary.
+        :param tag: type tag of the document, if it's already known.
         :return: Response object.
         """
 
-        count_and_validate = count_and_validate_schema_array(self.oneOf, document)
+        count_and_validate = count_and_validate_schema_array(self.oneOf, document, limit=2, tag=tag)
         count = count_and_validate[Schema.COUNT]
         response = count_and_validate[Schema.RESPONSE]
         if count == 1:
@@ -215,8 +297,7 @@ class Schema:
             response.add_upward_document_and_schema_nodes([], self.build_nodes(["oneOf"]))
             return response
         else:
-            return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema,
-                                                                          self.build_nodes(["oneOf"])))
+            return Response.invalid(document, [], self.whole_schema, self.build_nodes(["oneOf"]))
 
     def has_all_of(self):
         """
@@ -226,14 +307,15 @@ class Schema:
 
         return len(self.allOf) > 0
 
-    def validate_all_of(self, document):
+    def validate_all_of(self, document, tag=None):
         """
         Validates a document against the allOf keyword of this schema.
         :param document: Dictionary.
+        :param tag: type tag of the document, if it's already known.
         :return: Response object.
         """
 
-        count_and_validate = count_and_validate_schema_array(self.allOf, document)
+        count_and_validate = count_and_validate_schema_array(self.allOf, document, tag=tag)
         response = count_and_validate[Schema.RESPONSE]
         if response.is_valid:
             return response
@@ -249,21 +331,21 @@ class Schema:
 
         return self.notThis is not None
 
-    def validate_not(self, document):
+    def validate_not(self, document, tag=None):
         """
         Validates a document against the not keyword of this schema.
         :param document: Dictionary.
+        :param tag: type tag of the document, if it's already known.
         :return: Response object.
         """
 
         if self.notThis is not None:
-            validate_not = self.notThis.validate(document)
+            validate_not = self.notThis.validate(document, tag)
             if not validate_not.is_valid:
-                return Response(True, None, None)
+                return VALID
             else:
-                return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema,
-                                                                              self.build_nodes(["not"])))
-        return Response(True, None, None)
+                return Response.invalid(document, [], self.whole_schema, self.build_nodes(["not"]))
+        return VALID
 
     def has_enum(self):
         """
@@ -280,11 +362,347 @@ class Schema:
         :return: Response object.
         """
 
-        for json_document in self.enum:
-            if document == json_document and (type(json_document) == type(document)):
-                return Response(True, None, None)
-        return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema,
-                                                                      self.build_nodes(["enum"])))
+        if self.enum_contains(document):
+            return VALID
+        return Response.invalid(document, [], self.whole_schema, self.build_nodes(["enum"]))
+
+    def enum_contains(self, document):
+        """
+        Checks if a document is one of the values of this schema's enum keyword.
+        :param document: document to check.
+        :return: bool.
+        """
+
+        return typed_fingerprint(document) in self.enum_fingerprints
+
+    def has_const(self):
+        """
+        Checks if this schema has a const keyword.
+        :return: bool.
+        """
+
+        return self.const_fingerprint is not None
+
+    def validate_const(self, document):
+        """
+        Validates a document against the const keyword of this schema.
+        :param document: Dictionary.
+        :return: Response object.
+        """
+
+        if self.const_equals(document):
+            return VALID
+        return Response.invalid(document, [], self.whole_schema, self.build_nodes(["const"]))
+
+    def const_equals(self, document):
+        """
+        Checks if a document is the value of this schema's const keyword.
+        :param document: document to check.
+        :return: bool.
+        """
+
+        return typed_fingerprint(document) == self.const_fingerprint
+
+    def enum_and_const_digests(self):
+        """
+        Fingerprints of the enum and const values to compare containers that are fingerprinted by their digest with,
+        as the streaming validator does.
+        :return: tuple with a set with the `typed_digest` of each enum value and the `typed_digest` of the const value
+        (None if this schema has no const keyword).
+        """
+
+        if self.value_digests is None:
+            self.value_digests = (frozenset(typed_digest(value) for value in self.enum),
+                                  typed_digest(self.const) if self.has_const() else None)
+        return self.value_digests
+
+    def __getstate__(self):
+        state = {}
+        for cls in type(self).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                if hasattr(self, name):
+                    state[name] = getattr(self, name)
+        state["compiled"] = None
+        state["compiled_is_valid"] = None
+        state["any_of_order"] = None
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def __reduce_ex__(self, protocol):
+        # `TRUE_SCHEMA` is pickled by name, so it's unpickled (and copied) as the singleton itself, which is what the
+        # identity checks against it expect.
+        if self is TRUE_SCHEMA:
+            return "TRUE_SCHEMA"
+        return super().__reduce_ex__(protocol)
+
+    def accepts_everything(self):
+        """
+        Checks if every document is valid against this schema, which is the case of an empty schema.
+        :return: bool.
+        """
+
+        return type(self) is Schema and not (self.has_any_of() or self.has_one_of() or self.has_all_of() or
+                                             self.has_not() or self.has_enum() or self.has_const())
+
+    def compile(self):
+        """
+        Compiles this schema into a function that validates a document exactly as `validate` does, but that only runs
+        the checks of the keywords this schema actually has.
+        :return: function that receives a document and returns a Response object.
+        """
+
+        validator = self.compile_tagged()
+        return lambda document: validator(document, type_tag(document))
+
+    def compile_tagged(self):
+        """
+        Same as `compile`, but the compiled function also receives the type tag of the document, which it passes to
+        every check. Compiled schemas call each other through these functions, so the tag of a document is found
+        once even if several schemas validate it.
+        :return: function that receives a document and its type tag and returns a Response object.
+        """
+
+        if self.compiled is None:
+            # Schemas that reference this one while it's being compiled get a function that calls the final one.
+            self.compiled = lambda document, tag: validator(document, tag)
+            validator = chain_checks(self.compile_checks())
+            self.compiled = validator
+        return self.compiled
+
+    def compile_checks(self):
+        """
+        Builds a function for each keyword of this schema, in the same order `validate` checks them.
+        :return: list of functions that receive a document and its type tag and return a Response object.
+        """
+
+        checks = []
+        if self.has_any_of():
+            checks.append(self.compile_any_of())
+        if self.has_one_of():
+            checks.append(self.compile_one_of())
+        if self.has_all_of():
+            checks.append(self.compile_all_of())
+        if self.has_not():
+            checks.append(self.compile_not())
+        if self.has_enum():
+            checks.append(ignoring_tag(self.validate_enum))
+        if self.has_const():
+            checks.append(ignoring_tag(self.validate_const))
+        return checks
+
+    def compile_any_of(self):
+        """
+        Compiles the anyOf keyword of this schema.
+        :return: function that receives a document and its type tag and returns a Response object.
+        """
+
+        validators = [schema.compile_tagged() for schema in self.anyOf]
+        index = build_branch_index(self.anyOf)
+        order = self.any_of_branch_order()
+
+        def validate_any_of(document, tag):
+            response = run_any_of_validators(validators, document, tag, index, order)
+            if not response.is_valid:
+                response.add_upward_document_and_schema_nodes([], self.build_nodes(["anyOf"]))
+            return response
+
+        return validate_any_of
+
+    def compile_one_of(self):
+        """
+        Compiles the oneOf keyword of this schema.
+        :return: function that receives a document and its type tag and returns a Response object.
+        """
+
+        validators = [schema.compile_tagged() for schema in self.oneOf]
+        index = build_branch_index(self.oneOf)
+
+        def validate_one_of(document, tag):
+            count, response = count_and_run_validators(validators, document, tag, limit=2, index=index)
+            if count == 1:
+                return response.set_true()
+            elif count < 1:
+                response.add_upward_document_and_schema_nodes([], self.build_nodes(["oneOf"]))
+                return response
+            return Response.invalid(document, [], self.whole_schema, self.build_nodes(["oneOf"]))
+
+        return validate_one_of
+
+    def compile_all_of(self):
+        """
+        Compiles the allOf keyword of this schema.
+        :return: function that receives a document and its type tag and returns a Response object.
+        """
+
+        validators = [schema.compile_tagged() for schema in self.allOf]
+
+        def validate_all_of(document, tag):
+            response = count_and_run_validators(validators, document, tag)[Schema.RESPONSE]
+            if not response.is_valid:
+                response.add_upward_document_and_schema_nodes([], self.build_nodes(["allOf"]))
+            return response
+
+        return validate_all_of
+
+    def compile_not(self):
+        """
+        Compiles the not keyword of this schema.
+        :return: function that receives a document and its type tag and returns a Response object.
+        """
+
+        validator = self.notThis.compile_tagged()
+
+        def validate_not(document, tag):
+            if not validator(document, tag).is_valid:
+                return VALID
+            return Response.invalid(document, [], self.whole_schema, self.build_nodes(["not"]))
+
+        return validate_not
+
+    def resolve(self):
+        """
+        :return: the schema that validates documents for this one, which is itself unless it's a reference.
+        """
+
+        return self
+
+    def branch_conditions(self):
+        """
+        Cheap conditions every document valid against this schema meets, used to index anyOf and oneOf branches.
+        :return: dict with the schema `type` a document must have (None if any), the keys it must have if it's an object
+        (`required`) and the `values` some of its keys may have, by key.
+        """
+
+        return dict(type=self.TYPE_NAME, required=[], values={})
+
+    def is_valid(self, document):
+        """
+        Checks if a document is valid against this schema. It gives the same answer as `validate`, but it never builds
+        Response objects or pointers, so it's the faster choice when the failure location is not needed.
+        :param document: document to check.
+        :return: bool.
+        """
+
+        return self.compile_is_valid_tagged()(document, type_tag(document))
+
+    def validate_bytes(self, data):
+        """
+        Parses and validates a UTF-8 document in a single pass, stopping at the first violation found, so the rest of
+        an invalid document is never parsed.
+        :param data: bytes-like object (for instance bytes or a memoryview) with the document.
+        :return: Response object with pointers to the document and corresponding schema that failed (if it fails). When
+        the document has more than one violation it points to the first one found, which may not be the one `validate`
+        points to.
+        """
+
+        # The streaming parser is built on top of this module, so it's only imported once it's needed.
+        from streaming import validate_bytes
+
+        return validate_bytes(self, data)
+
+    def compile_is_valid(self):
+        """
+        Compiles this schema into a function that checks a document exactly as `validate` does, but that only returns
+        whether it's valid.
+        :return: function that receives a document and returns a bool.
+        """
+
+        predicate = self.compile_is_valid_tagged()
+        return lambda document: predicate(document, type_tag(document))
+
+    def compile_is_valid_tagged(self):
+        """
+        Same as `compile_is_valid`, but the compiled predicate also receives the type tag of the document.
+        :return: function that receives a document and its type tag and returns a bool.
+        """
+
+        if self.compiled_is_valid is None:
+            # Schemas that reference this one while it's being compiled get a function that calls the final one.
+            self.compiled_is_valid = lambda document, tag: predicate(document, tag)
+            predicate = chain_predicates(self.compile_predicates())
+            self.compiled_is_valid = predicate
+        return self.compiled_is_valid
+
+    def compile_predicates(self):
+        """
+        Builds a predicate for each keyword of this schema, in the same order `validate` checks them.
+        :return: list of functions that receive a document and its type tag and return a bool.
+        """
+
+        predicates = []
+        if self.has_any_of():
+            predicates.append(self.compile_any_of_predicate())
+        if self.has_one_of():
+            predicates.append(self.compile_one_of_predicate())
+        if self.has_all_of():
+            predicates.append(chain_predicates([schema.compile_is_valid_tagged() for schema in self.allOf]))
+        if self.has_not():
+            predicates.append(self.compile_not_predicate())
+        if self.has_enum():
+            predicates.append(ignoring_tag(self.enum_contains))
+        if self.has_const():
+            predicates.append(ignoring_tag(self.const_equals))
+        return predicates
+
+    def compile_any_of_predicate(self):
+        """
+        Compiles the anyOf keyword of this schema into a predicate.
+        :return: function that receives a document and its type tag and returns a bool.
+        """
+
+        predicates = tuple(schema.compile_is_valid_tagged() for schema in self.anyOf)
+        index = build_branch_index(self.anyOf)
+        order = self.any_of_branch_order()
+
+        def any_of(document, tag):
+            for i in order.order if index is None else order.arrange(index.candidates(document, tag)):
+                if predicates[i](document, tag):
+                    order.record(i)
+                    return True
+            return False
+
+        return any_of
+
+    def any_of_branch_order(self):
+        """
+        :return: BranchOrder shared by the compiled functions of this schema's anyOf.
+        """
+
+        if self.any_of_order is None:
+            self.any_of_order = BranchOrder(len(self.anyOf), ANY_OF_WARM_UP, ANY_OF_REORDER_PERIOD)
+        return self.any_of_order
+
+    def compile_one_of_predicate(self):
+        """
+        Compiles the oneOf keyword of this schema into a predicate.
+        :return: function that receives a document and its type tag and returns a bool.
+        """
+
+        predicates = tuple(schema.compile_is_valid_tagged() for schema in self.oneOf)
+        candidates = branch_candidates(self.oneOf)
+
+        def one_of(document, tag):
+            count = 0
+            for i in candidates(document, tag):
+                if predicates[i](document, tag):
+                    count += 1
+                    if count > 1:
+                        return False
+            return count == 1
+
+        return one_of
+
+    def compile_not_predicate(self):
+        """
+        Compiles the not keyword of this schema into a predicate.
+        :return: function that receives a document and its type tag and returns a bool.
+        """
+
+        predicate = self.notThis.compile_is_valid_tagged()
+        return lambda document, tag: not predicate(document, tag)
 
 
 class ObjectSchema(Schema):
@@ -292,6 +710,11 @@ class ObjectSchema(Schema):
     Object schema's class.
     """
 
+    __slots__ = ("required", "properties", "minProperties", "maxProperties", "property_dependencies",
+                 "schema_dependencies", "patternProperties", "additionalProperties", "key_classifier")
+
+    TYPE_NAME = "object"
+
     def __init__(self, json_schema, whole_schema, definitions, path):
         """
         :param json_schema: schema as a python dict object.
@@ -303,7 +726,7 @@ class ObjectSchema(Schema):
         """
 
         super().__init__(json_schema, whole_schema, definitions, path)
-        self.required = []
+        self.required = ()
         """List object that contains the keys that must be present in a json document that validates against this
         schema"""
 
@@ -328,7 +751,7 @@ class ObjectSchema(Schema):
         """Dict where each key corresponds to a pattern and each key hold a schema that every json object's key
         that correspond to that pattern must be valid against."""
 
-        self.additionalProperties = Schema({}, self.whole_schema, self.definitions, "")
+        self.additionalProperties = TRUE_SCHEMA
         """If it's a schema, every property that's not inside `self.properties` must be valid against it. If it's a
         boolean, if it's False, a json document can not have any additional property."""
 
@@ -341,11 +764,14 @@ class ObjectSchema(Schema):
         if has_key(json_schema, "properties"):
             self.__build_properties(json_schema["properties"])
         if has_key(json_schema, "required"):
-            self.required = json_schema["required"]
+            self.required = tuple(json_schema["required"])
         if has_key(json_schema, "dependencies"):
             self.__build_dependencies(json_schema["dependencies"])
         if has_key(json_schema, "patternProperties"):
             self.__build_pattern_properties(json_schema["patternProperties"])
+        self.key_classifier = KeyClassifier(list(self.properties) + list(self.required), self.patternProperties,
+                                            KEY_MEMO_SIZE)
+        """Tells which pattern each key of a document matches and whether it's an additional property."""
 
     def __build_additional_properties(self, additional_properties):
         if isinstance(additional_properties, bool):
@@ -368,17 +794,21 @@ class ObjectSchema(Schema):
         for key, child_schema in patter_properties.items():
             self.patternProperties[key] = self.build_child_schema(child_schema)
 
-    def validate(self, document):
+    def validate(self, document, tag=None):
         """
         Validates a document against this schema.
         :param document: document to validate.
+        :param tag: type tag of the document, if it's already known.
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
-        super_validate = super().validate(document)
+        if tag is None:
+            tag = type_tag(document)
+
+        super_validate = super().validate(document, tag)
         if not super_validate.is_valid:
             return super_validate
-        validate_type = self.validate_type(document)
+        validate_type = self.validate_type(document, tag)
         if not validate_type.is_valid:
             return validate_type
         validate_required_properties = self.validate_required_properties(document)
@@ -402,19 +832,31 @@ class ObjectSchema(Schema):
         validate_pattern_properties = self.validate_pattern_properties(document)
         if not validate_pattern_properties:
             return validate_pattern_properties
-        return Response(True, None, None)
+        return VALID
 
-    def validate_type(self, document):
+    def validate_type(self, document, tag=None):
         """
         Validates a document this schema's type keyword.
         :param document: document to validate.
+        :param tag: type tag of the document, if it's already known.
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
-        if not isinstance(document, dict):
-            return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema,
-                                                                          self.build_nodes(["type"])))
-        return Response(True, None, None)
+        if not self.is_valid_type(document, tag):
+            return Response.invalid(document, [], self.whole_schema, self.build_nodes(["type"]))
+        return VALID
+
+    def is_valid_type(self, document, tag=None):
+        """
+        Checks if a document satisfies this schema's type keyword.
+        :param document: document to check.
+        :param tag: type tag of the document, if it's already known.
+        :return: bool.
+        """
+
+        if tag is None:
+            tag = type_tag(document)
+        return tag == "object"
 
     def validate_properties(self, document):
         """
@@ -425,12 +867,13 @@ class ObjectSchema(Schema):
 
         for key, schema in self.properties.items():
             if has_key(document, key):
-                validate_property = schema.validate(document[key])
+                value = document[key]
+                validate_property = schema.validate(value, TYPE_TAGS.get(type(value)) or type_tag(value))
                 if not validate_property.is_valid:
                     validate_property.set_document(document)
                     validate_property.add_upward_document_and_schema_nodes([key], self.build_nodes(["properties", key]))
                     return validate_property
-        return Response(True, None, None)
+        return VALID
 
     def validate_required_properties(self, document):
         """
@@ -441,9 +884,8 @@ class ObjectSchema(Schema):
 
         for key in self.required:
             if not has_key(document, key):
-                return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema,
-                                                                              self.build_nodes(["required", key])))
-        return Response(True, None, None)
+                return Response.invalid(document, [], self.whole_schema, self.build_nodes(["required", key]))
+        return VALID
 
     def validate_min_properties(self, document):
         """
@@ -453,9 +895,8 @@ class ObjectSchema(Schema):
         """
 
         if self.minProperties is not None and len(document.keys()) < self.minProperties:
-            return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema,
-                                                                          self.build_nodes(["minProperties"])))
-        return Response(True, None, None)
+            return Response.invalid(document, [], self.whole_schema, self.build_nodes(["minProperties"]))
+        return VALID
 
     def validate_max_properties(self, document):
         """
@@ -465,9 +906,8 @@ class ObjectSchema(Schema):
         """
 
         if self.maxProperties is not None and len(document.keys()) > self.maxProperties:
-            return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema,
-                                                                          self.build_nodes(["maxProperties"])))
-        return Response(True, None, None)
+            return Response.invalid(document, [], self.whole_schema, self.build_nodes(["maxProperties"]))
+        return VALID
 
     def validate_dependencies(self, document):
         """
@@ -482,7 +922,7 @@ class ObjectSchema(Schema):
         validate_schema_dependencies = self.validate_schema_dependencies(document)
         if not validate_schema_dependencies.is_valid:
             return validate_schema_dependencies
-        return Response(True, None, None)
+        return VALID
 
     def validate_property_dependencies(self, document):
         """
@@ -493,10 +933,8 @@ class ObjectSchema(Schema):
 
         for key, list_of_dependencies in self.property_dependencies.items():
             if has_key(document, key) and not has_all_keys(document, list_of_dependencies):
-                return Response(False, JSONPointer(document, [key]), JSONPointer(self.whole_schema,
-                                                                                 self.build_nodes(["dependencies",
-                                                                                                   key])))
-        return Response(True, None, None)
+                return Response.invalid(document, [key], self.whole_schema, self.build_nodes(["dependencies", key]))
+        return VALID
 
     def validate_schema_dependencies(self, document):
         """
@@ -507,13 +945,14 @@ class ObjectSchema(Schema):
 
         for key, schema in self.schema_dependencies.items():
             if has_key(document, key):
-                validate_dependency = schema.validate(document[key])
+                value = document[key]
+                validate_dependency = schema.validate(value, TYPE_TAGS.get(type(value)) or type_tag(value))
                 if not validate_dependency.is_valid:
                     validate_dependency.set_document(document)
                     validate_dependency.add_upward_document_and_schema_nodes([key], self.build_nodes(["dependencies",
                                                                                                       key]))
                     return validate_dependency
-        return Response(True, None, None)
+        return VALID
 
     def validate_additional_properties(self, document):
         """
@@ -526,22 +965,24 @@ class ObjectSchema(Schema):
             validate_additional_properties_bool = self.__validate_additional_properties_bool(document)
             if not validate_additional_properties_bool.is_valid:
                 return validate_additional_properties_bool
-            return Response(True, None, None)
+            return VALID
         else:
             validate_additional_properties_schema = self.__validate_additional_property_schema(document)
             if not validate_additional_properties_schema:
                 return validate_additional_properties_schema
-            return Response(True, None, None)
+            return VALID
 
     def validate_pattern_properties(self, document):
         for key in document:
-            if self.key_is_pattern_property(key):
-                validate = self.patternProperties[self.get_key_pattern(key)].validate(document[key])
+            pattern = self.key_classifier.classify(key)[0]
+            if pattern is not None:
+                value = document[key]
+                validate = self.patternProperties[pattern].validate(value,
+                                                                    TYPE_TAGS.get(type(value)) or type_tag(value))
                 if not validate:
-                    validate.add_upward_document_and_schema_nodes([key], ["patternProperties",
-                                                                          self.get_key_pattern(key)])
+                    validate.add_upward_document_and_schema_nodes([key], ["patternProperties", pattern])
                     return validate
-        return Response(True, None, None)
+        return VALID
 
     def __validate_additional_properties_bool(self, document):
         """
@@ -553,10 +994,9 @@ class ObjectSchema(Schema):
         if not self.additionalProperties:
             for key in document:
                 if self.key_is_additional_property(key):
-                    return Response(False, JSONPointer(document, [key]), JSONPointer(self.whole_schema,
-                                                                                     self.build_nodes(
-                                                                                         ["additionalProperties"])))
-        return Response(True, None, None)
+                    return Response.invalid(document, [key], self.whole_schema,
+                                            self.build_nodes(["additionalProperties"]))
+        return VALID
 
     def key_is_additional_property(self, key):
         """
@@ -564,10 +1004,7 @@ class ObjectSchema(Schema):
         :param key:
         :return: bool.
         """
-        if (key not in self.properties) and (key not in self.required) and \
-                not self.key_is_pattern_property(key):
-            return True
-        return False
+        return self.key_classifier.classify(key)[1]
 
     def key_is_pattern_property(self, key):
         """
@@ -576,10 +1013,7 @@ class ObjectSchema(Schema):
         :return: bool.
         """
 
-        for patternKey in self.patternProperties:
-            if check_pattern(patternKey, key):
-                return True
-        return False
+        return self.key_classifier.classify(key)[0] is not None
 
     def get_key_pattern(self, key):
         """
@@ -588,10 +1022,10 @@ class ObjectSchema(Schema):
         :return: bool.
         """
 
-        for patternKey in self.patternProperties:
-            if check_pattern(patternKey, key):
-                return patternKey
-        return False
+        pattern = self.key_classifier.classify(key)[0]
+        if pattern is None:
+            return False
+        return pattern
 
     def __validate_additional_property_schema(self, document):
         """
@@ -602,14 +1036,265 @@ class ObjectSchema(Schema):
 
         for key in document:
             if self.key_is_additional_property(key):
-                validate_additional_key = self.additionalProperties.validate(document[key])
+                value = document[key]
+                validate_additional_key = self.additionalProperties.validate(value, TYPE_TAGS.get(type(value)) or
+                                                                             type_tag(value))
                 if not validate_additional_key:
                     validate_additional_key.set_document(document)
                     validate_additional_key.add_upward_document_and_schema_nodes([key],
                                                                                  self.build_nodes(
                                                                                      ["additionalProperties", key]))
                     return validate_additional_key
-        return Response(True, None, None)
+        return VALID
+
+    def compile_checks(self):
+        """
+        Builds a function for each keyword of this schema, in the same order `validate` checks them.
+        :return: list of functions that receive a document and its type tag and return a Response object.
+        """
+
+        checks = super().compile_checks()
+        checks.append(self.validate_type)
+        if self.required:
+            checks.append(ignoring_tag(self.validate_required_properties))
+        if self.properties:
+            checks.append(self.compile_properties())
+        if self.minProperties is not None:
+            checks.append(ignoring_tag(self.validate_min_properties))
+        if self.maxProperties is not None:
+            checks.append(ignoring_tag(self.validate_max_properties))
+        if self.property_dependencies:
+            checks.append(ignoring_tag(self.validate_property_dependencies))
+        if self.schema_dependencies:
+            checks.append(self.compile_schema_dependencies())
+        if isinstance(self.additionalProperties, bool):
+            if not self.additionalProperties:
+                checks.append(ignoring_tag(self.__validate_additional_properties_bool))
+        elif not self.additionalProperties.accepts_everything():
+            checks.append(self.compile_additional_properties())
+        if self.patternProperties:
+            checks.append(self.compile_pattern_properties())
+        return checks
+
+    def compile_properties(self):
+        """
+        Compiles the properties keyword of this schema.
+        :return: function that receives a document and its type tag and returns a Response object.
+        """
+
+        validators = [(key, schema.compile_tagged()) for key, schema in self.properties.items()]
+
+        def validate_properties(document, tag):
+            for key, validator in validators:
+                if key in document:
+                    value = document[key]
+                    validate_property = validator(value, TYPE_TAGS.get(type(value)) or type_tag(value))
+                    if not validate_property.is_valid:
+                        validate_property.set_document(document)
+                        validate_property.add_upward_document_and_schema_nodes([key],
+                                                                               self.build_nodes(["properties", key]))
+                        return validate_property
+            return VALID
+
+        return validate_properties
+
+    def compile_schema_dependencies(self):
+        """
+        Compiles the schema dependencies of this schema.
+        :return: function that receives a document and its type tag and returns a Response object.
+        """
+
+        validators = [(key, schema.compile_tagged()) for key, schema in self.schema_dependencies.items()]
+
+        def validate_schema_dependencies(document, tag):
+            for key, validator in validators:
+                if key in document:
+                    value = document[key]
+                    validate_dependency = validator(value, TYPE_TAGS.get(type(value)) or type_tag(value))
+                    if not validate_dependency.is_valid:
+                        validate_dependency.set_document(document)
+                        validate_dependency.add_upward_document_and_schema_nodes([key],
+                                                                                 self.build_nodes(["dependencies",
+                                                                                                   key]))
+                        return validate_dependency
+            return VALID
+
+        return validate_schema_dependencies
+
+    def compile_additional_properties(self):
+        """
+        Compiles the additionalProperties keyword of this schema when it's a schema.
+        :return: function that receives a document and its type tag and returns a Response object.
+        """
+
+        validator = self.additionalProperties.compile_tagged()
+
+        def validate_additional_properties(document, tag):
+            for key, value in document.items():
+                if self.key_is_additional_property(key):
+                    validate_additional_key = validator(value, TYPE_TAGS.get(type(value)) or type_tag(value))
+                    if not validate_additional_key.is_valid:
+                        validate_additional_key.set_document(document)
+                        validate_additional_key.add_upward_document_and_schema_nodes(
+                            [key], self.build_nodes(["additionalProperties", key]))
+                        return validate_additional_key
+            return VALID
+
+        return validate_additional_properties
+
+    def compile_pattern_properties(self):
+        """
+        Compiles the patternProperties keyword of this schema.
+        :return: function that receives a document and its type tag and returns a Response object.
+        """
+
+        validators = {pattern: schema.compile_tagged() for pattern, schema in self.patternProperties.items()}
+
+        def validate_pattern_properties(document, tag):
+            for key, value in document.items():
+                pattern = self.key_classifier.classify(key)[0]
+                if pattern is not None:
+                    validate = validators[pattern](value, TYPE_TAGS.get(type(value)) or type_tag(value))
+                    if not validate.is_valid:
+                        validate.add_upward_document_and_schema_nodes([key], ["patternProperties", pattern])
+                        return validate
+            return VALID
+
+        return validate_pattern_properties
+
+    def compile_predicates(self):
+        """
+        Builds a predicate for each keyword of this schema, in the same order `validate` checks them.
+        :return: list of functions that receive a document and its type tag and return a bool.
+        """
+
+        predicates = super().compile_predicates()
+        predicates.append(self.is_valid_type)
+        if self.required:
+            predicates.append(self.compile_required_predicate())
+        if self.properties:
+            predicates.append(self.compile_keys_predicate(self.properties))
+        if self.minProperties is not None:
+            predicates.append(lambda document, tag: len(document) >= self.minProperties)
+        if self.maxProperties is not None:
+            predicates.append(lambda document, tag: len(document) <= self.maxProperties)
+        if self.property_dependencies:
+            dependencies = tuple(self.property_dependencies.items())
+            predicates.append(lambda document, tag: all(key not in document or
+                                                        has_all_keys(document, list_of_dependencies)
+                                                        for key, list_of_dependencies in dependencies))
+        if self.schema_dependencies:
+            predicates.append(self.compile_keys_predicate(self.schema_dependencies))
+        if isinstance(self.additionalProperties, bool):
+            if not self.additionalProperties:
+                predicates.append(self.compile_no_additional_properties_predicate())
+        elif not self.additionalProperties.accepts_everything():
+            predicates.append(self.compile_additional_properties_predicate())
+        if self.patternProperties:
+            predicates.append(self.compile_pattern_properties_predicate())
+        return predicates
+
+    def branch_conditions(self):
+        """
+        Cheap conditions every document valid against this schema meets, used to index anyOf and oneOf branches.
+        Besides the type, they have the required keys and the values allowed by the const or enum of each property.
+        :return: dict with the `type`, `required` and `values` conditions.
+        """
+
+        conditions = super().branch_conditions()
+        conditions["required"] = list(self.required)
+        for key, schema in self.properties.items():
+            schema = schema.resolve()
+            if schema.has_const():
+                conditions["values"][key] = [schema.const]
+            elif schema.has_enum():
+                conditions["values"][key] = list(schema.enum)
+        return conditions
+
+    def compile_required_predicate(self):
+        """
+        Compiles the required keyword of this schema into a predicate.
+        :return: function that receives a document and its type tag and returns a bool.
+        """
+
+        required = tuple(self.required)
+
+        def required_properties(document, tag):
+            for key in required:
+                if key not in document:
+                    return False
+            return True
+
+        return required_properties
+
+    def compile_no_additional_properties_predicate(self):
+        """
+        Compiles the additionalProperties keyword of this schema into a predicate, when it's False.
+        :return: function that receives a document and its type tag and returns a bool.
+        """
+
+        def no_additional_properties(document, tag):
+            for key in document:
+                if self.key_is_additional_property(key):
+                    return False
+            return True
+
+        return no_additional_properties
+
+    def compile_keys_predicate(self, schemas):
+        """
+        Compiles a keyword that holds a schema for some keys, like properties or the schema dependencies, into a
+        predicate.
+        :param schemas: dict where each key holds the schema its value must be valid against.
+        :return: function that receives a document and its type tag and returns a bool.
+        """
+
+        predicates = tuple((key, schema.compile_is_valid_tagged()) for key, schema in schemas.items())
+
+        def keys_are_valid(document, tag):
+            for key, predicate in predicates:
+                if key in document:
+                    value = document[key]
+                    if not predicate(value, TYPE_TAGS.get(type(value)) or type_tag(value)):
+                        return False
+            return True
+
+        return keys_are_valid
+
+    def compile_additional_properties_predicate(self):
+        """
+        Compiles the additionalProperties keyword of this schema into a predicate, when it's a schema.
+        :return: function that receives a document and its type tag and returns a bool.
+        """
+
+        predicate = self.additionalProperties.compile_is_valid_tagged()
+
+        def additional_properties(document, tag):
+            for key, value in document.items():
+                if self.key_is_additional_property(key) and \
+                        not predicate(value, TYPE_TAGS.get(type(value)) or type_tag(value)):
+                    return False
+            return True
+
+        return additional_properties
+
+    def compile_pattern_properties_predicate(self):
+        """
+        Compiles the patternProperties keyword of this schema into a predicate.
+        :return: function that receives a document and its type tag and returns a bool.
+        """
+
+        predicates = {pattern: schema.compile_is_valid_tagged() for pattern, schema in self.patternProperties.items()}
+
+        def pattern_properties(document, tag):
+            for key, value in document.items():
+                pattern = self.key_classifier.classify(key)[0]
+                if pattern is not None and \
+                        not predicates[pattern](value, TYPE_TAGS.get(type(value)) or type_tag(value)):
+                    return False
+            return True
+
+        return pattern_properties
 
 
 class ArraySchema(Schema):
@@ -617,6 +1302,10 @@ class ArraySchema(Schema):
     Array schema class.
     """
 
+    __slots__ = ("items", "additionalItems", "maxItems", "minItems", "uniqueItems")
+
+    TYPE_NAME = "array"
+
     def __init__(self, json_schema, whole_schema, definitions, path):
         """
         :param json_schema: schema as a python dict object.
@@ -628,7 +1317,7 @@ class ArraySchema(Schema):
         """
 
         super().__init__(json_schema, whole_schema, definitions, path)
-        self.items = Schema({}, self.whole_schema, self.definitions, "")
+        self.items = TRUE_SCHEMA
         self.additionalItems = True
         self.maxItems = None
         self.minItems = None
@@ -652,17 +1341,21 @@ class ArraySchema(Schema):
             for schema in items:
                 self.items.append(self.build_child_schema(schema))
 
-    def validate(self, document):
+    def validate(self, document, tag=None):
         """
         Validates a document against this schema.
         :param document: document to validate.
+        :param tag: type tag of the document, if it's already known.
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
-        validate_super = super().validate(document)
+        if tag is None:
+            tag = type_tag(document)
+
+        validate_super = super().validate(document, tag)
         if not validate_super.is_valid:
             return validate_super
-        validate_type = self.validate_type(document)
+        validate_type = self.validate_type(document, tag)
         if not validate_type.is_valid:
             return validate_type
         validate_items = self.validate_items(document)
@@ -680,19 +1373,31 @@ class ArraySchema(Schema):
         validate_unique_items = self.validate_unique_items(document)
         if not validate_unique_items.is_valid:
             return validate_unique_items
-        return Response(True, None, None)
+        return VALID
 
-    def validate_type(self, document):
+    def validate_type(self, document, tag=None):
         """
         Validates a document against this schema's type keyword.
         :param document: document to validate.
+        :param tag: type tag of the document, if it's already known.
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
-        if not isinstance(document, list):
-            return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema,
-                                                                          self.build_nodes(["type"])))
-        return Response(True, None, None)
+        if not self.is_valid_type(document, tag):
+            return Response.invalid(document, [], self.whole_schema, self.build_nodes(["type"]))
+        return VALID
+
+    def is_valid_type(self, document, tag=None):
+        """
+        Checks if a document satisfies this schema's type keyword.
+        :param document: document to check.
+        :param tag: type tag of the document, if it's already known.
+        :return: bool.
+        """
+
+        if tag is None:
+            tag = type_tag(document)
+        return tag == "array"
 
     def validate_items(self, document):
         """
@@ -714,12 +1419,13 @@ class ArraySchema(Schema):
         """
 
         for i in range(0, get_size_of_smaller(document, self.items)):
-            validate_item = self.items[i].validate(document[i])
+            value = document[i]
+            validate_item = self.items[i].validate(value, TYPE_TAGS.get(type(value)) or type_tag(value))
             if not validate_item.is_valid:
                 validate_item.set_document(document)
                 validate_item.add_upward_document_and_schema_nodes([i], self.build_nodes(["items", i]))
                 return validate_item
-        return Response(True, None, None)
+        return VALID
 
     def __validate_items_schema(self, document):
         """
@@ -729,12 +1435,13 @@ class ArraySchema(Schema):
         """
 
         for i in range(0, len(document)):
-            validate_element = self.items.validate(document[i])
+            value = document[i]
+            validate_element = self.items.validate(value, TYPE_TAGS.get(type(value)) or type_tag(value))
             if not validate_element.is_valid:
                 validate_element.set_document(document)
                 validate_element.add_upward_document_and_schema_nodes([i], self.build_nodes(["items"]))
                 return validate_element
-        return Response(True, None, None)
+        return VALID
 
     def validate_additional_items(self, document):
         """
@@ -744,14 +1451,13 @@ class ArraySchema(Schema):
         """
 
         if self.additional_items_are_allowed():
-            return Response(True, None, None)
+            return VALID
         else:
             if self.count_additional_items(document) > 0:
-                return Response(False, JSONPointer(document, [len(self.items)]), JSONPointer(self.whole_schema,
-                                                                                             self.build_nodes(
-                                                                                                 ["additionalItems"])))
+                return Response.invalid(document, [len(self.items)], self.whole_schema,
+                                        self.build_nodes(["additionalItems"]))
             else:
-                return Response(True, None, None)
+                return VALID
 
     def additional_items_are_allowed(self):
         """
@@ -805,10 +1511,9 @@ class ArraySchema(Schema):
 
         if self.minItems is not None:
             if len(document) < self.minItems:
-                return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema,
-                                                                              self.build_nodes(["minItems"])))
-            return Response(True, None, None)
-        return Response(True, None, None)
+                return Response.invalid(document, [], self.whole_schema, self.build_nodes(["minItems"]))
+            return VALID
+        return VALID
 
     def validate_max_items(self, document):
         """
@@ -819,10 +1524,9 @@ class ArraySchema(Schema):
 
         if self.maxItems is not None:
             if len(document) > self.maxItems:
-                return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema,
-                                                                              self.build_nodes(["maxItems"])))
-            return Response(True, None, None)
-        return Response(True, None, None)
+                return Response.invalid(document, [], self.whole_schema, self.build_nodes(["maxItems"]))
+            return VALID
+        return VALID
 
     def validate_unique_items(self, document):
         """
@@ -834,56 +1538,210 @@ class ArraySchema(Schema):
         if self.uniqueItems:
             repeated_item = find_repeated_item(document)
             if repeated_item == NONE:
-                return Response(True, None, None)
-            return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema,
-                                                                          self.build_nodes(["uniqueItems",
-                                                                                            repeated_item])))
+                return VALID
+            return Response.invalid(document, [], self.whole_schema, self.build_nodes(["uniqueItems", repeated_item]))
         else:
-            return Response(True, None, None)
+            return VALID
 
+    def compile_checks(self):
+        """
+        Builds a function for each keyword of this schema, in the same order `validate` checks them.
+        :return: list of functions that receive a document and its type tag and return a Response object.
+        """
 
-class IntegerSchema(Schema):
-    """
-    Integer Schema class.
-    """
+        checks = super().compile_checks()
+        checks.append(self.validate_type)
+        if isinstance(self.items, list):
+            checks.append(self.compile_items_list())
+        elif not self.items.accepts_everything():
+            checks.append(self.compile_items_schema())
+        if not self.additional_items_are_allowed():
+            checks.append(ignoring_tag(self.validate_additional_items))
+        if self.minItems is not None:
+            checks.append(ignoring_tag(self.validate_min_items))
+        if self.maxItems is not None:
+            checks.append(ignoring_tag(self.validate_max_items))
+        if self.uniqueItems:
+            checks.append(ignoring_tag(self.validate_unique_items))
+        return checks
 
-    def __init__(self, json_schema, whole_schema, definitions, path):
+    def compile_items_list(self):
         """
-        :param json_schema: schema as a python dict object.
-        :param whole_schema: the whole first schema.
-        :param path: the path that was used to call this schema inside a $ref (can be an empty string if it was not
-        called from a $ref).
-        :param definitions: integer that indicates where inside `definitions` are this schema definitions.
-        :return: None.
+        Compiles the items keyword of this schema when it's a list.
+        :return: function that receives a document and its type tag and returns a Response object.
         """
 
-        super().__init__(json_schema, whole_schema, definitions, path)
+        validators = [schema.compile_tagged() for schema in self.items]
+
+        def validate_items(document, tag):
+            for i in range(0, get_size_of_smaller(document, validators)):
+                item = document[i]
+                validate_item = validators[i](item, TYPE_TAGS.get(type(item)) or type_tag(item))
+                if not validate_item.is_valid:
+                    validate_item.set_document(document)
+                    validate_item.add_upward_document_and_schema_nodes([i], self.build_nodes(["items", i]))
+                    return validate_item
+            return VALID
 
-    def validate(self, document):
+        return validate_items
+
+    def compile_items_schema(self):
         """
-        Validates a document against this schema.
-        :param document: document to validate.
-        :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
+        Compiles the items keyword of this schema when it's a schema.
+        :return: function that receives a document and its type tag and returns a Response object.
         """
 
-        super_validate = super().validate(document)
+        validator = self.items.compile_tagged()
+
+        def validate_items(document, tag):
+            for i, item in enumerate(document):
+                validate_element = validator(item, TYPE_TAGS.get(type(item)) or type_tag(item))
+                if not validate_element.is_valid:
+                    validate_element.set_document(document)
+                    validate_element.add_upward_document_and_schema_nodes([i], self.build_nodes(["items"]))
+                    return validate_element
+            return VALID
+
+        return validate_items
+
+    def compile_predicates(self):
+        """
+        Builds a predicate for each keyword of this schema, in the same order `validate` checks them.
+        :return: list of functions that receive a document and its type tag and return a bool.
+        """
+
+        predicates = super().compile_predicates()
+        predicates.append(self.is_valid_type)
+        if isinstance(self.items, list):
+            predicates.append(self.compile_items_list_predicate())
+        elif not self.items.accepts_everything():
+            predicates.append(self.compile_items_predicate())
+        if not self.additional_items_are_allowed():
+            predicates.append(lambda document, tag: len(document) <= len(self.items))
+        if self.minItems is not None:
+            predicates.append(lambda document, tag: len(document) >= self.minItems)
+        if self.maxItems is not None:
+            predicates.append(lambda document, tag: len(document) <= self.maxItems)
+        if self.uniqueItems:
+            predicates.append(lambda document, tag: not list_has_repetition(document))
+        return predicates
+
+    def compile_items_list_predicate(self):
+        """
+        Compiles the items keyword of this schema into a predicate, when it's a list.
+        :return: function that receives a document and its type tag and returns a bool.
+        """
+
+        predicates = tuple(schema.compile_is_valid_tagged() for schema in self.items)
+
+        def items_are_valid(document, tag):
+            for predicate, item in zip(predicates, document):
+                if not predicate(item, TYPE_TAGS.get(type(item)) or type_tag(item)):
+                    return False
+            return True
+
+        return items_are_valid
+
+    def compile_items_predicate(self):
+        """
+        Compiles the items keyword of this schema into a predicate, when it's a schema.
+        :return: function that receives a document and its type tag and returns a bool.
+        """
+
+        predicate = self.items.compile_is_valid_tagged()
+
+        def items_are_valid(document, tag):
+            for item in document:
+                if not predicate(item, TYPE_TAGS.get(type(item)) or type_tag(item)):
+                    return False
+            return True
+
+        return items_are_valid
+
+
+class IntegerSchema(Schema):
+    """
+    Integer Schema class.
+    """
+
+    __slots__ = ()
+
+    TYPE_NAME = "integer"
+
+    def __init__(self, json_schema, whole_schema, definitions, path):
+        """
+        :param json_schema: schema as a python dict object.
+        :param whole_schema: the whole first schema.
+        :param path: the path that was used to call this schema inside a $ref (can be an empty string if it was not
+        called from a $ref).
+        :param definitions: integer that indicates where inside `definitions` are this schema definitions.
+        :return: None.
+        """
+
+        super().__init__(json_schema, whole_schema, definitions, path)
+
+    def validate(self, document, tag=None):
+        """
+        Validates a document against this schema.
+        :param document: document to validate.
+        :param tag: type tag of the document, if it's already known.
+        :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
+        """
+
+        if tag is None:
+            tag = type_tag(document)
+
+        super_validate = super().validate(document, tag)
         if not super_validate.is_valid:
             return super_validate
-        validate_type = self.validate_type(document)
+        validate_type = self.validate_type(document, tag)
         if not validate_type.is_valid:
             return validate_type
-        return Response(True, None, None)
+        return VALID
 
-    def validate_type(self, document):
+    def validate_type(self, document, tag=None):
         """
         Validates a document against this schema's type keyword.
         :param document: document to validate.
+        :param tag: type tag of the document, if it's already known.
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
-        if isinstance(document, int):
-            return Response(True, None, None)
-        return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema, self.build_nodes(["type"])))
+        if self.is_valid_type(document, tag):
+            return VALID
+        return Response.invalid(document, [], self.whole_schema, self.build_nodes(["type"]))
+
+    def is_valid_type(self, document, tag=None):
+        """
+        Checks if a document satisfies this schema's type keyword.
+        :param document: document to check.
+        :param tag: type tag of the document, if it's already known.
+        :return: bool.
+        """
+
+        if tag is None:
+            tag = type_tag(document)
+        return tag == "integer"
+
+    def compile_checks(self):
+        """
+        Builds a function for each keyword of this schema, in the same order `validate` checks them.
+        :return: list of functions that receive a document and its type tag and return a Response object.
+        """
+
+        checks = super().compile_checks()
+        checks.append(self.validate_type)
+        return checks
+
+    def compile_predicates(self):
+        """
+        Builds a predicate for each keyword of this schema, in the same order `validate` checks them.
+        :return: list of functions that receive a document and its type tag and return a bool.
+        """
+
+        predicates = super().compile_predicates()
+        predicates.append(self.is_valid_type)
+        return predicates
 
 
 class NumberSchema(Schema):
@@ -891,6 +1749,10 @@ class NumberSchema(Schema):
     Number Schema class.
     """
 
+    __slots__ = ()
+
+    TYPE_NAME = "number"
+
     def __init__(self, json_schema, whole_schema, definitions, path):
         """
         :param json_schema: schema as a python dict object.
@@ -903,31 +1765,68 @@ class NumberSchema(Schema):
 
         super().__init__(json_schema, whole_schema, definitions, path)
 
-    def validate(self, document):
+    def validate(self, document, tag=None):
         """
         Validates a document against this schema.
         :param document: document to validate.
+        :param tag: type tag of the document, if it's already known.
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
-        super_validate = super().validate(document)
+        if tag is None:
+            tag = type_tag(document)
+
+        super_validate = super().validate(document, tag)
         if not super_validate.is_valid:
             return super_validate
-        validate_type = self.validate_type(document)
+        validate_type = self.validate_type(document, tag)
         if not validate_type.is_valid:
             return validate_type
-        return Response(True, None, None)
+        return VALID
 
-    def validate_type(self, document):
+    def validate_type(self, document, tag=None):
         """
         Validates a document against this schema's type keyword.
         :param document: document to validate.
+        :param tag: type tag of the document, if it's already known.
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
-        if isinstance(document, float):
-            return Response(True, None, None)
-        return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema, self.build_nodes(["type"])))
+        if self.is_valid_type(document, tag):
+            return VALID
+        return Response.invalid(document, [], self.whole_schema, self.build_nodes(["type"]))
+
+    def is_valid_type(self, document, tag=None):
+        """
+        Checks if a document satisfies this schema's type keyword.
+        :param document: document to check.
+        :param tag: type tag of the document, if it's already known.
+        :return: bool.
+        """
+
+        if tag is None:
+            tag = type_tag(document)
+        return tag == "integer" or tag == "number"
+
+    def compile_checks(self):
+        """
+        Builds a function for each keyword of this schema, in the same order `validate` checks them.
+        :return: list of functions that receive a document and its type tag and return a Response object.
+        """
+
+        checks = super().compile_checks()
+        checks.append(self.validate_type)
+        return checks
+
+    def compile_predicates(self):
+        """
+        Builds a predicate for each keyword of this schema, in the same order `validate` checks them.
+        :return: list of functions that receive a document and its type tag and return a bool.
+        """
+
+        predicates = super().compile_predicates()
+        predicates.append(self.is_valid_type)
+        return predicates
 
 
 class StringSchema(Schema):
@@ -935,6 +1834,10 @@ class StringSchema(Schema):
     String Schema class.
     """
 
+    __slots__ = ()
+
+    TYPE_NAME = "string"
+
     def __init__(self, json_schema, whole_schema, definitions, path):
         """
         :param json_schema: schema as a python dict object.
@@ -947,31 +1850,68 @@ class StringSchema(Schema):
 
         super().__init__(json_schema, whole_schema, definitions, path)
 
-    def validate(self, document):
+    def validate(self, document, tag=None):
         """
         Validates a document against this schema.
         :param document: document to validate.
+        :param tag: type tag of the document, if it's already known.
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
-        super_validate = super().validate(document)
+        if tag is None:
+            tag = type_tag(document)
+
+        super_validate = super().validate(document, tag)
         if not super_validate.is_valid:
             return super_validate
-        validate_type = self.validate_type(document)
+        validate_type = self.validate_type(document, tag)
         if not validate_type.is_valid:
             return validate_type
-        return Response(True, None, None)
+        return VALID
 
-    def validate_type(self, document):
+    def validate_type(self, document, tag=None):
         """
         Validates a document against this schema's type keyword.
         :param document: document to validate.
+        :param tag: type tag of the document, if it's already known.
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
-        if isinstance(document, str):
-            return Response(True, None, None)
-        return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema, self.build_nodes(["type"])))
+        if self.is_valid_type(document, tag):
+            return VALID
+        return Response.invalid(document, [], self.whole_schema, self.build_nodes(["type"]))
+
+    def is_valid_type(self, document, tag=None):
+        """
+        Checks if a document satisfies this schema's type keyword.
+        :param document: document to check.
+        :param tag: type tag of the document, if it's already known.
+        :return: bool.
+        """
+
+        if tag is None:
+            tag = type_tag(document)
+        return tag == "string"
+
+    def compile_checks(self):
+        """
+        Builds a function for each keyword of this schema, in the same order `validate` checks them.
+        :return: list of functions that receive a document and its type tag and return a Response object.
+        """
+
+        checks = super().compile_checks()
+        checks.append(self.validate_type)
+        return checks
+
+    def compile_predicates(self):
+        """
+        Builds a predicate for each keyword of this schema, in the same order `validate` checks them.
+        :return: list of functions that receive a document and its type tag and return a bool.
+        """
+
+        predicates = super().compile_predicates()
+        predicates.append(self.is_valid_type)
+        return predicates
 
 
 class BooleanSchema(Schema):
@@ -979,6 +1919,10 @@ class BooleanSchema(Schema):
     Boolean Schema class.
     """
 
+    __slots__ = ()
+
+    TYPE_NAME = "boolean"
+
     def __init__(self, json_schema, whole_schema, definitions, path):
         """
         :param json_schema: schema as a python dict object.
@@ -991,31 +1935,68 @@ class BooleanSchema(Schema):
 
         super().__init__(json_schema, whole_schema, definitions, path)
 
-    def validate(self, document):
+    def validate(self, document, tag=None):
         """
         Validates a document against this schema.
         :param document: document to validate.
+        :param tag: type tag of the document, if it's already known.
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
-        super_validate = super().validate(document)
+        if tag is None:
+            tag = type_tag(document)
+
+        super_validate = super().validate(document, tag)
         if not super_validate.is_valid:
             return super_validate
-        validate_type = self.validate_type(document)
+        validate_type = self.validate_type(document, tag)
         if not validate_type.is_valid:
             return validate_type
-        return Response(True, None, None)
+        return VALID
 
-    def validate_type(self, document):
+    def validate_type(self, document, tag=None):
         """
         Validates a document against this schema's type keyword.
         :param document: document to validate.
+        :param tag: type tag of the document, if it's already known.
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
-        if isinstance(document, bool):
-            return Response(True, None, None)
-        return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema, self.build_nodes(["type"])))
+        if self.is_valid_type(document, tag):
+            return VALID
+        return Response.invalid(document, [], self.whole_schema, self.build_nodes(["type"]))
+
+    def is_valid_type(self, document, tag=None):
+        """
+        Checks if a document satisfies this schema's type keyword.
+        :param document: document to check.
+        :param tag: type tag of the document, if it's already known.
+        :return: bool.
+        """
+
+        if tag is None:
+            tag = type_tag(document)
+        return tag == "boolean"
+
+    def compile_checks(self):
+        """
+        Builds a function for each keyword of this schema, in the same order `validate` checks them.
+        :return: list of functions that receive a document and its type tag and return a Response object.
+        """
+
+        checks = super().compile_checks()
+        checks.append(self.validate_type)
+        return checks
+
+    def compile_predicates(self):
+        """
+        Builds a predicate for each keyword of this schema, in the same order `validate` checks them.
+        :return: list of functions that receive a document and its type tag and return a bool.
+        """
+
+        predicates = super().compile_predicates()
+        predicates.append(self.is_valid_type)
+        return predicates
 
 
 class NullSchema(Schema):
@@ -1023,6 +2004,10 @@ class NullSchema(Schema):
     Null Schema class.
     """
 
+    __slots__ = ()
+
+    TYPE_NAME = "null"
+
     def __init__(self, json_schema, whole_schema, definitions, path):
         """
         :param json_schema: schema as a python dict object.
@@ -1035,31 +2020,239 @@ class NullSchema(Schema):
 
         super().__init__(json_schema, whole_schema, definitions, path)
 
-    def validate(self, document):
+    def validate(self, document, tag=None):
         """
         Validates a document against this schema.
         :param document: document to validate.
+        :param tag: type tag of the document, if it's already known.
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
-        super_validate = super().validate(document)
+        if tag is None:
+            tag = type_tag(document)
+
+        super_validate = super().validate(document, tag)
         if not super_validate.is_valid:
             return super_validate
-        validate_type = self.validate_type(document)
+        validate_type = self.validate_type(document, tag)
         if not validate_type.is_valid:
             return validate_type
-        return Response(True, None, None)
+        return VALID
 
-    def validate_type(self, document):
+    def validate_type(self, document, tag=None):
         """
         Validates a document against this schema's type keyword.
         :param document: document to validate.
+        :param tag: type tag of the document, if it's already known.
         :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
         """
 
-        if document is None:
-            return Response(True, None, None)
-        return Response(False, JSONPointer(document, []), JSONPointer(self.whole_schema, self.build_nodes(["type"])))
+        if self.is_valid_type(document, tag):
+            return VALID
+        return Response.invalid(document, [], self.whole_schema, self.build_nodes(["type"]))
+
+    def is_valid_type(self, document, tag=None):
+        """
+        Checks if a document satisfies this schema's type keyword.
+        :param document: document to check.
+        :param tag: type tag of the document, if it's already known.
+        :return: bool.
+        """
+
+        if tag is None:
+            tag = type_tag(document)
+        return tag == "null"
+
+    def compile_checks(self):
+        """
+        Builds a function for each keyword of this schema, in the same order `validate` checks them.
+        :return: list of functions that receive a document and its type tag and return a Response object.
+        """
+
+        checks = super().compile_checks()
+        checks.append(self.validate_type)
+        return checks
+
+    def compile_predicates(self):
+        """
+        Builds a predicate for each keyword of this schema, in the same order `validate` checks them.
+        :return: list of functions that receive a document and its type tag and return a bool.
+        """
+
+        predicates = super().compile_predicates()
+        predicates.append(self.is_valid_type)
+        return predicates
+
+
+class MultiTypeSchema(Schema):
+    """
+    Schema whose type keyword is a list of types. Documents are dispatched by their type tag to a schema built for
+    the single listed type they belong to, so validating one takes a single table lookup instead of trying every type.
+    """
+
+    __slots__ = ("type_schemas",)
+
+    BASE_KEYWORDS = ("anyOf", "allOf", "oneOf", "not", "enum", "const")
+    """Keywords validated once by this schema instead of by each type schema."""
+
+    def __init__(self, json_schema, whole_schema, definitions, path):
+        """
+        :param json_schema: schema as a python dict object.
+        :param whole_schema: the whole first schema.
+        :param path: the path that was used to call this schema inside a $ref (can be an empty string if it was not
+        called from a $ref).
+        :param definitions: integer that indicates where inside `definitions` are this schema definitions.
+        :return: None.
+        """
+
+        super().__init__(json_schema, whole_schema, definitions, path)
+        self.type_schemas = {}
+        """Schema of the first listed type that accepts each type tag, by type tag. Each one is built from this schema
+        without its base keywords and with that single type."""
+
+        typed_schema = {key: value for key, value in json_schema.items() if key not in self.BASE_KEYWORDS}
+        for type_name in self.type:
+            schema = self.build_child_schema(dict(typed_schema, type=type_name))
+            for accepted_tag in JSON_TYPES[type_name]:
+                self.type_schemas.setdefault(accepted_tag, schema)
+
+    def validate(self, document, tag=None):
+        """
+        Validates a document against this schema.
+        :param document: document to validate.
+        :param tag: type tag of the document, if it's already known.
+        :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
+        """
+
+        if tag is None:
+            tag = type_tag(document)
+
+        super_validate = super().validate(document, tag)
+        if not super_validate.is_valid:
+            return super_validate
+        schema = self.type_schemas.get(tag)
+        if schema is None:
+            return Response.invalid(document, [], self.whole_schema, self.build_nodes(["type"]))
+        return schema.validate(document, tag)
+
+    def compile_checks(self):
+        """
+        Builds a function for each keyword of this schema, in the same order `validate` checks them.
+        :return: list of functions that receive a document and its type tag and return a Response object.
+        """
+
+        checks = super().compile_checks()
+        validators = {accepted_tag: schema.compile_tagged() for accepted_tag, schema in self.type_schemas.items()}
+
+        def validate_type(document, tag):
+            validator = validators.get(tag)
+            if validator is None:
+                return Response.invalid(document, [], self.whole_schema, self.build_nodes(["type"]))
+            return validator(document, tag)
+
+        checks.append(validate_type)
+        return checks
+
+    def compile_predicates(self):
+        """
+        Builds a predicate for each keyword of this schema, in the same order `validate` checks them.
+        :return: list of functions that receive a document and its type tag and return a bool.
+        """
+
+        predicates = super().compile_predicates()
+        type_predicates = {accepted_tag: schema.compile_is_valid_tagged()
+                           for accepted_tag, schema in self.type_schemas.items()}
+
+        def is_valid_type(document, tag):
+            predicate = type_predicates.get(tag)
+            return predicate is not None and predicate(document, tag)
+
+        predicates.append(is_valid_type)
+        return predicates
+
+
+class ReferenceSchema(Schema):
+    """
+    Schema of a $ref. Its target is resolved (and built) the first time it's needed and then every call goes straight
+    to it. Every $ref with the same reference inside a whole schema shares the same ReferenceSchema, so building a
+    schema never follows references.
+    """
+
+    __slots__ = ("reference", "target", "resolving")
+
+    def __init__(self, reference, whole_schema, definitions):
+        """
+        :param reference: value of the $ref keyword.
+        :param whole_schema: the whole schema where the reference was found.
+        :param definitions: dict with the schemas built so far for `whole_schema`, by reference.
+        :return: None.
+        """
+
+        super().__init__({}, whole_schema, definitions, "")
+        self.reference = reference
+        self.target = None
+        """Schema object the reference points to, once it's resolved."""
+
+        self.resolving = False
+        """True while the target is being resolved, to detect references that end up pointing to themselves."""
+
+    def resolve(self):
+        """
+        Finds the schema this reference points to, building it the first time. If it's another reference that one is
+        resolved too.
+        :return: Schema object that is not a reference.
+        """
+
+        if self.target is None:
+            if self.resolving:
+                raise ValueError(f"The reference {self.reference} ends up pointing to itself.")
+            self.resolving = True
+            try:
+                self.target = self.build_target().resolve()
+            finally:
+                self.resolving = False
+        return self.target
+
+    def build_target(self):
+        """
+        Builds the schema this reference points to.
+        :return: Schema object.
+        """
+
+        if JSONPointer.is_json_pointer(self.reference):
+            return self.build_child_schema(JSONPointer(self.whole_schema, self.reference).get_json(),
+                                           path=self.reference)
+        elif is_valid_url(self.reference):
+            return get_schema_from_url(self.reference)
+        else:
+            return get_schema_from_file(self.reference)
+
+    def validate(self, document, tag=None):
+        """
+        Validates a document against the target of this reference.
+        :param document: document to validate.
+        :param tag: type tag of the document, if it's already known.
+        :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
+        """
+
+        return self.resolve().validate(document, tag)
+
+    def accepts_everything(self):
+        return self.resolve().accepts_everything()
+
+    def branch_conditions(self):
+        return self.resolve().branch_conditions()
+
+    def compile_tagged(self):
+        return self.resolve().compile_tagged()
+
+    def compile_is_valid_tagged(self):
+        return self.resolve().compile_is_valid_tagged()
+
+
+TRUE_SCHEMA = Schema({}, None, {}, "")
+"""Schema without keywords, which every document is valid against. It's shared by every `{}` or `true` subschema and
+by the default additionalProperties and items."""
 
 
 def get_schema(json_schema):
@@ -1096,21 +2289,67 @@ def get_schema_from_json_pointer(whole_schema, referenced, reference):
     return __get_corresponding_schema(referenced, whole_schema, {}, reference)
 
 
+def register_remote_schemas(schemas):
+    """
+    Registers already built schemas so references to their urls don't need to fetch and build them again.
+    :param schemas: dict where each url holds its Schema object.
+    """
+
+    for url, schema in schemas.items():
+        REMOTE_SCHEMAS[remote_schema_key(url)] = schema
+
+
+def register_remote_loaders(loaders):
+    """
+    Registers functions that load already built schemas, so references to their urls don't need to fetch and build
+    them again, and schemas are only loaded if they are referenced.
+    :param loaders: dict where each url holds a function without arguments that returns its Schema object, or None if
+    it can't be loaded.
+    """
+
+    for url, loader in loaders.items():
+        REMOTE_SCHEMA_LOADERS[remote_schema_key(url)] = loader
+
+
+def remote_schema_key(url):
+    """
+    Key of an url inside `REMOTE_SCHEMAS`. Urls that only differ by an empty fragment share the same key.
+    :param url: url string.
+    :return: string.
+    """
+
+    if url.endswith("#"):
+        return url[:-1]
+    return url
+
+
 def get_schema_from_url(url):
     """
-    Opens a connection to the url and retrieves the schema object that's in it.
+    Opens a connection to the url and retrieves the schema object that's in it. The schema of each url is only built
+    once, later calls get it from `REMOTE_SCHEMAS`. If the url has a loader in `REMOTE_SCHEMA_LOADERS`, the schema is
+    loaded instead of being fetched and built, unless the loader fails.
     :param url: url pointing a schema.
     :return: Schema object.
     """
 
+    key = remote_schema_key(url)
+    if key in REMOTE_SCHEMAS:
+        return REMOTE_SCHEMAS[key]
+    loader = REMOTE_SCHEMA_LOADERS.pop(key, None)
+    if loader is not None:
+        schema = loader()
+        if schema is not None:
+            REMOTE_SCHEMAS[key] = schema
+            return schema
     fragment = "#" + urlparse(url).fragment
-    f = urlopen(url)
-    json_string = f.read().decode("utf-8").replace("\n", "").replace("\t", "")
+    document = get_json_from_url(url)
     if JSONPointer.is_json_pointer(fragment):
-        return get_schema(JSONPointer(json.loads(json_string), fragment).get_json())
+        schema = get_schema(JSONPointer(document, fragment).get_json())
     else:
         # TODO: Fragments that are not JSONPointers
-        return get_schema(json.loads(json_string))
+        schema = get_schema(document)
+    REMOTE_SCHEMAS[key] = schema
+    return schema
 
 
 def get_schema_from_file(file):
@@ -1146,6 +2385,8 @@ def __get_corresponding_schema(json_schema, whole_schema, definitions, path):
         return BooleanSchema(json_schema, whole_schema, definitions, path)
     elif schema_type == "null":
         return NullSchema(json_schema, whole_schema, definitions, path)
+    elif is_type_list(schema_type):
+        return MultiTypeSchema(json_schema, whole_schema, definitions, path)
     else:
         return Schema(json_schema, whole_schema, definitions, path)
 
@@ -1165,7 +2406,7 @@ def last_valid_schema_index(schema_array, document):
     return last_valid_index
 
 
-def count_and_validate_schema_array(schema_array, document):
+def count_and_validate_schema_array(schema_array, document, limit=None, tag=None):
     """
     Validates a document against an array of schemas. If it validates against all of them returns a tuple where the
     first element is how many schemas the document was valid against and the second is a True Response Object.
@@ -1174,6 +2415,9 @@ def count_and_validate_schema_array(schema_array, document):
     document.
     :param schema_array:
     :param document:
+    :param limit: if it's given, validation stops as soon as the document was valid against `limit` schemas. The
+    count is then `limit` and the response is a True Response Object.
+    :param tag: type tag of the document, if it's already known.
     :return:
     """
 
@@ -1182,19 +2426,249 @@ def count_and_validate_schema_array(schema_array, document):
     last_invalid_index = -1
     for i in range(0, len(schema_array)):
         schema = schema_array[i]
-        schema_validate = schema.validate(document)
+        schema_validate = schema.validate(document, tag)
         if schema_validate.is_valid:
             count += 1
+            if count == limit:
+                return count, VALID
         else:
             last_invalid = schema_validate
             last_invalid_index = i
     if last_invalid_index == NONE:
-        return count, Response(True, None, None)
+        return count, VALID
+    else:
+        last_invalid.add_upward_document_and_schema_nodes([], [last_invalid_index])
+        return count, last_invalid
+
+
+def count_and_run_validators(validators, document, tag, limit=None, index=None):
+    """
+    Same as `count_and_validate_schema_array`, but with compiled schemas.
+    :param validators: list of functions returned by `Schema.compile_tagged()`.
+    :param document: document to validate.
+    :param tag: type tag of the document.
+    :param limit: if it's given, validators stop running as soon as the document was valid against `limit` of them.
+    :param index: BranchIndex of the validators. If it's given only the candidate validators are run, and the
+    response is a True Response object as soon as the document was valid against one of them. If it was valid against
+    none, the response of the last validator is returned as usual.
+    :return: tuple with how many validators the document was valid against and a Response object.
+    """
+
+    count = 0
+    last_invalid = None
+    last_invalid_index = -1
+    for i in range(0, len(validators)) if index is None else index.candidates(document, tag):
+        response = validators[i](document, tag)
+        if response.is_valid:
+            count += 1
+            if count == limit:
+                return count, VALID
+        else:
+            last_invalid = response
+            last_invalid_index = i
+    if index is not None:
+        if count > 0:
+            return count, VALID
+        if last_invalid_index != len(validators) - 1:
+            # The last validator was skipped, but it's the one failures point to.
+            last_invalid_index = len(validators) - 1
+            last_invalid = validators[last_invalid_index](document, tag)
+    if last_invalid_index == NONE:
+        return count, VALID
     else:
         last_invalid.add_upward_document_and_schema_nodes([], [last_invalid_index])
         return count, last_invalid
 
 
+def get_child_schemas(schema):
+    """
+    Lists the schemas that a schema uses to validate sub documents (or the same document).
+    :param schema: Schema object.
+    :return: list of Schema objects.
+    """
+
+    children = list(schema.anyOf) + list(schema.oneOf) + list(schema.allOf)
+    if schema.notThis is not None:
+        children.append(schema.notThis)
+    if isinstance(schema, ObjectSchema):
+        children += list(schema.properties.values()) + list(schema.schema_dependencies.values())
+        if isinstance(schema.additionalProperties, Schema):
+            children.append(schema.additionalProperties)
+        children += list(schema.patternProperties.values())
+    elif isinstance(schema, ArraySchema):
+        children += schema.items if isinstance(schema.items, list) else [schema.items]
+    elif isinstance(schema, MultiTypeSchema):
+        children += list(schema.type_schemas.values())
+    return children
+
+
+def walk_schemas(schema):
+    """
+    Lists every schema reachable from a schema (itself included), with references resolved. Each one is listed once.
+    :param schema: Schema object.
+    :return: list of Schema objects.
+    """
+
+    schemas = []
+    seen = set()
+    pending = [schema]
+    while pending:
+        schema = pending.pop().resolve()
+        if id(schema) not in seen:
+            seen.add(id(schema))
+            schemas.append(schema)
+            pending.extend(reversed(get_child_schemas(schema)))
+    return schemas
+
+
+def run_any_of_validators(validators, document, tag, index, order):
+    """
+    Runs the validators of an anyOf, in the order of a BranchOrder, until the document is valid against one of them.
+    :param validators: list of functions returned by `Schema.compile_tagged()`.
+    :param document: document to validate.
+    :param tag: type tag of the document.
+    :param index: BranchIndex of the validators, or None.
+    :param order: BranchOrder of the validators. The validator the document was valid against is recorded on it.
+    :return: True Response object, or if the document was valid against none, the Response of the last validator
+    (the last one in the schema, regardless of the order) pointing to it, as `count_and_run_validators` does.
+    """
+
+    last_index = len(validators) - 1
+    last_invalid = None
+    for i in order.order if index is None else order.arrange(index.candidates(document, tag)):
+        response = validators[i](document, tag)
+        if response.is_valid:
+            order.record(i)
+            return VALID
+        if i == last_index:
+            last_invalid = response
+    if last_invalid is None:
+        last_invalid = validators[last_index](document, tag)
+    last_invalid.add_upward_document_and_schema_nodes([], [last_index])
+    return last_invalid
+
+
+def export_any_of_orders(schema):
+    """
+    Exports the branch order every anyOf reachable from a schema has learned, so it can be loaded later.
+    :param schema: Schema object.
+    :return: dict with the exported BranchOrder of each schema with a compiled anyOf, by the hash of that schema.
+    """
+
+    return {schema_hash(node.dict_schema): node.any_of_order.export() for node in walk_schemas(schema)
+            if node.any_of_order is not None}
+
+
+def load_any_of_orders(schema, orders, freeze=True):
+    """
+    Sets the branch order of the anyOf schemas reachable from a schema to an exported one.
+    :param schema: Schema object.
+    :param orders: dict returned by `export_any_of_orders`.
+    :param freeze: whether the loaded orders are kept from now on.
+    """
+
+    for node in walk_schemas(schema):
+        if node.has_any_of():
+            exported = orders.get(schema_hash(node.dict_schema))
+            if exported is not None and sorted(exported["order"]) == list(range(0, len(node.anyOf))):
+                node.any_of_branch_order().set_order(exported["order"])
+                if freeze:
+                    node.any_of_order.freeze()
+
+
+def freeze_any_of_orders(schema):
+    """
+    Keeps the current branch order of every anyOf reachable from a schema.
+    :param schema: Schema object.
+    """
+
+    for node in walk_schemas(schema):
+        if node.has_any_of():
+            node.any_of_branch_order().freeze()
+
+
+def build_branch_index(schemas):
+    """
+    Builds the BranchIndex of the branches of an anyOf or oneOf.
+    :param schemas: list of Schema objects.
+    :return: BranchIndex object, or None if it would never skip a branch.
+    """
+
+    index = BranchIndex([schema.branch_conditions() for schema in schemas])
+    if index.is_useful():
+        return index
+    return None
+
+
+def branch_candidates(schemas):
+    """
+    :param schemas: list of Schema objects, the branches of an anyOf or oneOf.
+    :return: function that receives a document and its type tag and returns the indexes of the branches it may be
+    valid against.
+    """
+
+    index = build_branch_index(schemas)
+    if index is None:
+        every_branch = range(0, len(schemas))
+        return lambda document, tag: every_branch
+    return index.candidates
+
+
+def chain_checks(checks):
+    """
+    Builds a function that runs every check in order and returns the first invalid response.
+    :param checks: list of functions that receive a document and its type tag and return a Response object.
+    :return: function that receives a document and its type tag and returns a Response object.
+    """
+
+    if len(checks) == 0:
+        return lambda document, tag: VALID
+    if len(checks) == 1:
+        return checks[0]
+    checks = tuple(checks)
+
+    def validate(document, tag):
+        for check in checks:
+            response = check(document, tag)
+            if not response.is_valid:
+                return response
+        return VALID
+
+    return validate
+
+
+def ignoring_tag(check):
+    """
+    Adapts a keyword check (or predicate) that only needs the document to the way compiled chains call them.
+    :param check: function that receives a document.
+    :return: function that receives a document and its type tag.
+    """
+
+    return lambda document, tag: check(document)
+
+
+def chain_predicates(predicates):
+    """
+    Builds a predicate that is True only if every predicate is True, checking them in order.
+    :param predicates: list of functions that receive a document and its type tag and return a bool.
+    :return: function that receives a document and its type tag and returns a bool.
+    """
+
+    if len(predicates) == 0:
+        return lambda document, tag: True
+    if len(predicates) == 1:
+        return predicates[0]
+    predicates = tuple(predicates)
+
+    def is_valid(document, tag):
+        for predicate in predicates:
+            if not predicate(document, tag):
+                return False
+        return True
+
+    return is_valid
+
+
 def infer_type(json_schema):
     """
     Infers the type of a schema.
@@ -1215,3 +2689,14 @@ def infer_type(json_schema):
             elif NUMBER_KEYWORDS.count(key) == 1:
                 return "number"
         return ""
+
+
+def is_type_list(schema_type):
+    """
+    Checks if an inferred type is a list of types a MultiTypeSchema can dispatch documents on.
+    :param schema_type: type returned by `infer_type`.
+    :return: bool.
+    """
+
+    return isinstance(schema_type, list) and len(schema_type) > 0 and \
+        all(isinstance(type_name, str) and type_name in JSON_TYPES for type_name in schema_type)
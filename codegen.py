@@ -0,0 +1,345 @@
+from classes import *
+import importlib.util
+import os
+import sys
+
+CACHE_DIR = os.environ.get("JSCH_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "jsch")
+"""Directory where generated validator modules are written."""
+
+GENERATOR_VERSION = 9
+"""Version of the generated code. It's part of the module names, so modules written by an older version are not
+reused."""
+
+TYPE_CONDITIONS = {
+    ObjectSchema: 'tag == "object"',
+    ArraySchema: 'tag == "array"',
+    IntegerSchema: 'tag == "integer"',
+    NumberSchema: 'tag in ("integer", "number")',
+    StringSchema: 'tag == "string"',
+    BooleanSchema: 'tag == "boolean"',
+    NullSchema: 'tag == "null"',
+}
+"""Condition the type tag of a document must satisfy to be valid against the type keyword of each schema class."""
+
+VALUE_TAG = "TYPE_TAGS.get(type(value)) or type_tag(value)"
+"""Expression of the type tag of the sub document held by `value`."""
+
+
+class ModuleGenerator:
+    """
+    Translates a schema tree into the source of a python module with one validation function per schema, which
+    receives the document and its type tag. The module's `validate` function validates a document against the root
+    schema.
+    """
+
+    def __init__(self, schema):
+        """
+        :param schema: Schema object.
+        """
+
+        self.schema = schema
+        self.names = {}
+        """Name of the function of each schema, by id."""
+
+        self.indexes = {}
+        """Position of each schema inside `self.schemas`, by id."""
+
+        self.schemas = []
+        """Every schema of the tree, in the same order as their functions."""
+
+        self.whole_schemas = {}
+        """Name of the constant that holds each whole schema, by id."""
+
+        self.constants = []
+        """Lines that define data constants."""
+
+        self.tables = []
+        """Lines that define constants referencing functions, which go after every function."""
+
+        self.collect_schemas()
+
+    def collect_schemas(self):
+        """
+        Gives a name to every schema reachable from the root schema.
+        """
+
+        for schema in walk_schemas(self.schema):
+            self.names[id(schema)] = f"validate_{len(self.schemas)}"
+            self.indexes[id(schema)] = len(self.schemas)
+            self.schemas.append(schema)
+
+    def name(self, schema):
+        return self.names[id(schema.resolve())]
+
+    def constant(self, prefix, schema, value, tables=False):
+        """
+        Defines a constant for a schema.
+        :param value: source of the value of the constant.
+        :param tables: True if the value references functions, so the constant must go after them.
+        :return: name of the constant.
+        """
+
+        name = f"{prefix}_{self.indexes[id(schema)]}"
+        (self.tables if tables else self.constants).append(f"{name} = {value}")
+        return name
+
+    def json_constant(self, prefix, schema, value):
+        return self.constant(prefix, schema, f"json.loads({json.dumps(value)!r})")
+
+    def whole_schema(self, schema):
+        """
+        :return: name of the constant that holds the whole schema of `schema`.
+        """
+
+        key = id(schema.whole_schema)
+        if key not in self.whole_schemas:
+            name = f"WHOLE_SCHEMA_{len(self.whole_schemas)}"
+            self.whole_schemas[key] = name
+            self.constants.append(f"{name} = json.loads({json.dumps(schema.whole_schema)!r})")
+        return self.whole_schemas[key]
+
+    def generate(self):
+        """
+        :return: source of the module.
+        """
+
+        functions = []
+        for schema in self.schemas:
+            functions.extend(self.generate_function(schema))
+            functions.append("")
+            functions.append("")
+        header = ["# Generated by codegen.py, do not edit.", "from classes import count_and_run_validators",
+                  "from utils import *", "import json", "", ""]
+        entry = ["", "", "def validate(document):",
+                 f"    return {self.name(self.schema)}(document, type_tag(document))"]
+        return "\n".join(header + self.constants + ["", ""] + functions + self.tables + entry) + "\n"
+
+    def generate_function(self, schema):
+        """
+        :return: lines of the validation function of a schema.
+        """
+
+        lines = [f"def {self.name(schema)}(document, tag):"]
+        body = self.base_keywords(schema)
+        if type(schema) in TYPE_CONDITIONS:
+            body += self.failure_if(f"not {TYPE_CONDITIONS[type(schema)]}", schema, "[]", ["type"])
+        if isinstance(schema, ObjectSchema):
+            body += self.object_keywords(schema)
+        elif isinstance(schema, ArraySchema):
+            body += self.array_keywords(schema)
+        if isinstance(schema, MultiTypeSchema):
+            body += self.type_dispatch(schema)
+        else:
+            body.append("return VALID")
+        lines.extend("    " + line for line in body)
+        return lines
+
+    def failure(self, schema, document_nodes, schema_nodes):
+        """
+        :return: expression that builds an invalid Response.
+        """
+
+        return f"Response.invalid(document, {document_nodes}, {self.whole_schema(schema)}, {schema_nodes})"
+
+    def failure_if(self, condition, schema, document_nodes, schema_nodes):
+        return [f"if {condition}:", f"    return {self.failure(schema, document_nodes, schema_nodes)}"]
+
+    def child_call(self, call, document_nodes, schema_nodes, set_document=True):
+        """
+        :return: lines that validate a sub document and return its response, with upward nodes added, if it's invalid.
+        """
+
+        lines = [f"response = {call}", "if not response.is_valid:"]
+        if set_document:
+            lines.append("    response.set_document(document)")
+        lines.append(f"    response.add_upward_document_and_schema_nodes({document_nodes}, {schema_nodes})")
+        lines.append("    return response")
+        return lines
+
+    def validators_table(self, prefix, schema, children):
+        return self.constant(prefix, schema, f"({''.join(self.name(child) + ', ' for child in children)})", True)
+
+    def branch_index(self, prefix, schema, children):
+        """
+        Defines the BranchIndex of the branches of an anyOf or oneOf.
+        :return: name of the constant that holds it, or "None" if it would never skip a branch.
+        """
+
+        conditions = [child.branch_conditions() for child in children]
+        if not BranchIndex(conditions).is_useful():
+            return "None"
+        return self.constant(prefix, schema, f"BranchIndex(json.loads({json.dumps(conditions)!r}))")
+
+    def type_dispatch(self, schema):
+        """
+        :return: lines that validate a document against the schema of its type in a MultiTypeSchema.
+        """
+
+        entries = "".join(f"{tag!r}: {self.name(child)}, " for tag, child in schema.type_schemas.items())
+        table = self.constant("TYPES", schema, f"{{{entries}}}", True)
+        return ([f"validator = {table}.get(tag)"] +
+                self.failure_if("validator is None", schema, "[]", ["type"]) + ["return validator(document, tag)"])
+
+    def base_keywords(self, schema):
+        lines = []
+        if schema.has_any_of():
+            table = self.validators_table("ANY_OF", schema, schema.anyOf)
+            index = self.branch_index("ANY_OF_INDEX", schema, schema.anyOf)
+            lines += [f"count, response = count_and_run_validators({table}, document, tag, 1, {index})",
+                      "if count < 1:",
+                      f"    response.add_upward_document_and_schema_nodes([], {schema.build_nodes(['anyOf'])!r})",
+                      "    return response"]
+        if schema.has_one_of():
+            table = self.validators_table("ONE_OF", schema, schema.oneOf)
+            index = self.branch_index("ONE_OF_INDEX", schema, schema.oneOf)
+            lines += [f"count, response = count_and_run_validators({table}, document, tag, 2, {index})",
+                      "if count < 1:",
+                      f"    response.add_upward_document_and_schema_nodes([], {schema.build_nodes(['oneOf'])!r})",
+                      "    return response",
+                      "if count > 1:",
+                      f"    return {self.failure(schema, '[]', schema.build_nodes(['oneOf']))}"]
+        if schema.has_all_of():
+            table = self.validators_table("ALL_OF", schema, schema.allOf)
+            lines += [f"response = count_and_run_validators({table}, document, tag)[1]",
+                      "if not response.is_valid:",
+                      f"    response.add_upward_document_and_schema_nodes([], {schema.build_nodes(['allOf'])!r})",
+                      "    return response"]
+        if schema.has_not():
+            lines += self.failure_if(f"{self.name(schema.notThis)}(document, tag).is_valid", schema, "[]",
+                                     schema.build_nodes(["not"]))
+        if schema.has_enum():
+            enum = self.constant("ENUM", schema, f"frozenset(typed_fingerprint(value) for value in json.loads("
+                                                 f"{json.dumps(schema.enum)!r}))")
+            lines += self.failure_if(f"typed_fingerprint(document) not in {enum}", schema, "[]",
+                                     schema.build_nodes(["enum"]))
+        if schema.has_const():
+            const = self.constant("CONST", schema, f"typed_fingerprint(json.loads({json.dumps(schema.const)!r}))")
+            lines += self.failure_if(f"typed_fingerprint(document) != {const}", schema, "[]",
+                                     schema.build_nodes(["const"]))
+        return lines
+
+    def object_keywords(self, schema):
+        lines = []
+        if schema.required:
+            required = self.json_constant("REQUIRED", schema, schema.required)
+            failure = self.failure(schema, "[]", f"{schema.build_nodes(['required'])!r} + [key]")
+            lines += [f"for key in {required}:",
+                      "    if key not in document:",
+                      f"        return {failure}"]
+        for key, child in schema.properties.items():
+            lines += [f"if {key!r} in document:", f"    value = document[{key!r}]"]
+            lines += ["    " + line for line in self.child_call(f"{self.name(child)}(value, {VALUE_TAG})", [key],
+                                                                  schema.build_nodes(["properties", key]))]
+        if schema.minProperties is not None:
+            lines += self.failure_if(f"len(document) < {schema.minProperties!r}", schema, "[]",
+                                     schema.build_nodes(["minProperties"]))
+        if schema.maxProperties is not None:
+            lines += self.failure_if(f"len(document) > {schema.maxProperties!r}", schema, "[]",
+                                     schema.build_nodes(["maxProperties"]))
+        for key, dependencies in schema.property_dependencies.items():
+            lines += self.failure_if(f"{key!r} in document and not has_all_keys(document, {dependencies!r})", schema,
+                                     [key], schema.build_nodes(["dependencies", key]))
+        for key, child in schema.schema_dependencies.items():
+            lines += [f"if {key!r} in document:", f"    value = document[{key!r}]"]
+            lines += ["    " + line for line in self.child_call(f"{self.name(child)}(value, {VALUE_TAG})", [key],
+                                                                  schema.build_nodes(["dependencies", key]))]
+        additional = schema.additionalProperties
+        declared = json.dumps(list(schema.properties) + list(schema.required))
+        if schema.patternProperties:
+            classifier = self.constant("KEY_CLASSIFIER", schema, f"KeyClassifier(json.loads({declared!r}), json.loads("
+                                                                 f"{json.dumps(list(schema.patternProperties))!r}), "
+                                                                 f"{KEY_MEMO_SIZE!r})")
+            is_additional = f"{classifier}.classify(key)[1]"
+        elif not isinstance(additional, bool) or not additional:
+            is_additional = f"key not in {self.constant('DECLARED', schema, f'frozenset(json.loads({declared!r}))')}"
+        if isinstance(additional, bool):
+            if not additional:
+                failure = self.failure(schema, "[key]", schema.build_nodes(["additionalProperties"]))
+                lines += ["for key in document:",
+                          f"    if {is_additional}:",
+                          f"        return {failure}"]
+        elif not additional.accepts_everything():
+            lines += ["for key, value in document.items():",
+                      f"    if {is_additional}:"]
+            lines += ["        " + line for line in
+                      self.child_call(f"{self.name(additional)}(value, {VALUE_TAG})", "[key]",
+                                      f"{schema.build_nodes(['additionalProperties'])!r} + [key]")]
+        if schema.patternProperties:
+            entries = "".join(f"{pattern!r}: {self.name(child)}, "
+                              for pattern, child in schema.patternProperties.items())
+            table = self.constant("PATTERN_PROPERTIES", schema, "{" + entries + "}", True)
+            lines += ["for key, value in document.items():",
+                      f"    pattern = {classifier}.classify(key)[0]",
+                      "    if pattern is not None:"]
+            lines += ["        " + line for line in
+                      self.child_call(f"{table}[pattern](value, {VALUE_TAG})", "[key]",
+                                      '["patternProperties", pattern]', set_document=False)]
+        return lines
+
+    def array_keywords(self, schema):
+        lines = []
+        if isinstance(schema.items, list):
+            table = self.validators_table("ITEMS", schema, schema.items)
+            lines += [f"for i in range(0, min(len(document), {len(schema.items)})):", "    value = document[i]"]
+            lines += ["    " + line for line in self.child_call(f"{table}[i](value, {VALUE_TAG})", "[i]",
+                                                                  f"{schema.build_nodes(['items'])!r} + [i]")]
+        elif not schema.items.accepts_everything():
+            lines += ["for i, value in enumerate(document):"]
+            lines += ["    " + line for line in self.child_call(f"{self.name(schema.items)}(value, {VALUE_TAG})",
+                                                                  "[i]", schema.build_nodes(["items"]))]
+        if not schema.additional_items_are_allowed():
+            lines += self.failure_if(f"len(document) > {len(schema.items)}", schema, [len(schema.items)],
+                                     schema.build_nodes(["additionalItems"]))
+        if schema.minItems is not None:
+            lines += self.failure_if(f"len(document) < {schema.minItems!r}", schema, "[]",
+                                     schema.build_nodes(["minItems"]))
+        if schema.maxItems is not None:
+            lines += self.failure_if(f"len(document) > {schema.maxItems!r}", schema, "[]",
+                                     schema.build_nodes(["maxItems"]))
+        if schema.uniqueItems:
+            lines += ["repeated_item = find_repeated_item(document)"]
+            lines += self.failure_if("repeated_item != NONE", schema, "[]",
+                                     f"{schema.build_nodes(['uniqueItems'])!r} + [repeated_item]")
+        return lines
+
+
+def generate_source(schema):
+    """
+    Generates the source of a python module that validates documents against a schema. Its `validate` function
+    returns the same Response objects as `schema.validate`, and references between schemas become calls between
+    functions.
+    :param schema: Schema object.
+    :return: module source string.
+    """
+
+    return ModuleGenerator(schema).generate()
+
+
+def load_validator(json_schema, cache_dir=CACHE_DIR):
+    """
+    Retrieves the generated validation function of a schema, generating its module inside `cache_dir` first if it
+    isn't there. Modules are named after the generator version and the schema hash, so later calls (and later
+    processes) import them (or their cached bytecode) instead of building the schema again. The hash keeps key order,
+    since schemas that only differ in it may be built as different classes. Documents referenced by urls or files are
+    not part of the hash.
+    :param json_schema: dict representing a schema.
+    :param cache_dir: directory of the generated modules.
+    :return: function that receives a document and returns a Response object.
+    """
+
+    name = f"jsch_v{GENERATOR_VERSION}_{schema_hash(json_schema)}"
+    if name in sys.modules:
+        return sys.modules[name].validate
+    path = os.path.join(cache_dir, f"{name}.py")
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        source = generate_source(get_schema(json_schema))
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as module_file:
+            module_file.write(source)
+        os.replace(temporary_path, path)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    sys.modules[name] = module
+    return module.validate
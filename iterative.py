@@ -0,0 +1,273 @@
+from classes import *
+
+LEAF_CLASSES = (Schema, IntegerSchema, NumberSchema, StringSchema, BooleanSchema, NullSchema)
+"""Schema classes that never validate a sub document. Without anyOf, oneOf, allOf or not, their schemas are validated
+right away instead of getting their own steps."""
+
+
+def validate_iteratively(schema, document):
+    """
+    Validates a document against a schema without recursion: every schema being validated is a generator of steps
+    kept in an explicit stack, so the nesting depth of documents (and of references) is only bounded by memory. The
+    response is the same `schema.validate(document)` returns.
+    :param schema: Schema object.
+    :param document: document to validate.
+    :return: Response object with pointers to the document and corresponding schema that failed (if it fails).
+    """
+
+    stack = [validation_steps(schema, document, type_tag(document))]
+    response = None
+    while stack:
+        try:
+            child, child_document, child_tag = stack[-1].send(response)
+        except StopIteration as stop:
+            stack.pop()
+            response = stop.value
+            continue
+        child = child.resolve()
+        if is_leaf(child):
+            response = child.validate(child_document, child_tag)
+        else:
+            stack.append(validation_steps(child, child_document, child_tag))
+            response = None
+    return response
+
+
+def is_leaf(schema):
+    """
+    Checks if validating a document against a schema never validates another schema.
+    :param schema: Schema object that is not a reference.
+    :return: bool.
+    """
+
+    return type(schema) in LEAF_CLASSES and not schema.anyOf and not schema.oneOf and not schema.allOf and \
+        schema.notThis is None
+
+
+def validation_steps(schema, document, tag):
+    """
+    Builds the steps that validate a document against a schema. The generator yields a `(schema, document, tag)`
+    tuple every time a document must be validated against another schema, and must be sent the Response of that
+    validation back. It returns the Response of the whole validation.
+    :param schema: Schema object.
+    :param document: document to validate.
+    :param tag: type tag of the document.
+    :return: generator.
+    """
+
+    schema = schema.resolve()
+    return STEPS.get(type(schema), scalar_steps)(schema, document, tag)
+
+
+def count_valid_steps(schemas, document, tag, limit=None):
+    """
+    Same as `count_and_validate_schema_array`, as steps.
+    :param schemas: list of Schema objects.
+    :param document: document to validate.
+    :param tag: type tag of the document.
+    :param limit: if it's given, validation stops as soon as the document was valid against `limit` schemas.
+    :return: generator that returns a tuple with how many schemas the document was valid against and a Response object.
+    """
+
+    count = 0
+    last_invalid = None
+    last_invalid_index = -1
+    for i in range(0, len(schemas)):
+        response = yield schemas[i], document, tag
+        if response.is_valid:
+            count += 1
+            if count == limit:
+                return count, VALID
+        else:
+            last_invalid = response
+            last_invalid_index = i
+    if last_invalid_index == NONE:
+        return count, VALID
+    last_invalid.add_upward_document_and_schema_nodes([], [last_invalid_index])
+    return count, last_invalid
+
+
+def base_steps(schema, document, tag):
+    """
+    Validates a document against the keywords every schema class has, as `Schema.validate` does.
+    :param schema: Schema object.
+    :param document: document to validate.
+    :param tag: type tag of the document.
+    :return: generator that returns a Response object.
+    """
+
+    if schema.anyOf:
+        count, response = yield from count_valid_steps(schema.anyOf, document, tag, 1)
+        if count < 1:
+            response.add_upward_document_and_schema_nodes([], schema.build_nodes(["anyOf"]))
+            return response
+    if schema.oneOf:
+        count, response = yield from count_valid_steps(schema.oneOf, document, tag, 2)
+        if count < 1:
+            response.add_upward_document_and_schema_nodes([], schema.build_nodes(["oneOf"]))
+            return response
+        if count > 1:
+            return Response.invalid(document, [], schema.whole_schema, schema.build_nodes(["oneOf"]))
+    if schema.allOf:
+        count, response = yield from count_valid_steps(schema.allOf, document, tag)
+        if not response.is_valid:
+            response.add_upward_document_and_schema_nodes([], schema.build_nodes(["allOf"]))
+            return response
+    if schema.notThis is not None:
+        response = yield schema.notThis, document, tag
+        if response.is_valid:
+            return Response.invalid(document, [], schema.whole_schema, schema.build_nodes(["not"]))
+    if schema.has_enum():
+        validate_enum = schema.validate_enum(document)
+        if not validate_enum.is_valid:
+            return validate_enum
+    if schema.has_const():
+        validate_const = schema.validate_const(document)
+        if not validate_const.is_valid:
+            return validate_const
+    return VALID
+
+
+def scalar_steps(schema, document, tag):
+    """
+    Validates a document against a schema whose class never validates a sub document.
+    :param schema: Schema object of one of `LEAF_CLASSES`.
+    :param document: document to validate.
+    :param tag: type tag of the document.
+    :return: generator that returns a Response object.
+    """
+
+    response = yield from base_steps(schema, document, tag)
+    if not response.is_valid or type(schema) is Schema:
+        return response
+    return schema.validate_type(document, tag)
+
+
+def object_steps(schema, document, tag):
+    """
+    Validates a document against an object schema, as `ObjectSchema.validate` does.
+    :param schema: ObjectSchema object.
+    :param document: document to validate.
+    :param tag: type tag of the document.
+    :return: generator that returns a Response object.
+    """
+
+    response = yield from base_steps(schema, document, tag)
+    if not response.is_valid:
+        return response
+    response = schema.validate_type(document, tag)
+    if not response.is_valid:
+        return response
+    response = schema.validate_required_properties(document)
+    if not response.is_valid:
+        return response
+    for key, child in schema.properties.items():
+        if key in document:
+            value = document[key]
+            response = yield child, value, TYPE_TAGS.get(type(value)) or type_tag(value)
+            if not response.is_valid:
+                response.set_document(document)
+                response.add_upward_document_and_schema_nodes([key], schema.build_nodes(["properties", key]))
+                return response
+    for check in (schema.validate_min_properties, schema.validate_max_properties,
+                  schema.validate_property_dependencies):
+        response = check(document)
+        if not response.is_valid:
+            return response
+    for key, child in schema.schema_dependencies.items():
+        if key in document:
+            value = document[key]
+            response = yield child, value, TYPE_TAGS.get(type(value)) or type_tag(value)
+            if not response.is_valid:
+                response.set_document(document)
+                response.add_upward_document_and_schema_nodes([key], schema.build_nodes(["dependencies", key]))
+                return response
+    if isinstance(schema.additionalProperties, bool):
+        if not schema.additionalProperties:
+            for key in document:
+                if schema.key_is_additional_property(key):
+                    return Response.invalid(document, [key], schema.whole_schema,
+                                            schema.build_nodes(["additionalProperties"]))
+    else:
+        for key, value in document.items():
+            if schema.key_is_additional_property(key):
+                response = yield schema.additionalProperties, value, TYPE_TAGS.get(type(value)) or type_tag(value)
+                if not response.is_valid:
+                    response.set_document(document)
+                    response.add_upward_document_and_schema_nodes(
+                        [key], schema.build_nodes(["additionalProperties", key]))
+                    return response
+    for key, value in document.items():
+        pattern = schema.key_classifier.classify(key)[0]
+        if pattern is not None:
+            response = yield schema.patternProperties[pattern], value, TYPE_TAGS.get(type(value)) or type_tag(value)
+            if not response.is_valid:
+                response.add_upward_document_and_schema_nodes([key], ["patternProperties", pattern])
+                return response
+    return VALID
+
+
+def array_steps(schema, document, tag):
+    """
+    Validates a document against an array schema, as `ArraySchema.validate` does.
+    :param schema: ArraySchema object.
+    :param document: document to validate.
+    :param tag: type tag of the document.
+    :return: generator that returns a Response object.
+    """
+
+    response = yield from base_steps(schema, document, tag)
+    if not response.is_valid:
+        return response
+    response = schema.validate_type(document, tag)
+    if not response.is_valid:
+        return response
+    if isinstance(schema.items, list):
+        for i in range(0, get_size_of_smaller(document, schema.items)):
+            value = document[i]
+            response = yield schema.items[i], value, TYPE_TAGS.get(type(value)) or type_tag(value)
+            if not response.is_valid:
+                response.set_document(document)
+                response.add_upward_document_and_schema_nodes([i], schema.build_nodes(["items", i]))
+                return response
+    else:
+        for i in range(0, len(document)):
+            value = document[i]
+            response = yield schema.items, value, TYPE_TAGS.get(type(value)) or type_tag(value)
+            if not response.is_valid:
+                response.set_document(document)
+                response.add_upward_document_and_schema_nodes([i], schema.build_nodes(["items"]))
+                return response
+    for check in (schema.validate_additional_items, schema.validate_min_items, schema.validate_max_items,
+                  schema.validate_unique_items):
+        response = check(document)
+        if not response.is_valid:
+            return response
+    return VALID
+
+
+def multi_type_steps(schema, document, tag):
+    """
+    Validates a document against a schema with a list of types, as `MultiTypeSchema.validate` does.
+    :param schema: MultiTypeSchema object.
+    :param document: document to validate.
+    :param tag: type tag of the document.
+    :return: generator that returns a Response object.
+    """
+
+    response = yield from base_steps(schema, document, tag)
+    if not response.is_valid:
+        return response
+    type_schema = schema.type_schemas.get(tag)
+    if type_schema is None:
+        return Response.invalid(document, [], schema.whole_schema, schema.build_nodes(["type"]))
+    response = yield type_schema, document, tag
+    return response
+
+
+STEPS = {
+    ObjectSchema: object_steps,
+    ArraySchema: array_steps,
+    MultiTypeSchema: multi_type_steps,
+}
+"""Function that builds the validation steps of each schema class. Every other class uses `scalar_steps`."""
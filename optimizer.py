@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+from classes import *
+import copy
+import json
+import sys
+
+UNSATISFIABLE = {"not": {}}
+"""Schema every statically unsatisfiable subschema is replaced with. It fails on its first check."""
+
+KEYWORD_GROUPS = {"properties": "properties", "patternProperties": "properties", "additionalProperties": "properties",
+                  "required": "properties", "items": "items", "additionalItems": "items"}
+"""Keywords whose validation depends on each other. Two keywords of the same group are never split or merged."""
+
+NOT_MERGED = ("$ref", "definitions", "$defs", "$id", "id")
+"""Keywords of allOf branches that are never merged into their parent."""
+
+SCHEMA_MAPS = ("properties", "patternProperties", "dependencies", "definitions", "$defs")
+"""Keywords whose value is a dict of subschemas."""
+
+SCHEMA_LISTS = ("allOf", "anyOf", "oneOf")
+"""Keywords whose value is a list of subschemas."""
+
+SCHEMA_VALUES = ("additionalProperties", "not")
+"""Keywords whose value is a subschema."""
+
+
+class SchemaOptimizer:
+    """
+    Rewrites a json schema into a simpler one that accepts the same documents, keeping a report of every rewrite.
+    Subschemas on the way to a JSONPointer reference are never moved, so every reference still points to the same
+    subschema after the optimization.
+    """
+
+    def __init__(self, json_schema):
+        """
+        :param json_schema: Dict representing a json schema. It isn't modified.
+        """
+
+        self.targets = []
+        self.report = []
+        self.collect_targets(json_schema)
+        self.optimized = self.optimize(copy.deepcopy(json_schema), ["#"])
+
+    def collect_targets(self, value):
+        """
+        Collects the nodes of every JSONPointer reference in a json value.
+        :param value: json value.
+        """
+
+        if isinstance(value, dict):
+            reference = value.get("$ref")
+            if isinstance(reference, str) and JSONPointer.is_json_pointer(reference):
+                nodes = JSONPointer.get_nodes_from_string(reference)
+                self.targets.append(nodes if nodes[0] == "#" else ["#"] + nodes)
+            for child in value.values():
+                self.collect_targets(child)
+        elif isinstance(value, list):
+            for child in value:
+                self.collect_targets(child)
+
+    def is_referenced(self, path):
+        """
+        Checks if a reference points to a path or to anything below it.
+        :param path: list of nodes.
+        :return: boolean.
+        """
+
+        return any(target[:len(path)] == path for target in self.targets)
+
+    def is_referenced_below(self, path):
+        """
+        Checks if a reference points to anything strictly below a path.
+        :param path: list of nodes.
+        :return: boolean.
+        """
+
+        return any(len(target) > len(path) and target[:len(path)] == path for target in self.targets)
+
+    def record(self, path, rewrite, keyword, **details):
+        """
+        Adds a rewrite to the report.
+        :param path: list of nodes of the rewritten subschema.
+        :param rewrite: name of the rewrite.
+        :param keyword: keyword that was rewritten.
+        """
+
+        self.report.append(dict(pointer=pointer_string(path), rewrite=rewrite, keyword=keyword, **details))
+
+    def optimize(self, json_schema, path):
+        """
+        Optimizes a subschema, its children first.
+        :param json_schema: subschema. Dicts are rewritten in place.
+        :param path: list of nodes of the subschema.
+        :return: the optimized subschema.
+        """
+
+        if not isinstance(json_schema, dict):
+            return json_schema
+        self.optimize_children(json_schema, path)
+        if has_key(json_schema, "$ref"):
+            return json_schema
+        self.collapse_single_branch(json_schema, path, "anyOf")
+        self.collapse_single_branch(json_schema, path, "oneOf")
+        self.remove_true_subschemas(json_schema, path)
+        self.simplify_all_of(json_schema, path)
+        return self.check_satisfiable(json_schema, path)
+
+    def optimize_children(self, json_schema, path):
+        """
+        Optimizes every subschema of a subschema.
+        :param json_schema: subschema dict.
+        :param path: list of nodes of the subschema.
+        """
+
+        for key in SCHEMA_MAPS:
+            if isinstance(json_schema.get(key), dict):
+                for name, child in json_schema[key].items():
+                    json_schema[key][name] = self.optimize(child, path + [key, name])
+        for key in SCHEMA_LISTS:
+            if isinstance(json_schema.get(key), list):
+                json_schema[key] = [self.optimize(child, path + [key, str(i)])
+                                    for i, child in enumerate(json_schema[key])]
+        for key in SCHEMA_VALUES:
+            if has_key(json_schema, key):
+                json_schema[key] = self.optimize(json_schema[key], path + [key])
+        items = json_schema.get("items")
+        if isinstance(items, list):
+            json_schema["items"] = [self.optimize(child, path + ["items", str(i)]) for i, child in enumerate(items)]
+        elif isinstance(items, dict):
+            json_schema["items"] = self.optimize(items, path + ["items"])
+
+    def collapse_single_branch(self, json_schema, path, keyword):
+        """
+        Moves the only branch of an anyOf or a oneOf to the allOf of the same subschema.
+        """
+
+        branches = json_schema.get(keyword)
+        if not isinstance(branches, list) or len(branches) != 1 or self.is_referenced(path + [keyword]):
+            return
+        if has_key(json_schema, "allOf") and (not isinstance(json_schema["allOf"], list) or
+                                              self.is_referenced(path + ["allOf"])):
+            return
+        del json_schema[keyword]
+        json_schema["allOf"] = json_schema.get("allOf", []) + branches
+        self.record(path, "collapse", keyword)
+
+    def remove_true_subschemas(self, json_schema, path):
+        """
+        Removes subschemas that accept every document where leaving them out doesn't change what is accepted. If
+        the removed keywords were the ones the type was inferred from, the type is added explicitly.
+        """
+
+        schema_type = infer_type(json_schema)
+        for keyword in ("additionalProperties", "items"):
+            if has_key(json_schema, keyword) and is_true_schema(json_schema[keyword]) and \
+                    not self.is_referenced(path + [keyword]):
+                del json_schema[keyword]
+                self.record(path, "remove_true", keyword)
+        dependencies = json_schema.get("dependencies")
+        if isinstance(dependencies, dict) and not self.is_referenced(path + ["dependencies"]):
+            for key in [key for key, dependency in dependencies.items() if is_true_schema(dependency)]:
+                del dependencies[key]
+                self.record(path, "remove_true", "dependencies", key=key)
+            if not dependencies:
+                del json_schema["dependencies"]
+        any_of = json_schema.get("anyOf")
+        if isinstance(any_of, list) and any(is_true_schema(branch) for branch in any_of) and \
+                not self.is_referenced(path + ["anyOf"]):
+            del json_schema["anyOf"]
+            self.record(path, "remove_true", "anyOf")
+        if infer_type(json_schema) != schema_type:
+            json_schema["type"] = schema_type
+
+    def simplify_all_of(self, json_schema, path):
+        """
+        Flattens the nested allOf of a subschema, removes its branches that accept every document and merges the
+        branches that can be merged into the subschema itself.
+        """
+
+        all_of = json_schema.get("allOf")
+        if not isinstance(all_of, list) or self.is_referenced(path + ["allOf"]):
+            return
+        flattened = []
+        for i, branch in enumerate(all_of):
+            if is_true_schema(branch):
+                self.record(path, "remove_true", "allOf", branch=i)
+            elif isinstance(branch, dict) and isinstance(branch.get("allOf"), list) and not has_key(branch, "$ref"):
+                rest = {key: value for key, value in branch.items() if key != "allOf"}
+                flattened += ([rest] if rest else []) + [each for each in branch["allOf"] if not is_true_schema(each)]
+                self.record(path, "flatten", "allOf", branch=i)
+            else:
+                flattened.append(branch)
+        remaining = []
+        for i, branch in enumerate(flattened):
+            if can_merge(json_schema, branch):
+                json_schema.update(branch)
+                self.record(path, "merge", "allOf", keywords=list(branch))
+            else:
+                remaining.append(branch)
+        if remaining:
+            json_schema["allOf"] = remaining
+        else:
+            del json_schema["allOf"]
+
+    def check_satisfiable(self, json_schema, path):
+        """
+        Replaces a subschema that can't accept any document with `UNSATISFIABLE`.
+        :return: the subschema or `UNSATISFIABLE`.
+        """
+
+        if json_schema == UNSATISFIABLE or self.is_referenced_below(path):
+            return json_schema
+        reason = unsatisfiable_reason(json_schema)
+        if reason is None:
+            return json_schema
+        self.record(path, "unsatisfiable", reason)
+        return copy.deepcopy(UNSATISFIABLE)
+
+
+def optimize_schema(json_schema):
+    """
+    Simplifies a json schema before it's built: nested allOf are flattened, allOf branches that share no keyword with
+    their parent are merged into it, subschemas that accept everything are removed, anyOf and oneOf with a single
+    branch are collapsed and subschemas that can't accept any document are replaced with `UNSATISFIABLE`. The
+    optimized schema accepts the same documents, but failure pointers refer to the optimized schema.
+    :param json_schema: Dict representing a json schema. It isn't modified.
+    :return: tuple with the optimized schema and the report, a list with a dict for every rewrite with the `pointer`
+    of the rewritten subschema, the name of the `rewrite` and the `keyword` it was applied to.
+    """
+
+    optimizer = SchemaOptimizer(json_schema)
+    return optimizer.optimized, optimizer.report
+
+
+def pointer_string(path):
+    """
+    Gets the JSONPointer string of a list of nodes.
+    :param path: list of nodes, starting with "#".
+    :return: string.
+    """
+
+    return "/".join(node.replace("~", "~0").replace("/", "~1") for node in path)
+
+
+def is_true_schema(json_schema):
+    """
+    Checks if a subschema accepts every document.
+    :param json_schema: subschema.
+    :return: boolean.
+    """
+
+    return json_schema is True or json_schema == {}
+
+
+def schema_class(json_schema):
+    """
+    Gets the type of the Schema class a subschema is built with.
+    :param json_schema: subschema.
+    :return: one of the `JSON_TYPES` keys, or an empty string for the base Schema class and MultiTypeSchema.
+    """
+
+    if not isinstance(json_schema, dict) or has_key(json_schema, "$ref"):
+        return ""
+    schema_type = infer_type(json_schema)
+    return schema_type if isinstance(schema_type, str) and schema_type in JSON_TYPES else ""
+
+
+def is_untyped(json_schema):
+    """
+    Checks if a subschema has neither a type nor keywords of any type.
+    :param json_schema: subschema.
+    :return: boolean.
+    """
+
+    return not has_key(json_schema, "type") and infer_type(json_schema) == ""
+
+
+def can_merge(json_schema, branch):
+    """
+    Checks if an allOf branch can be merged into its parent subschema without changing what the parent accepts: they
+    share no keyword (nor keyword group) and the merged subschema is built with the same Schema class.
+    :param json_schema: parent subschema.
+    :param branch: allOf branch.
+    :return: boolean.
+    """
+
+    if not isinstance(branch, dict) or any(has_key(branch, key) for key in NOT_MERGED):
+        return False
+    groups = {KEYWORD_GROUPS.get(key, key) for key in json_schema}
+    if any(KEYWORD_GROUPS.get(key, key) in groups for key in branch):
+        return False
+    rest = {key: value for key, value in json_schema.items() if key != "allOf"}
+    merged_class = schema_class(dict(rest, **branch))
+    return (schema_class(rest) == schema_class(branch) == merged_class or
+            (is_untyped(rest) and merged_class == schema_class(branch)) or
+            (is_untyped(branch) and merged_class == schema_class(rest)))
+
+
+def unsatisfiable_reason(json_schema):
+    """
+    Looks for a reason why a subschema can't accept any document.
+    :param json_schema: subschema without $ref.
+    :return: the keyword that makes it unsatisfiable, or None if none was found.
+    """
+
+    if has_key(json_schema, "not") and is_true_schema(json_schema["not"]):
+        return "not"
+    accepted = None
+    schema_type = schema_class(json_schema)
+    if schema_type:
+        accepted = set(JSON_TYPES[schema_type])
+    all_of = json_schema.get("allOf")
+    if isinstance(all_of, list):
+        for branch in all_of:
+            if branch == UNSATISFIABLE:
+                return "allOf"
+            branch_type = schema_class(branch)
+            if branch_type:
+                accepted = set(JSON_TYPES[branch_type]) if accepted is None else accepted & set(JSON_TYPES[branch_type])
+        if accepted is not None and not accepted:
+            return "type" if schema_type else "allOf"
+    for keyword in ("anyOf", "oneOf"):
+        branches = json_schema.get(keyword)
+        if isinstance(branches, list) and branches and all(branch == UNSATISFIABLE for branch in branches):
+            return keyword
+    if schema_type == "object" and isinstance(json_schema.get("properties"), dict) and \
+            isinstance(json_schema.get("required"), list):
+        for key in json_schema["required"]:
+            if json_schema["properties"].get(key) == UNSATISFIABLE:
+                return "required"
+    return None
+
+
+if __name__ == "__main__":
+    with open(sys.argv[1], encoding="utf-8") as schema_file:
+        optimized, report = optimize_schema(json.load(schema_file))
+    print(json.dumps(optimized, indent=2))
+    for rewrite in report:
+        sys.stderr.write(f"{json.dumps(rewrite)}\n")
@@ -1,6 +1,7 @@
 import json
 import re
 from urllib.request import urlopen
+from utils import find_repeated_item, fingerprint
 
 object_keys = ["properties", "required", "additionalProperties", "minProperties", "maxProperties", "dependencies",
                "patternProperties"]
@@ -48,6 +49,9 @@ class Schema:
 
         if has_key(s, "enum"):
             self.enum = s['enum']
+        self.enum_fingerprints = {fingerprint(value) for value in self.enum}
+        """Set with the fingerprint of each enum value."""
+
         self.allOf = []
         """A list that holds all the schema objects which json documents must be valid against."""
 
@@ -124,11 +128,7 @@ class Schema:
                 return Response(False, "\nFailed not on: \n" + str(json.dumps(j, indent=2)) + "\n",
                                 ["not", self.n.index(schema)], [])
         if len(self.enum) > 0:
-            validated = False
-            for object_in_enum in self.enum:
-                if j == object_in_enum:
-                    validated = True
-            if not validated:
+            if fingerprint(j) not in self.enum_fingerprints:
                 return Response(False, "\nFailed enum on: \n" + str(json.dumps(j, indent=2)) +
                                 "\n(valid values:" + str(self.enum) + ")", ["enum"], [])
         return Response(True, "", [], [])
@@ -589,10 +589,10 @@ class ArraySchema(Schema):
                 return Response(False, "\nFailed minItems on:\n" + str(json.dumps(j, indent=2)) +
                                 "\n(size is smaller than " + str(self.minItems) + ")", ["minItems"], [])
         if self.uniqueItems:
-            for index in range(0, len(j)):
-                if j.count(j[index]) > 1:
-                    return Response(False, "\nFailed uniqueItems on:\n" + str(json.dumps(j, indent=2))
-                                    + "\nrepeated item:\n" + json.dumps(j[index], indent=2), ["uniqueItems"], [index])
+            index = find_repeated_item(j)
+            if index != -1:
+                return Response(False, "\nFailed uniqueItems on:\n" + str(json.dumps(j, indent=2))
+                                + "\nrepeated item:\n" + json.dumps(j[index], indent=2), ["uniqueItems"], [index])
         return Response(True, "", [], [])
 
 
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+from classes import *
+import functools
+import os
+import pickle
+import sys
+
+METASCHEMA_URLS = [
+    "http://json-schema.org/draft-03/schema#",
+    "http://json-schema.org/draft-04/schema#",
+    "http://json-schema.org/draft-06/schema#",
+    "http://json-schema.org/draft-07/schema#",
+    "https://json-schema.org/draft/2020-12/schema",
+]
+"""Metaschemas of the dialects supported by the bowtie runner."""
+
+SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "metaschemas.pickle")
+"""Default location of the metaschemas snapshot."""
+
+
+def build_snapshot(urls=METASCHEMA_URLS, path=SNAPSHOT_PATH):
+    """
+    Fetches and builds every metaschema and stores the built Schema objects in a snapshot file. Each one is pickled on
+    its own, so they can be loaded separately. Metaschemas that can't be built are left out of the snapshot.
+    :param urls: list of metaschema urls.
+    :param path: path of the snapshot file.
+    :return: dict where each url that was built holds its Schema object.
+    """
+
+    schemas = {}
+    for url in urls:
+        try:
+            schema = get_schema_from_url(url)
+            # Compiling resolves every reference, so the snapshot holds their targets already built.
+            schema.compile()
+            schemas[url] = schema
+        except Exception as error:
+            sys.stderr.write(f"Skipping {url}: {error!r}\n")
+    pickled = {url: pickle.dumps(schema, protocol=pickle.HIGHEST_PROTOCOL) for url, schema in schemas.items()}
+    with open(path, "wb") as snapshot:
+        pickle.dump(pickled, snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+    return schemas
+
+
+def load_snapshot(path=SNAPSHOT_PATH):
+    """
+    Reads the snapshot stored by `build_snapshot`, without loading any of its Schema objects yet.
+    :param path: path of the snapshot file.
+    :return: dict where each url holds a function without arguments that loads its Schema object, as expected by
+    `register_remote_loaders`. It's empty if there's no usable snapshot.
+    """
+
+    try:
+        with open(path, "rb") as snapshot:
+            pickled = pickle.load(snapshot)
+        return {url: functools.partial(load_schema, data) for url, data in pickled.items()}
+    except (OSError, pickle.UnpicklingError, AttributeError, ImportError, EOFError, TypeError):
+        return {}
+
+
+def load_schema(data):
+    """
+    Loads a Schema object pickled by `build_snapshot`.
+    :param data: bytes of the pickled schema.
+    :return: Schema object, or None if it can't be loaded, for instance because the snapshot was built by another
+    version of the classes.
+    """
+
+    try:
+        return pickle.loads(data)
+    except (pickle.UnpicklingError, AttributeError, ImportError, EOFError, TypeError):
+        return None
+
+
+if __name__ == "__main__":
+    build_snapshot(sys.argv[1:] or METASCHEMA_URLS)
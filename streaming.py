@@ -0,0 +1,875 @@
+#!/usr/bin/env python3
+from classes import *
+from functools import partial
+from json.decoder import scanstring
+import codecs
+import json
+import sys
+
+STREAM_CHUNK_SIZE = 1 << 16
+"""Number of bytes (or characters) read from a stream at once."""
+
+TOKEN = re.compile(r'[ \t\n\r]*(?:([{}\[\]:,])|"([^"\\\x00-\x1f]*)"|(-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][-+]?[0-9]+)?)|'
+                   r'(true|false|null|NaN|Infinity|-Infinity)|(")|\Z)')
+"""Next JSON token, after any whitespace. Its groups are the punctuation, a string without escapes, the number, the
+number fraction, the number exponent, the literal and the opening quote of any other string. When only whitespace is
+left nothing is captured."""
+
+INCOMPLETE_SIZE = 12
+"""Number of characters at the end of the buffer that may be an incomplete token (or escape sequence) instead of an
+invalid one."""
+
+NUMBER_TAIL = re.compile(r"[0-9.eE+-]*\Z")
+"""Characters that could still be part of a number that reaches them, when they are the end of the read input."""
+
+LITERALS = {"true": True, "false": False, "null": None, "NaN": float("nan"), "Infinity": float("inf"),
+            "-Infinity": float("-inf")}
+"""Value of each JSON literal. NaN and the infinities are accepted, like `json.load` does."""
+
+START_MAP = "start_map"
+MAP_KEY = "map_key"
+END_MAP = "end_map"
+START_ARRAY = "start_array"
+END_ARRAY = "end_array"
+VALUE = "value"
+"""Events of a JSON document. Every event is a tuple with one of them and the key (`MAP_KEY`) or scalar value
+(`VALUE`) it carries, or None."""
+
+
+class EventReader:
+    """
+    Incremental JSON tokenizer. It reads a stream in chunks and turns it into events, so only the chunk being read
+    (and the string or number being read, if it's longer) is held in memory.
+    """
+
+    def __init__(self, stream, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        :param stream: binary (UTF-8) or text stream with the document.
+        :param chunk_size: number of bytes (or characters) read at once.
+        """
+
+        self.read = stream.read
+        self.chunk_size = chunk_size
+        self.decoder = None
+        """Incremental UTF-8 decoder, if the stream is binary."""
+
+        self.buffer = ""
+        self.pos = 0
+        self.offset = 0
+        """Number of characters read before the buffer."""
+
+        self.eof = False
+
+    def fill(self, size=None):
+        """
+        Appends the next chunk of the stream to the buffer, dropping what was already consumed.
+        :param size: minimum number of bytes (or characters) to read, if more than `chunk_size` are needed.
+        """
+
+        chunk = self.read(max(size or 0, self.chunk_size))
+        self.eof = not chunk
+        if not isinstance(chunk, str):
+            if self.decoder is None:
+                self.decoder = codecs.getincrementaldecoder("utf-8")()
+            chunk = self.decoder.decode(chunk, final=self.eof)
+        self.offset += self.pos
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+
+    def error(self, message):
+        """
+        :param message: description of the error.
+        :return: ValueError pointing to the character being read.
+        """
+
+        return ValueError(f"{message}: character {self.offset + self.pos}")
+
+    def next_token(self):
+        """
+        Reads the next token.
+        :return: tuple with `"string"`, `"scalar"`, a punctuation character or `"eof"`, and the value of strings and
+        scalars.
+        """
+
+        while True:
+            buffer = self.buffer
+            match = TOKEN.match(buffer, self.pos)
+            group = None if match is None else match.lastindex
+            if group == 1:
+                self.pos = match.end()
+                return match.group(1), None
+            if group == 2:
+                self.pos = match.end()
+                return "string", match.group(2)
+            if group == 3:
+                if self.eof or not NUMBER_TAIL.match(buffer, match.end()):
+                    self.pos = match.end()
+                    if match.group(4) is None and match.group(5) is None:
+                        return "scalar", int(match.group(3))
+                    return "scalar", float(match.group(3))
+            elif group == 6:
+                self.pos = match.end()
+                return "scalar", LITERALS[match.group(6)]
+            elif group == 7:
+                try:
+                    string, end = scanstring(buffer, match.end(), True)
+                except json.JSONDecodeError as error:
+                    # Only a string cut by the end of the buffer may be valid once more input is read.
+                    if self.eof or not error.msg.startswith("Unterminated") and \
+                            error.pos < len(buffer) - INCOMPLETE_SIZE:
+                        self.pos = match.end() - 1
+                        raise self.error(error.msg)
+                else:
+                    self.pos = end
+                    return "string", string
+            elif match is not None:
+                if self.eof:
+                    self.pos = match.end()
+                    return "eof", None
+            elif self.eof or len(buffer[self.pos:].lstrip(" \t\n\r")) >= INCOMPLETE_SIZE:
+                raise self.error("Expecting value")
+            self.fill(len(buffer) - self.pos)
+
+    def events(self):
+        """
+        Reads the whole document.
+        :return: generator of events.
+        """
+
+        containers = []
+        expecting = "value"
+        while True:
+            token, value = self.next_token()
+            if expecting == "value" or expecting == "value or end":
+                if token == "string" or token == "scalar":
+                    yield VALUE, value
+                elif token == "{":
+                    containers.append("}")
+                    expecting = "key or end"
+                    yield START_MAP, None
+                    continue
+                elif token == "[":
+                    containers.append("]")
+                    expecting = "value or end"
+                    yield START_ARRAY, None
+                    continue
+                elif token == "]" and expecting == "value or end":
+                    containers.pop()
+                    yield END_ARRAY, None
+                else:
+                    raise self.error("Expecting value")
+            elif expecting == "key" or expecting == "key or end":
+                if token == "string":
+                    expecting = ":"
+                    yield MAP_KEY, value
+                    continue
+                if token != "}" or expecting == "key":
+                    raise self.error("Expecting property name enclosed in double quotes")
+                containers.pop()
+                yield END_MAP, None
+            elif expecting == ":":
+                if token != ":":
+                    raise self.error("Expecting ':' delimiter")
+                expecting = "value"
+                continue
+            elif expecting == ", or end":
+                if token == ",":
+                    expecting = "key" if containers[-1] == "}" else "value"
+                    continue
+                if token != containers[-1]:
+                    raise self.error("Expecting ',' delimiter")
+                containers.pop()
+                yield (END_MAP if token == "}" else END_ARRAY), None
+            elif token == "eof":
+                return
+            else:
+                raise self.error("Extra data")
+            expecting = ", or end" if containers else "end"
+
+
+class BufferReader:
+    """
+    Binary stream over a bytes-like object. Its reads are views of the object instead of copies.
+    """
+
+    __slots__ = ("data", "pos")
+
+    def __init__(self, data):
+        """
+        :param data: bytes-like object.
+        """
+
+        self.data = memoryview(data).cast("B")
+        self.pos = 0
+
+    def read(self, size):
+        """
+        :param size: maximum number of bytes to read.
+        :return: memoryview with the next bytes, empty at the end.
+        """
+
+        chunk = self.data[self.pos:self.pos + size]
+        self.pos += len(chunk)
+        return chunk
+
+
+def iter_events(stream, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Reads a JSON document from a stream as events, without loading it.
+    :param stream: binary (UTF-8) or text stream.
+    :param chunk_size: number of bytes (or characters) read at once.
+    :return: generator of events.
+    """
+
+    return EventReader(stream, chunk_size).events()
+
+
+class ContainerCheck:
+    """
+    Validates an object or array against a schema while its events arrive. Sub documents are validated against the
+    schemas the check asks for and their responses are recorded, and when the container ends the check builds the
+    response `schema.validate` would return, checking the keywords in the same order. This class checks the keywords
+    every schema has; its subclasses check the keywords of object, array and multi type schemas.
+    When violations are tracked, the first keyword the container certainly violates is also reported as soon as it's
+    found.
+    """
+
+    __slots__ = ("schema", "tag", "any_of", "one_of", "all_of", "not_check", "needs_value", "owner", "branch_failures")
+
+    def __init__(self, schema, tag):
+        """
+        :param schema: Schema object that is not a reference.
+        :param tag: type tag of the container, `"object"` or `"array"`.
+        """
+
+        self.schema = schema
+        self.tag = tag
+        self.any_of = [container_check(branch, tag) for branch in schema.anyOf] if schema.anyOf else []
+        self.one_of = [container_check(branch, tag) for branch in schema.oneOf] if schema.oneOf else []
+        self.all_of = [container_check(branch, tag) for branch in schema.allOf] if schema.allOf else []
+        self.not_check = None if schema.notThis is None else container_check(schema.notThis, tag)
+        self.needs_value = schema.has_enum() or schema.has_const()
+        """Whether the container must be fingerprinted, to compare it with the enum or const keyword."""
+
+        self.owner = None
+        """Function the first violation is reported to, while violations are tracked and none was reported."""
+
+        self.branch_failures = None
+        """Violation of each anyOf and oneOf branch, by keyword and index, once one of them is reported."""
+
+    def track_violations(self, owner):
+        """
+        Makes this check, and the checks it's made of, report violations.
+        :param owner: function called with the Response of the first violation of the container.
+        """
+
+        self.owner = owner
+        for keyword, branches in (("anyOf", self.any_of), ("oneOf", self.one_of), ("allOf", self.all_of)):
+            for i in range(0, len(branches)):
+                branches[i].track_violations(partial(self.branch_violated, keyword, i))
+
+    def start(self):
+        """
+        Reports the violations that are known as soon as the container starts. This check's schema has no keywords
+        for the container's type, so it violates its type keyword if it has one.
+        """
+
+        if type(self.schema) is not Schema:
+            self.violated(self.schema.validate_type(None, self.tag))
+
+    def violated(self, response):
+        """
+        Reports a violation of the container, if violations are tracked and none was reported yet.
+        :param response: Response object of the violation, which the owner may change.
+        """
+
+        owner = self.owner
+        if owner is not None:
+            self.owner = None
+            owner(response)
+
+    def branch_violated(self, keyword, index, response):
+        """
+        Reports the violation of an anyOf, oneOf or allOf branch. Every branch must be violated for anyOf and oneOf
+        to be violated, and then the violation of the last one is reported, as `Schema.validate` does.
+        :param keyword: `"anyOf"`, `"oneOf"` or `"allOf"`.
+        :param index: index of the branch.
+        :param response: Response object of the violation.
+        """
+
+        if keyword != "allOf":
+            if self.branch_failures is None:
+                self.branch_failures = {"anyOf": {}, "oneOf": {}}
+            failures = self.branch_failures[keyword]
+            failures[index] = response
+            index = len(self.any_of if keyword == "anyOf" else self.one_of) - 1
+            if len(failures) <= index:
+                return
+            response = failures[index]
+        response.add_upward_document_and_schema_nodes([], [index])
+        response.add_upward_document_and_schema_nodes([], self.schema.build_nodes([keyword]))
+        self.violated(response)
+
+    def child_violated(self, keyword, node, response):
+        """
+        Reports the violation of a sub document.
+        :param keyword: keyword the sub document was validated for.
+        :param node: key or index of the sub document.
+        :param response: Response object of the sub document's violation.
+        """
+
+        self.add_child_nodes(keyword, node, response)
+        self.violated(response)
+
+    def add_child_nodes(self, keyword, node, response):
+        """
+        Adds the nodes of a sub document and the keyword it was validated for to its response.
+        :param keyword: keyword the sub document was validated for.
+        :param node: key or index of the sub document.
+        :param response: Response object of the sub document.
+        """
+
+    def sub_checks(self):
+        """
+        :return: list of checks of the same container this one is made of.
+        """
+
+        checks = self.any_of + self.one_of + self.all_of
+        if self.not_check is not None:
+            checks.append(self.not_check)
+        return checks
+
+    def child_schemas(self, node):
+        """
+        Lists the schemas a sub document must be validated against, right before its events arrive.
+        :param node: key or index of the sub document.
+        :return: list of `(schema, check, keyword, node)` tuples. Each response is recorded with
+        `check.record(keyword, node, response)`. When the schema is None the sub document itself is recorded.
+        """
+
+        return ()
+
+    def record(self, keyword, node, response):
+        """
+        Records the response of a sub document.
+        :param keyword: keyword the sub document was validated for.
+        :param node: key or index of the sub document.
+        :param response: Response object, or the sub document if it was asked for.
+        """
+
+    def close(self, value):
+        """
+        Builds the response of the container once it ended.
+        :param value: `typed_digest` of the container, if it was fingerprinted.
+        :return: Response object.
+        """
+
+        response = self.close_base(value)
+        if not response.is_valid or type(self.schema) is Schema:
+            return response
+        return self.schema.validate_type(None, self.tag)
+
+    def close_base(self, value):
+        """
+        Builds the response of the keywords every schema has, as `Schema.validate` does.
+        :param value: `typed_digest` of the container, if it was fingerprinted.
+        :return: Response object.
+        """
+
+        schema = self.schema
+        if self.any_of:
+            count, response = count_valid_responses([check.close(value) for check in self.any_of], 1)
+            if count < 1:
+                response.add_upward_document_and_schema_nodes([], schema.build_nodes(["anyOf"]))
+                return response
+        if self.one_of:
+            count, response = count_valid_responses([check.close(value) for check in self.one_of], 2)
+            if count < 1:
+                response.add_upward_document_and_schema_nodes([], schema.build_nodes(["oneOf"]))
+                return response
+            if count > 1:
+                return Response.invalid(None, [], schema.whole_schema, schema.build_nodes(["oneOf"]))
+        if self.all_of:
+            count, response = count_valid_responses([check.close(value) for check in self.all_of])
+            if not response.is_valid:
+                response.add_upward_document_and_schema_nodes([], schema.build_nodes(["allOf"]))
+                return response
+        if self.not_check is not None and self.not_check.close(value).is_valid:
+            return Response.invalid(None, [], schema.whole_schema, schema.build_nodes(["not"]))
+        if schema.has_enum() or schema.has_const():
+            enum_digests, const_digest = schema.enum_and_const_digests()
+            if schema.has_enum() and value not in enum_digests:
+                return Response.invalid(None, [], schema.whole_schema, schema.build_nodes(["enum"]))
+            if schema.has_const() and value != const_digest:
+                return Response.invalid(None, [], schema.whole_schema, schema.build_nodes(["const"]))
+        return VALID
+
+
+class ObjectCheck(ContainerCheck):
+    """
+    Check of an object against an object schema. Only the number of keys, the keys the required and dependencies
+    keywords ask about and the first failure of each keyword are kept.
+    """
+
+    __slots__ = ("size", "keys", "tracked", "property_failures", "dependency_failures", "additional_failure",
+                 "pattern_failure")
+
+    def __init__(self, schema, tag):
+        super().__init__(schema, tag)
+        self.size = 0
+        self.keys = set()
+        """Keys of the object that are in `tracked`."""
+
+        self.tracked = set(schema.required)
+        for key, list_of_dependencies in schema.property_dependencies.items():
+            self.tracked.add(key)
+            self.tracked.update(list_of_dependencies)
+        self.property_failures = {}
+        self.dependency_failures = {}
+        self.additional_failure = None
+        self.pattern_failure = None
+
+    def child_schemas(self, key):
+        schema = self.schema
+        self.size += 1
+        if key in self.tracked:
+            self.keys.add(key)
+        children = []
+        if key in schema.properties:
+            children.append((schema.properties[key], self, "properties", key))
+        if key in schema.schema_dependencies:
+            children.append((schema.schema_dependencies[key], self, "dependencies", key))
+        pattern, additional = schema.key_classifier.classify(key)
+        if additional:
+            if not isinstance(schema.additionalProperties, bool):
+                children.append((schema.additionalProperties, self, "additionalProperties", key))
+            elif not schema.additionalProperties and self.additional_failure is None:
+                self.additional_failure = Response.invalid(None, [key], schema.whole_schema,
+                                                           schema.build_nodes(["additionalProperties"]))
+                self.violated(self.additional_failure.copy())
+        if pattern is not None:
+            children.append((schema.patternProperties[pattern], self, "patternProperties", key))
+        if self.owner is not None and schema.maxProperties is not None and self.size > schema.maxProperties:
+            self.violated(Response.invalid(None, [], schema.whole_schema, schema.build_nodes(["maxProperties"])))
+        return children
+
+    def start(self):
+        pass
+
+    def add_child_nodes(self, keyword, key, response):
+        response.set_document(None)
+        if keyword == "patternProperties":
+            response.add_upward_document_and_schema_nodes([key], ["patternProperties",
+                                                                  self.schema.key_classifier.classify(key)[0]])
+        else:
+            response.add_upward_document_and_schema_nodes([key], self.schema.build_nodes([keyword, key]))
+
+    def record(self, keyword, key, response):
+        if response.is_valid:
+            return
+        if self.owner is not None:
+            self.child_violated(keyword, key, response.copy())
+        self.add_child_nodes(keyword, key, response)
+        if keyword == "properties":
+            self.property_failures.setdefault(key, response)
+        elif keyword == "dependencies":
+            self.dependency_failures.setdefault(key, response)
+        elif keyword == "additionalProperties":
+            if self.additional_failure is None:
+                self.additional_failure = response
+        elif self.pattern_failure is None:
+            self.pattern_failure = response
+
+    def close(self, value):
+        schema = self.schema
+        response = self.close_base(value)
+        if not response.is_valid:
+            return response
+        for key in schema.required:
+            if key not in self.keys:
+                return Response.invalid(None, [], schema.whole_schema, schema.build_nodes(["required", key]))
+        for key in schema.properties:
+            response = self.property_failures.get(key)
+            if response is not None:
+                return response
+        if schema.minProperties is not None and self.size < schema.minProperties:
+            return Response.invalid(None, [], schema.whole_schema, schema.build_nodes(["minProperties"]))
+        if schema.maxProperties is not None and self.size > schema.maxProperties:
+            return Response.invalid(None, [], schema.whole_schema, schema.build_nodes(["maxProperties"]))
+        for key, list_of_dependencies in schema.property_dependencies.items():
+            if key in self.keys and not has_all_keys(self.keys, list_of_dependencies):
+                return Response.invalid(None, [key], schema.whole_schema, schema.build_nodes(["dependencies", key]))
+        for key in schema.schema_dependencies:
+            response = self.dependency_failures.get(key)
+            if response is not None:
+                return response
+        if self.additional_failure is not None:
+            return self.additional_failure
+        if self.pattern_failure is not None:
+            return self.pattern_failure
+        return VALID
+
+
+class ArrayCheck(ContainerCheck):
+    """
+    Check of an array against an array schema. Only the number of items, the first failure of the items keyword and,
+    if items must be unique, the fingerprint of every item are kept. Items that are containers are fingerprinted by
+    their digest, so uniqueItems needs memory for the number of items, not for their size.
+    """
+
+    __slots__ = ("size", "items_failure", "first_indexes", "repeated_index")
+
+    def __init__(self, schema, tag):
+        super().__init__(schema, tag)
+        self.size = 0
+        self.items_failure = None
+        self.first_indexes = {}
+        """Index of the first item with each fingerprint, if items must be unique."""
+
+        self.repeated_index = -1
+
+    def child_schemas(self, index):
+        schema = self.schema
+        self.size += 1
+        children = []
+        if not isinstance(schema.items, list):
+            children.append((schema.items, self, "items", index))
+        elif index < len(schema.items):
+            children.append((schema.items[index], self, "items", index))
+        if schema.uniqueItems:
+            children.append((None, self, "uniqueItems", index))
+        if self.owner is not None:
+            if not schema.additional_items_are_allowed() and index == len(schema.items):
+                self.violated(Response.invalid(None, [index], schema.whole_schema,
+                                               schema.build_nodes(["additionalItems"])))
+            elif schema.maxItems is not None and self.size > schema.maxItems:
+                self.violated(Response.invalid(None, [], schema.whole_schema, schema.build_nodes(["maxItems"])))
+        return children
+
+    def start(self):
+        pass
+
+    def add_child_nodes(self, keyword, index, response):
+        response.set_document(None)
+        if isinstance(self.schema.items, list):
+            response.add_upward_document_and_schema_nodes([index], self.schema.build_nodes(["items", index]))
+        else:
+            response.add_upward_document_and_schema_nodes([index], self.schema.build_nodes(["items"]))
+
+    def record(self, keyword, index, response):
+        if keyword == "uniqueItems":
+            first_index = self.first_indexes.setdefault(response, index)
+            if first_index != index and (self.repeated_index == -1 or first_index < self.repeated_index):
+                self.repeated_index = first_index
+                self.violated(Response.invalid(None, [], self.schema.whole_schema,
+                                               self.schema.build_nodes(["uniqueItems", first_index])))
+        elif not response.is_valid:
+            if self.owner is not None:
+                self.child_violated(keyword, index, response.copy())
+            if self.items_failure is None:
+                self.add_child_nodes(keyword, index, response)
+                self.items_failure = response
+
+    def close(self, value):
+        schema = self.schema
+        response = self.close_base(value)
+        if not response.is_valid:
+            return response
+        if self.items_failure is not None:
+            return self.items_failure
+        if not schema.additional_items_are_allowed() and self.size > len(schema.items):
+            return Response.invalid(None, [len(schema.items)], schema.whole_schema,
+                                    schema.build_nodes(["additionalItems"]))
+        if schema.minItems is not None and self.size < schema.minItems:
+            return Response.invalid(None, [], schema.whole_schema, schema.build_nodes(["minItems"]))
+        if schema.maxItems is not None and self.size > schema.maxItems:
+            return Response.invalid(None, [], schema.whole_schema, schema.build_nodes(["maxItems"]))
+        if self.repeated_index != -1:
+            return Response.invalid(None, [], schema.whole_schema, schema.build_nodes(["uniqueItems",
+                                                                                       self.repeated_index]))
+        return VALID
+
+
+class MultiTypeCheck(ContainerCheck):
+    """
+    Check of a container against a schema with a list of types, which delegates to the check of its type schema.
+    """
+
+    __slots__ = ("type_check",)
+
+    def __init__(self, schema, tag):
+        super().__init__(schema, tag)
+        type_schema = schema.type_schemas.get(tag)
+        self.type_check = None if type_schema is None else container_check(type_schema, tag)
+
+    def sub_checks(self):
+        checks = super().sub_checks()
+        if self.type_check is not None:
+            checks.append(self.type_check)
+        return checks
+
+    def track_violations(self, owner):
+        super().track_violations(owner)
+        if self.type_check is not None:
+            self.type_check.track_violations(self.violated)
+
+    def start(self):
+        if self.type_check is None:
+            self.violated(Response.invalid(None, [], self.schema.whole_schema, self.schema.build_nodes(["type"])))
+
+    def close(self, value):
+        response = self.close_base(value)
+        if not response.is_valid:
+            return response
+        if self.type_check is None:
+            return Response.invalid(None, [], self.schema.whole_schema, self.schema.build_nodes(["type"]))
+        return self.type_check.close(value)
+
+
+def container_check(schema, tag):
+    """
+    Builds the check of a container against a schema.
+    :param schema: Schema object.
+    :param tag: type tag of the container, `"object"` or `"array"`.
+    :return: ContainerCheck object.
+    """
+
+    schema = schema.resolve()
+    if type(schema) is ObjectSchema and tag == "object":
+        return ObjectCheck(schema, tag)
+    if type(schema) is ArraySchema and tag == "array":
+        return ArrayCheck(schema, tag)
+    if type(schema) is MultiTypeSchema:
+        return MultiTypeCheck(schema, tag)
+    return ContainerCheck(schema, tag)
+
+
+def count_valid_responses(responses, limit=None):
+    """
+    Same as `count_and_validate_schema_array`, with the responses of each schema.
+    :param responses: list of Response objects.
+    :param limit: if it's given, the count stops as soon as `limit` responses were valid.
+    :return: tuple with how many responses were valid and a Response object.
+    """
+
+    count = 0
+    last_invalid_index = -1
+    for i in range(0, len(responses)):
+        if responses[i].is_valid:
+            count += 1
+            if count == limit:
+                return count, VALID
+        else:
+            last_invalid_index = i
+    if last_invalid_index == NONE:
+        return count, VALID
+    responses[last_invalid_index].add_upward_document_and_schema_nodes([], [last_invalid_index])
+    return count, responses[last_invalid_index]
+
+
+class Container:
+    """
+    Object or array whose events are being read.
+    """
+
+    __slots__ = ("tag", "node", "checks", "targets", "digest", "next_index")
+
+    def __init__(self, tag, node, checks, targets, digest):
+        """
+        :param tag: `"object"` or `"array"`.
+        :param node: key or index of the container inside its parent.
+        :param checks: every ContainerCheck of the container, including the ones it's made of.
+        :param targets: list of `(check, parent_check, keyword, node)` tuples, with the checks whose response is
+        recorded in the parent check once the container ends. When the check is None, the container's fingerprint is.
+        :param digest: ContainerDigest of the container, or None if it doesn't need to be fingerprinted.
+        """
+
+        self.tag = tag
+        self.node = node
+        self.checks = checks
+        self.targets = targets
+        self.digest = digest
+        self.next_index = 0
+
+
+def validate_events(schema, events, stop_early=False, load_document=None):
+    """
+    Validates a document read as events against a schema. Only the open containers and their checks are held in
+    memory: containers compared with an enum, const or uniqueItems are never built, only a fixed size digest of each
+    one (see `ContainerDigest`), and uniqueItems keeps the fingerprint of every item of its array.
+    :param schema: Schema object.
+    :param events: iterable of events of a single document.
+    :param stop_early: if True, no more events are read once the document certainly violates the schema, and the
+    response points to the first violation found. It's the response `schema.validate` returns when the document has
+    a single violation; otherwise `schema.validate` may point to a different one.
+    :param load_document: function without arguments that returns the whole document. If it's given, the document
+    pointer of an invalid response points to it, and it's only called once that pointer is read.
+    :return: the same Response object `schema.validate` returns for the document, unless it stopped early.
+    """
+
+    violations = [] if stop_early else None
+    stack = []
+    response = None
+    node = None
+    for event, value in events:
+        if violations:
+            return with_document(violations[0], load_document)
+        if event == MAP_KEY:
+            node = value
+            continue
+        if event == END_MAP or event == END_ARRAY:
+            container = stack.pop()
+            container_fingerprint = None if container.digest is None else container.digest.fingerprint()
+            response = finish(container.targets, container.tag, container_fingerprint)
+            if stack and stack[-1].digest is not None:
+                stack[-1].digest.add(container_fingerprint[1], container.node)
+            continue
+        if not stack:
+            children = ((schema, None, None, None),)
+        else:
+            parent = stack[-1]
+            if parent.tag == "array":
+                node = parent.next_index
+                parent.next_index += 1
+            checks = parent.checks
+            if len(checks) == 1:
+                children = checks[0].child_schemas(node)
+            else:
+                children = [child for check in checks for child in check.child_schemas(node)]
+        if event == VALUE:
+            tag = TYPE_TAGS.get(type(value)) or type_tag(value)
+            for child, check, keyword, child_node in children:
+                if child is None:
+                    check.record(keyword, child_node, fingerprint(value))
+                elif child is not TRUE_SCHEMA:
+                    response = child.compile_tagged()(value, tag)
+                    if check is not None:
+                        check.record(keyword, child_node, response)
+            if stack and stack[-1].digest is not None:
+                stack[-1].digest.add(scalar_encoding(value), node)
+            continue
+        tag = "object" if event == START_MAP else "array"
+        checks = []
+        targets = []
+        needs_digest = bool(stack) and stack[-1].digest is not None
+        for child, check, keyword, child_node in children:
+            if child is None:
+                targets.append((None, check, keyword, child_node))
+                needs_digest = True
+            elif child is not TRUE_SCHEMA:
+                root = container_check(child, tag)
+                targets.append((root, check, keyword, child_node))
+                if stop_early:
+                    root.track_violations(violations.append if check is None else
+                                          partial(check.child_violated, keyword, child_node))
+                start = len(checks)
+                checks.append(root)
+                while start < len(checks):
+                    checks.extend(checks[start].sub_checks())
+                    start += 1
+        needs_digest = needs_digest or any(check.needs_value for check in checks)
+        if stop_early:
+            for check in checks:
+                check.start()
+        stack.append(Container(tag, node, checks, targets, ContainerDigest(tag == "object") if needs_digest else None))
+    if violations:
+        return with_document(violations[0], load_document)
+    if response is None:
+        return VALID
+    return with_document(response, load_document)
+
+
+def finish(targets, tag, container_fingerprint):
+    """
+    Records the responses of the checks of a container that ended in their parent checks.
+    :param targets: `targets` of the Container.
+    :param tag: type tag of the container.
+    :param container_fingerprint: fingerprint of the container's digest, if it has one.
+    :return: response of the last check, which is the response of the whole document if it was the outermost one.
+    """
+
+    value = None if container_fingerprint is None else (dict if tag == "object" else list, container_fingerprint)
+    response = VALID
+    for check, parent_check, keyword, node in targets:
+        response = container_fingerprint if check is None else check.close(value)
+        if parent_check is not None:
+            parent_check.record(keyword, node, response)
+    return response
+
+
+def with_document(response, load_document):
+    """
+    Sets the document of an invalid response of `validate_events`.
+    :param response: Response object.
+    :param load_document: function that returns the document, or None if it can't be loaded.
+    :return: the same response.
+    """
+
+    if load_document is not None and not response.is_valid:
+        response.set_document_loader(load_document)
+    return response
+
+
+def validate_stream(schema, stream, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Validates a document read from a stream against a schema, without loading the whole document.
+    :param schema: Schema object.
+    :param stream: binary (UTF-8) or text stream with the document.
+    :param chunk_size: number of bytes (or characters) read at once.
+    :return: the same Response object `schema.validate` returns for the document. If the stream is seekable, the
+    document is read again from it when the document pointer of the response is read; otherwise the document of that
+    pointer is not set.
+    """
+
+    load_document = None
+    if hasattr(stream, "seekable") and stream.seekable():
+        start = stream.tell()
+
+        def load_document():
+            stream.seek(start)
+            return json.load(stream)
+    return validate_events(schema, iter_events(stream, chunk_size), load_document=load_document)
+
+
+def validate_bytes(schema, data, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Parses and validates a document in a single pass, stopping as soon as the document certainly violates the schema.
+    Whatever comes after that violation is never read, so it's not checked to be valid JSON either.
+    :param schema: Schema object.
+    :param data: bytes-like object (for instance bytes or a memoryview) with the UTF-8 document.
+    :param chunk_size: number of bytes decoded at once.
+    :return: Response object, pointing to the first violation found (see `validate_events`).
+    """
+
+    return validate_events(schema, iter_events(BufferReader(data), chunk_size), stop_early=True,
+                           load_document=lambda: json.loads(bytes(data)))
+
+
+def validate_file(schema, path, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Validates the document of a file against a schema, reading it as a stream.
+    :param schema: Schema object.
+    :param path: path of the document.
+    :param chunk_size: number of bytes read at once.
+    :return: Response object, whose document pointer loads the file again once it's read.
+    """
+
+    with open(path, "rb") as document_file:
+        response = validate_events(schema, iter_events(document_file, chunk_size))
+    return with_document(response, partial(load_file, path))
+
+
+def load_file(path):
+    """
+    :param path: path of a JSON document.
+    :return: the document.
+    """
+
+    with open(path, "rb") as document_file:
+        return json.load(document_file)
+
+
+if __name__ == "__main__":
+    response = validate_file(get_schema_from_file(sys.argv[1]), sys.argv[2])
+    print(response)
+    sys.exit(0 if response.is_valid else 1)
@@ -0,0 +1,77 @@
+TREE = {
+    "definitions": {
+        "node": {
+            "type": "object",
+            "properties": {
+                "value": {"type": "integer"},
+                "children": {"type": "array", "items": {"$ref": "#/definitions/node"}},
+            },
+            "required": ["value"],
+        },
+    },
+    "$ref": "#/definitions/node",
+}
+"""Recursive schema of a tree of nodes."""
+
+CASES = [
+    ({"type": ["object", "null"], "properties": {"a": {"type": "string"}}, "required": ["a"]},
+     [None, {"a": "x"}, {"a": 1}, {}, "x", 1]),
+    ({"type": ["integer", "boolean"], "enum": [1, True, 3]}, [1, True, 3, 2, False, 1.0, None]),
+    ({"type": ["array", "string"], "items": {"type": "integer"}, "minItems": 1}, [[1], [], ["x"], "s", 1]),
+    ({"definitions": {"n": {"type": ["number", "null"], "anyOf": [{"type": "number"}, {"type": "null"}]}},
+      "properties": {"x": {"$ref": "#/definitions/n"}, "y": {"type": ["string", "string"]}}},
+     [{"x": 1.5}, {"x": None}, {"x": 1}, {"y": "a"}, {"y": 2}]),
+    ({"oneOf": [{"type": ["string", "null"]}, {"type": ["integer", "null"]}]}, ["a", 1, None, 1.5]),
+    ({"type": "object"}, [{}, [], 1, None]),
+    ({"type": "string"}, ["a", 1, None]),
+    ({"type": "integer"}, [1, 1.0, True, "x"]),
+    ({"type": "number"}, [1, 1.5, True]),
+    ({"type": "boolean"}, [True, 0]),
+    ({"type": "null"}, [None, 0]),
+    ({"type": "array", "items": {"type": "string"}}, [["a"], ["a", 1], "x"]),
+    ({"type": "array", "items": [{"type": "string"}, {"type": "integer"}], "additionalItems": False},
+     [["a", 1], ["a", 1, 2], [1], ["a"]]),
+    ({"type": "array", "uniqueItems": True},
+     [[1, 2], [1, 2, 1], [{"a": 1}, {"a": 1}], [1, True], ["b", "a", "a", "b"], [[1], [True]]]),
+    ({"minItems": 2, "maxItems": 3}, [[1], [1, 2], [1, 2, 3, 4]]),
+    ({"properties": {"a": {"type": "string"}, "b": {"type": "integer"}}, "required": ["a"]},
+     [{"a": "x"}, {"b": 1}, {"a": 1}, {"a": "x", "b": "y"}]),
+    ({"properties": {"a": {}}, "additionalProperties": False}, [{"a": 1}, {"a": 1, "b": 2}]),
+    ({"properties": {"a": {}}, "additionalProperties": {"type": "string"}}, [{"a": 1, "b": "x"}, {"a": 1, "b": 2}]),
+    ({"patternProperties": {"^x": {"type": "string"}, "y$": {"type": "integer"}}, "additionalProperties": False},
+     [{"x1": "a"}, {"x1": 1}, {"ay": 1}, {"ay": "a"}, {"z": 1}, {"": 1}, {"xy": "a"}]),
+    ({"patternProperties": {"a": {"type": "string"}}}, [{"bab": 1}, {"bab": "1"}]),
+    ({"minProperties": 1, "maxProperties": 2}, [{}, {"a": 1}, {"a": 1, "b": 2, "c": 3}]),
+    ({"dependencies": {"a": ["b"], "c": {"type": "string"}}}, [{"a": 1}, {"a": 1, "b": 2}, {"c": 1}, {"c": "x"}]),
+    ({"enum": [1, "a", None, [1], {"k": True}]}, [1, 1.0, True, "a", None, [1], [True], {"k": True}, {"k": 1}, 2]),
+    ({"anyOf": [{"type": "string"}, {"type": "integer"}]}, ["a", 1, None]),
+    ({"oneOf": [{"type": "string"}, {"type": "string", "maxLength": 3}]}, ["ab", 1]),
+    ({"allOf": [{"type": "object", "required": ["a"]}, {"properties": {"a": {"type": "integer"}}}]},
+     [{"a": 1}, {"a": "x"}, {}, 5]),
+    ({"not": {"type": "string"}}, ["x", 1]),
+    ({"type": "object", "properties": {"n": {"type": "array", "items": {"properties": {"m": {"enum": ["x", "y"]}}}}}},
+     [{"n": [{"m": "x"}, {"m": "z"}]}, {"n": [{"m": "y"}]}]),
+    (TREE, [{"value": 1}, {"value": 1, "children": [{"value": 2}, {"value": "x"}]}, {"children": []},
+            {"value": 1, "children": [{"value": 2, "children": [{}]}]}]),
+    ({"anyOf": [
+        {"type": "object", "properties": {"kind": {"enum": ["a"]}, "x": {"type": "string"}}, "required": ["kind"]},
+        {"type": "object", "properties": {"kind": {"enum": ["b"]}, "y": {"type": "integer"}}, "required": ["kind"]},
+    ]},
+     [{"kind": "a", "x": "s"}, {"kind": "b", "y": 1}, {"kind": "b", "y": "s"}, {"kind": "c"}, 3]),
+    ({"allOf": [{"allOf": [{"type": "object"}, {}]}, {"required": ["a"]}]}, [{"a": 1}, {}, 1]),
+    ({"const": {"a": [1, 2.5]}}, [{"a": [1, 2.5]}, {"a": [1.0, 2.5]}, {"a": [True, 2.5]}, {"a": [1]}, None]),
+    ({"const": None, "enum": [None, 1]}, [None, 1, 1.0, False]),
+    ({"type": "object", "properties": {"c": {"const": "x"}}}, [{"c": "x"}, {"c": "y"}, {}]),
+]
+"""Schemas, each with documents to validate against it, that cover every keyword the validator supports."""
+
+
+def pointers(response):
+    """
+    :param response: Response object.
+    :return: True if the response is valid, otherwise a tuple with the document and schema pointer nodes.
+    """
+
+    if response.is_valid:
+        return True
+    return response.document_pointer.nodes, response.schema_pointer.nodes
@@ -0,0 +1,36 @@
+import json
+
+import classes
+from classes import export_any_of_orders, freeze_any_of_orders, get_schema, load_any_of_orders
+
+SCHEMA = {"properties": {"a": {"anyOf": [{"type": "string"}, {"type": "null"}, {"type": "integer"}]}}}
+
+
+def test_exported_orders_round_trip_through_json(monkeypatch):
+    monkeypatch.setattr(classes, "ANY_OF_WARM_UP", 2)
+    learned = get_schema(SCHEMA)
+    is_valid = learned.compile_is_valid()
+    assert is_valid({"a": 1}) and is_valid({"a": 1}) and is_valid({"a": None})
+    orders = json.loads(json.dumps(export_any_of_orders(learned)))
+    assert [exported["order"] for exported in orders.values()] == [[2, 0, 1]]
+
+    loaded = get_schema(SCHEMA)
+    load_any_of_orders(loaded, orders)
+    is_valid = loaded.compile_is_valid()
+    expected = {key: dict(exported, successes=[0, 0, 0]) for key, exported in orders.items()}
+    assert export_any_of_orders(loaded) == expected
+    for _ in range(4):
+        assert is_valid({"a": "x"})
+    # Loaded orders are frozen by default, so they don't learn anymore.
+    assert loaded.properties["a"].any_of_order.order == (2, 0, 1)
+    assert not is_valid({"a": 1.5})
+
+
+def test_frozen_orders_keep_their_current_order(monkeypatch):
+    monkeypatch.setattr(classes, "ANY_OF_WARM_UP", 2)
+    schema = get_schema(SCHEMA)
+    is_valid = schema.compile_is_valid()
+    freeze_any_of_orders(schema)
+    for _ in range(4):
+        assert is_valid({"a": 1})
+    assert schema.properties["a"].any_of_order.order == (0, 1, 2)
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+import codegen
+from classes import get_schema
+from codegen import load_validator
+from schema_cases import CASES, pointers
+
+
+@pytest.mark.parametrize("json_schema, documents", CASES)
+def test_generated_validators_return_the_same_responses(tmp_path, json_schema, documents):
+    validate = load_validator(json_schema, cache_dir=tmp_path)
+    schema = get_schema(json_schema)
+    for document in documents:
+        assert pointers(validate(document)) == pointers(schema.validate(document))
+
+
+@pytest.mark.parametrize("json_schema, reordered, document", [
+    ({"minProperties": 0, "uniqueItems": True}, {"uniqueItems": True, "minProperties": 0}, {}),
+    ({"multipleOf": 2, "maxLength": 0}, {"maxLength": 0, "multipleOf": 2}, "xa"),
+])
+def test_schemas_that_only_differ_in_key_order_get_their_own_modules(tmp_path, json_schema, reordered, document):
+    for each_schema in (json_schema, reordered):
+        validate = load_validator(each_schema, cache_dir=tmp_path)
+        assert pointers(validate(document)) == pointers(get_schema(each_schema).validate(document))
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_modules_of_older_generator_versions_are_not_reused(tmp_path, monkeypatch):
+    json_schema = {"type": "string", "title": "generator version"}
+    load_validator(json_schema, cache_dir=tmp_path)
+    [old_module] = os.listdir(tmp_path)
+    # A module of the previous version that validates differently must be ignored.
+    (tmp_path / old_module).write_text("from utils import VALID\n\n\ndef validate(document):\n    return VALID\n")
+
+    monkeypatch.setattr(codegen, "GENERATOR_VERSION", codegen.GENERATOR_VERSION + 1)
+    validate = load_validator(json_schema, cache_dir=tmp_path)
+    assert not validate(1).is_valid
+    assert sorted(os.listdir(tmp_path)) == sorted([old_module, old_module.replace(
+        f"jsch_v{codegen.GENERATOR_VERSION - 1}_", f"jsch_v{codegen.GENERATOR_VERSION}_")])
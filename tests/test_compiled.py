@@ -0,0 +1,67 @@
+import glob
+import json
+import os
+
+import pytest
+
+from classes import get_schema
+from schema_cases import CASES, pointers
+
+SUITE = os.environ.get("JSON_SCHEMA_TEST_SUITE")
+"""Checkout of the official JSON-Schema-Test-Suite. Its cases are only compared if it's set."""
+
+SUITE_DRAFTS = ["draft4", "draft6", "draft7"]
+"""Drafts of the official suite whose cases are compared."""
+
+
+def suite_cases():
+    """
+    :return: list of pytest params, one for each case of the official suite with its schema and test documents.
+    """
+
+    if SUITE is None:
+        return []
+    cases = []
+    for draft in SUITE_DRAFTS:
+        for path in sorted(glob.glob(os.path.join(SUITE, "tests", draft, "*.json"))):
+            with open(path, encoding="utf-8") as suite_file:
+                for case in json.load(suite_file):
+                    documents = [test["data"] for test in case["tests"]]
+                    case_id = f"{draft}/{os.path.basename(path)}/{case['description']}"
+                    cases.append(pytest.param(case["schema"], documents, id=case_id))
+    return cases
+
+
+def outcome(function, document):
+    """
+    :return: the result of `function(document)`, or the type of the exception it raised.
+    """
+
+    try:
+        return function(document)
+    except Exception as error:
+        return type(error)
+
+
+@pytest.mark.parametrize("json_schema, documents", CASES)
+def test_compiled_validators_return_the_same_responses(json_schema, documents):
+    schema = get_schema(json_schema)
+    validate = schema.compile()
+    is_valid = schema.compile_is_valid()
+    for document in documents:
+        expected = schema.validate(document)
+        assert pointers(validate(document)) == pointers(expected)
+        assert is_valid(document) == expected.is_valid
+
+
+@pytest.mark.skipif(SUITE is None, reason="JSON_SCHEMA_TEST_SUITE is not set")
+@pytest.mark.parametrize("json_schema, documents", suite_cases())
+def test_compiled_predicates_agree_with_validate_on_the_official_suite(json_schema, documents):
+    try:
+        schema = get_schema(json_schema)
+        is_valid = schema.compile_is_valid()
+    except Exception:
+        pytest.skip("schema not supported")
+    for document in documents:
+        expected = outcome(lambda each: schema.validate(each).is_valid, document)
+        assert outcome(is_valid, document) == expected
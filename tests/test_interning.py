@@ -0,0 +1,22 @@
+from classes import get_schema
+
+
+def test_identical_child_schemas_share_their_schema_object():
+    schema = get_schema({"properties": {"a": {"type": "array", "items": {"enum": [1]}},
+                                        "b": {"type": "array", "items": {"enum": [1]}}}})
+    assert schema.properties["a"] is schema.properties["b"]
+
+
+def test_child_schemas_with_equal_python_values_are_not_shared():
+    schema = get_schema({"properties": {"a": {"enum": [1]}, "b": {"enum": [True]}, "c": {"enum": [1.0]}}})
+    assert len({id(child) for child in schema.properties.values()}) == 3
+    assert schema.validate({"a": 1, "b": True, "c": 1.0}).is_valid
+    assert not schema.validate({"b": 1}).is_valid
+
+
+def test_child_schemas_that_only_differ_in_key_order_are_not_shared():
+    schema = get_schema({"properties": {"x": {"maxLength": 1, "minProperties": 1},
+                                        "y": {"minProperties": 1, "maxLength": 1}}})
+    assert schema.properties["x"] is not schema.properties["y"]
+    assert not schema.validate({"y": "ab"}).is_valid
+    assert schema.validate({"x": "a"}).is_valid
@@ -0,0 +1,45 @@
+import pytest
+
+from classes import get_schema
+from iterative import validate_iteratively
+from schema_cases import CASES, pointers
+
+DEPTH = 10000
+"""Nesting depth of the deep documents, far beyond python's recursion limit."""
+
+
+def nested(depth, leaf):
+    """
+    :return: `leaf` nested inside `depth` alternating objects and arrays.
+    """
+
+    document = leaf
+    for level in range(depth):
+        document = [document] if level % 2 else {"a": document}
+    return document
+
+
+@pytest.mark.parametrize("json_schema, documents", CASES)
+def test_iterative_validation_returns_the_same_responses(json_schema, documents):
+    schema = get_schema(json_schema)
+    for document in documents:
+        assert pointers(validate_iteratively(schema, document)) == pointers(schema.validate(document))
+
+
+def test_documents_nested_ten_thousand_levels_deep_are_validated():
+    node = {"type": ["object", "array", "integer"], "items": {"$ref": "#/definitions/node"},
+            "additionalProperties": {"$ref": "#/definitions/node"}}
+    schema = get_schema({"definitions": {"node": node}, "$ref": "#/definitions/node"})
+    assert validate_iteratively(schema, nested(DEPTH, 1)).is_valid
+    response = validate_iteratively(schema, nested(DEPTH, "x"))
+    assert not response.is_valid
+    assert len(response.document_pointer.nodes) == DEPTH
+
+
+def test_enum_const_and_unique_items_compare_deep_documents():
+    deep = nested(DEPTH, 1)
+    schema = get_schema({"type": "array", "items": {"enum": [nested(DEPTH, 1.0), 2], "const": deep},
+                         "uniqueItems": True})
+    assert validate_iteratively(schema, [deep]).is_valid
+    assert not validate_iteratively(schema, [nested(DEPTH, 2)]).is_valid
+    assert not validate_iteratively(schema, [deep, nested(DEPTH, 1)]).is_valid
@@ -0,0 +1,46 @@
+import pytest
+
+from classes import get_schema
+from optimizer import optimize_schema
+
+DOCUMENTS = [None, True, 0, 1, 1.5, "", "a", "abcd", [], [1], ["a", 1], [1, 1], {}, {"a": 1}, {"a": "x"},
+             {"a": "x", "b": 2}, {"b": "y"}]
+"""Documents of every type, validated against each schema before and after it's optimized."""
+
+REWRITES = [
+    ("collapse", {"anyOf": [{"type": "string"}]}),
+    ("collapse", {"oneOf": [{"properties": {"a": {"type": "integer"}}}]}),
+    ("remove_true", {"allOf": [{}, {"type": "object"}], "required": ["a"]}),
+    ("remove_true", {"properties": {"a": {"not": {"not": {}}}}, "dependencies": {"a": {}}}),
+    ("remove_true", {"anyOf": [{"type": "string"}, {}]}),
+    ("remove_true", {"type": "array", "items": {}, "additionalItems": {}}),
+    ("flatten", {"allOf": [{"allOf": [{"required": ["a"]}, {"required": ["b"]}]}, {"type": "object"}]}),
+    ("flatten", {"allOf": [{"allOf": [{"not": {"type": "null"}}, {"not": {"enum": [""]}}]}, {"minLength": 1}]}),
+    ("merge", {"type": "object", "allOf": [{"required": ["a"]}, {"properties": {"a": {"type": "string"}}}]}),
+    ("merge", {"allOf": [{"type": "array"}, {"minItems": 1, "uniqueItems": True}]}),
+    ("unsatisfiable", {"allOf": [{"type": "string"}, {"type": "integer"}]}),
+    ("unsatisfiable", {"type": "object", "properties": {"a": {"type": "string", "not": {}}}, "required": ["a"]}),
+    ("unsatisfiable", {"anyOf": [{"type": "string", "not": {}}, {"type": "integer", "not": {}}]}),
+]
+"""Schemas that each rewrite of the optimizer applies to."""
+
+
+@pytest.mark.parametrize("rewrite, json_schema", REWRITES)
+def test_rewrites_keep_every_verdict(rewrite, json_schema):
+    optimized, report = optimize_schema(json_schema)
+    assert rewrite in {each["rewrite"] for each in report}
+    original = get_schema(json_schema)
+    is_valid = get_schema(optimized).compile_is_valid()
+    for document in DOCUMENTS:
+        assert get_schema(optimized).validate(document).is_valid == original.validate(document).is_valid
+        assert is_valid(document) == original.validate(document).is_valid
+
+
+def test_referenced_subschemas_are_not_moved():
+    json_schema = {"definitions": {"s": {"allOf": [{"type": "string"}, {}]}},
+                   "properties": {"a": {"$ref": "#/definitions/s"}}, "allOf": [{"$ref": "#/definitions/s"}, {}]}
+    optimized, report = optimize_schema(json_schema)
+    assert optimized["properties"] == json_schema["properties"] and "s" in optimized["definitions"]
+    original = get_schema(json_schema)
+    for document in DOCUMENTS:
+        assert get_schema(optimized).validate(document).is_valid == original.validate(document).is_valid
@@ -0,0 +1,128 @@
+import ast
+import io
+import json
+import os
+import queue
+import time
+from concurrent.futures import Future
+
+import pytest
+
+import bowtie_jsch
+import classes
+from bowtie_jsch import LRUCache, Runner, build_validator, run_case, worker_pool
+from snapshot import build_snapshot
+
+CASES = [
+    dict(schema={"items": True}, tests=[dict(instance=[1])]),
+    dict(schema={"type": "integer"}, tests=[dict(instance=1), dict(instance="1")]),
+]
+"""The first case raises while its schema is built."""
+
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+"""Directory of the Dockerfile and of the validator modules."""
+
+
+def run_commands(commands, workers=0):
+    stdout = io.StringIO()
+    stdin = io.StringIO("".join(f"{json.dumps(command)}\n" for command in commands))
+    with pytest.raises(SystemExit):
+        Runner(_stdout=stdout, _workers=workers).run(stdin)
+    return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_errored_cases_are_reported_the_same_in_both_modes(workers):
+    commands = [dict(cmd="start", version=1)]
+    commands += [dict(cmd="run", seq=seq, case=case) for seq, case in enumerate(CASES)]
+    commands.append(dict(cmd="stop"))
+    responses = run_commands(commands, workers)
+    assert responses[1]["seq"] == 0 and responses[1]["errored"]
+    assert "Traceback" in responses[1]["context"]["traceback"]
+    assert responses[2] == dict(seq=1, results=[dict(valid=True), dict(valid=False)])
+
+
+def test_responses_that_cant_be_retrieved_are_written_as_errored():
+    stdout = io.StringIO()
+    runner = Runner(_stdout=stdout)
+    runner._pending = queue.Queue()
+    broken = Future()
+    broken.set_exception(RuntimeError("the pool broke"))
+    done = Future()
+    done.set_result(dict(seq=8, results=[]))
+    runner._pending.put((7, broken))
+    runner._pending.put((8, done))
+    runner._pending.put(None)
+    runner.write_responses()
+    responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert responses[0]["seq"] == 7 and responses[0]["errored"]
+    assert responses[1] == dict(seq=8, results=[])
+
+
+def test_resolution_time_is_only_counted_in_resolve_ns(tmp_path, monkeypatch):
+    referenced = tmp_path / "referenced.json"
+    referenced.write_text(json.dumps({"type": "integer"}))
+    load = json.load
+
+    def slow_load(data):
+        time.sleep(0.2)
+        return load(data)
+
+    monkeypatch.setattr(json, "load", slow_load)
+    case = dict(schema={"properties": {"a": {"$ref": str(referenced)}}}, tests=[dict(instance={"a": 1})])
+    timings = run_case(case, 0, LRUCache(8), timings=True)["timings"]
+    assert timings["resolve_ns"] >= 200_000_000
+    assert timings["compile_ns"] + sum(timings["validate_ns"]) < 200_000_000
+
+
+def test_learned_any_of_orders_are_saved_and_loaded(tmp_path, monkeypatch):
+    monkeypatch.setattr(bowtie_jsch, "ANY_OF_ORDERS_FILE", str(tmp_path / "orders.json"))
+    monkeypatch.setattr(bowtie_jsch, "_any_of_orders", None)
+    monkeypatch.setattr(classes, "ANY_OF_WARM_UP", 3)
+    schema = {"anyOf": [{"type": "string"}, {"type": "integer"}]}
+    case = dict(schema=schema, tests=[dict(instance=1)] * 3 + [dict(instance=None)])
+    commands = [dict(cmd="start", version=1), dict(cmd="run", seq=0, case=case), dict(cmd="stop")]
+    assert run_commands(commands)[1]["results"] == [dict(valid=True)] * 3 + [dict(valid=False)]
+
+    monkeypatch.setattr(bowtie_jsch, "_any_of_orders", None)
+    built, is_valid = build_validator(schema)
+    assert built.any_of_order.order == (1, 0)
+    assert is_valid("a") and is_valid(1) and not is_valid(None)
+
+
+def test_docker_image_copies_every_module_the_runner_imports():
+    with open(os.path.join(REPOSITORY, "Dockerfile")) as dockerfile:
+        copied = {line.split()[1][:-3] for line in dockerfile if line.startswith("COPY ") and ".py " in line}
+    local = {name[:-3] for name in os.listdir(REPOSITORY) if name.endswith(".py")}
+    for module in copied:
+        with open(os.path.join(REPOSITORY, f"{module}.py")) as source:
+            tree = ast.parse(source.read())
+        # Imports inside functions count too, since some modules are only imported once they're needed.
+        imported = {alias.name for node in ast.walk(tree) if isinstance(node, ast.Import) for alias in node.names}
+        imported |= {node.module for node in ast.walk(tree) if isinstance(node, ast.ImportFrom)}
+        assert imported & local <= copied, module
+
+
+def test_schemas_that_only_differ_in_key_order_are_cached_apart():
+    schemas = LRUCache(8)
+    first = dict(schema={"maxLength": 1, "minProperties": 1}, tests=[dict(instance="ab")])
+    second = dict(schema={"minProperties": 1, "maxLength": 1}, tests=[dict(instance="ab")])
+    assert run_case(first, 0, schemas)["results"] == [dict(valid=True)]
+    assert run_case(second, 1, schemas)["results"] == [dict(valid=False)]
+
+
+def remote_loader_urls():
+    """
+    :return: urls with a registered loader, in the process that runs it.
+    """
+
+    return sorted(classes.REMOTE_SCHEMA_LOADERS)
+
+
+def test_workers_register_the_snapshot_loaders(tmp_path, monkeypatch):
+    path = tmp_path / "metaschemas.pickle"
+    monkeypatch.setitem(classes.REMOTE_SCHEMAS, "http://example.com/schema", classes.get_schema({"type": "object"}))
+    build_snapshot(["http://example.com/schema#"], path)
+    with worker_pool(1, str(path)) as pool:
+        assert pool.submit(remote_loader_urls).result() == ["http://example.com/schema"]
@@ -0,0 +1,48 @@
+import pickle
+
+import pytest
+
+import classes
+from classes import get_schema, get_schema_from_url, register_remote_loaders
+from snapshot import build_snapshot, load_schema, load_snapshot
+
+URL = "http://example.com/schema#"
+
+
+@pytest.fixture(autouse=True)
+def remote_schemas(monkeypatch):
+    monkeypatch.setattr(classes, "REMOTE_SCHEMAS", {})
+    monkeypatch.setattr(classes, "REMOTE_SCHEMA_LOADERS", {})
+
+
+def test_metaschemas_are_only_loaded_once_they_are_looked_up(tmp_path):
+    path = tmp_path / "metaschemas.pickle"
+    classes.REMOTE_SCHEMAS["http://example.com/schema"] = get_schema({"type": "object", "required": ["a"]})
+    build_snapshot([URL], path)
+    classes.REMOTE_SCHEMAS.clear()
+
+    register_remote_loaders(load_snapshot(path))
+    assert classes.REMOTE_SCHEMAS == {}
+    schema = get_schema_from_url(URL)
+    assert classes.REMOTE_SCHEMAS == {"http://example.com/schema": schema}
+    assert schema.validate({"a": 1}).is_valid and not schema.validate({}).is_valid
+
+
+@pytest.mark.parametrize("content", [b"", b"not a pickle", pickle.dumps([URL])])
+def test_unusable_snapshots_are_ignored(tmp_path, content):
+    path = tmp_path / "metaschemas.pickle"
+    path.write_bytes(content)
+    assert load_snapshot(path) == {}
+
+
+def test_schemas_that_cant_be_loaded_are_built_again(tmp_path):
+    assert load_schema(pickle.dumps(get_schema({}))[:-1]) is None
+    # A snapshot in the older format stores the Schema objects themselves instead of their bytes.
+    assert load_schema(get_schema({})) is None
+
+
+def test_the_true_schema_is_unpickled_as_the_singleton():
+    schema = pickle.loads(pickle.dumps(get_schema({"properties": {"a": {}}})))
+    assert schema.properties["a"] is classes.TRUE_SCHEMA
+    assert schema.additionalProperties is classes.TRUE_SCHEMA
+    assert pickle.loads(pickle.dumps(classes.TRUE_SCHEMA)) is classes.TRUE_SCHEMA
@@ -0,0 +1,86 @@
+import io
+import json
+
+import pytest
+
+from classes import get_schema
+from utils import JSONPointer
+from schema_cases import CASES, pointers
+from streaming import validate_bytes, validate_file, validate_stream
+
+DEPTH = 10000
+"""Nesting depth of the deep documents, far beyond python's recursion limit."""
+
+
+def nested(depth, leaf):
+    """
+    :return: `leaf` nested inside `depth` alternating objects and arrays.
+    """
+
+    document = leaf
+    for level in range(depth):
+        document = [document] if level % 2 else {"a": document}
+    return document
+
+
+def nested_json(depth, leaf):
+    """
+    :return: JSON text of `nested(depth, leaf)`, which `json.dumps` can't serialize that deep.
+    """
+
+    opening = "".join("[" if level % 2 else '{"a":' for level in reversed(range(depth)))
+    closing = "".join("]" if level % 2 else "}" for level in range(depth))
+    return f"{opening}{json.dumps(leaf)}{closing}"
+
+
+@pytest.mark.parametrize("json_schema, documents", CASES)
+def test_stream_validation_returns_the_same_responses(json_schema, documents):
+    schema = get_schema(json_schema)
+    for document in documents:
+        expected = schema.validate(document)
+        response = validate_stream(schema, io.BytesIO(json.dumps(document).encode("utf-8")), 3)
+        assert pointers(response) == pointers(expected)
+        if not expected.is_valid:
+            assert response.document_pointer.get_json() == \
+                JSONPointer(document, expected.document_pointer.nodes).get_json()
+
+
+@pytest.mark.parametrize("json_schema, documents", CASES)
+def test_single_pass_validation_returns_the_same_verdicts(json_schema, documents):
+    schema = get_schema(json_schema)
+    for document in documents:
+        expected = schema.validate(document)
+        response = schema.validate_bytes(json.dumps(document).encode("utf-8"))
+        assert response.is_valid == expected.is_valid
+        if not response.is_valid:
+            assert response.document_pointer.document == document
+            response.document_pointer.get_json()
+
+
+def test_validate_file_points_to_the_loaded_document(tmp_path):
+    path = tmp_path / "document.json"
+    path.write_text(json.dumps({"a": [1, "x"]}))
+    schema = get_schema({"properties": {"a": {"items": {"type": "integer"}}}})
+    response = validate_file(schema, str(path))
+    assert pointers(response) == (["a", 1], ["properties", "a", "items", "type"])
+    assert response.document_pointer.get_json() == "x"
+
+
+def test_enum_const_and_unique_items_compare_deep_documents():
+    deep = nested_json(DEPTH, 1)
+    schema = get_schema({"type": "array", "items": {"enum": [nested(DEPTH, 1.0), 2], "const": nested(DEPTH, 1)},
+                         "uniqueItems": True})
+    assert validate_bytes(schema, f"[{deep}]".encode("utf-8")).is_valid
+    assert not validate_bytes(schema, f"[{nested_json(DEPTH, 2)}]".encode("utf-8")).is_valid
+    response = validate_stream(schema, io.StringIO(f"[{deep},{deep}]"))
+    assert response.schema_pointer.nodes == ["uniqueItems", 0]
+
+
+def test_enum_and_const_compare_containers_regardless_of_key_order():
+    schema = get_schema({"items": {"enum": [{"a": 1, "b": [1.0, {"c": None}]}], "const": {"b": [1, {"c": None}],
+                                                                                            "a": 1.0}}})
+    assert validate_stream(schema, io.StringIO('[{"b": [1, {"c": null}], "a": 1}]')).is_valid
+    response = validate_stream(schema, io.StringIO('[{"b": [1, {"c": false}], "a": 1}]'))
+    assert pointers(response) == ([0], ["items", "enum"])
+    response = validate_stream(schema, io.StringIO('[{"b": [true, {"c": null}], "a": 1}]'))
+    assert pointers(response) == ([0], ["items", "enum"])
@@ -1,13 +1,32 @@
 import re
 import json
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from urllib.parse import urlparse
-from urllib.request import urlopen
 
 VALID_SCHEMES = ["http", "https", "ftp"]
 """List that contains the valid url schemes that a $ref keyword can have. """
 
 NONE = -1
 
+TYPE_TAGS = {dict: "object", list: "array", str: "string", int: "integer", bool: "boolean", type(None): "null"}
+"""Type tag of the documents of each python type whose tag depends only on the type. Floats are tagged by `type_tag`,
+since the ones with no fractional part are integers."""
+
+FINGERPRINT_NESTING = 64
+"""Nesting depth from which `fingerprint` builds digests instead of nested tuples, which python compares
+recursively."""
+
+OBJECT_DIGEST_MASK = (1 << 128) - 1
+"""Object digests are sums of 128 bit entry hashes, modulo 2 ** 128."""
+
+JSON_TYPES = {"object": ("object",), "array": ("array",), "string": ("string",), "integer": ("integer",),
+              "number": ("integer", "number"), "boolean": ("boolean",), "null": ("null",)}
+"""Type tags of the documents each schema type accepts."""
+
 
 class JSONPointer:
     """
@@ -104,11 +123,30 @@ class JSONPointer:
         return False
 
 
+class DocumentLoader:
+    """
+    Document of a response that is only loaded once its document pointer is read, for documents that were validated
+    without being loaded.
+    """
+
+    __slots__ = ("load",)
+
+    def __init__(self, load):
+        """
+        :param load: function without arguments that returns the document.
+        """
+
+        self.load = load
+
+
 class Response:
     """
     Response object that is return when validating a document against a schema object.
     """
 
+    __slots__ = ("is_valid", "_document_pointer", "_schema_pointer", "_document", "_schema", "_document_nodes",
+                 "_schema_nodes")
+
     def __init__(self, is_valid, document_pointer, schema_pointer):
         """
         :param is_valid: boolean that is True if the document was valid against a schema.
@@ -116,9 +154,67 @@ class Response:
         :param schema_pointer: JSONPointer pointing to the schema that was not satisfied.
         """
 
-        self.document_pointer = document_pointer
-        self.schema_pointer = schema_pointer
+        self._document_pointer = document_pointer
+        self._schema_pointer = schema_pointer
         self.is_valid = is_valid
+        self._document = None
+        self._schema = None
+        self._document_nodes = None
+        """List of node lists that make up the document pointer, from the innermost to the outermost, until the
+        pointer is built."""
+
+        self._schema_nodes = None
+        """List of node lists that make up the schema pointer, from the innermost to the outermost, until the pointer
+        is built."""
+
+    @staticmethod
+    def invalid(document, document_nodes, schema, schema_nodes):
+        """
+        Builds an invalid response whose JSONPointers are only built when they are read.
+        :param document: document that failed.
+        :param document_nodes: nodes of the document pointer.
+        :param schema: the whole schema that was not satisfied.
+        :param schema_nodes: nodes of the schema pointer.
+        :return: Response object.
+        """
+
+        response = Response(False, None, None)
+        response._document = document
+        response._schema = schema
+        response._document_nodes = [document_nodes]
+        response._schema_nodes = [schema_nodes]
+        return response
+
+    @property
+    def document_pointer(self):
+        if self._document_nodes is not None:
+            document = self._document
+            if type(document) is DocumentLoader:
+                document = document.load()
+            self._document_pointer = JSONPointer(document, join_upward_nodes(self._document_nodes))
+            self._document_nodes = None
+            self._document = None
+        return self._document_pointer
+
+    @document_pointer.setter
+    def document_pointer(self, document_pointer):
+        self._document_pointer = document_pointer
+        self._document_nodes = None
+        self._document = None
+
+    @property
+    def schema_pointer(self):
+        if self._schema_nodes is not None:
+            self._schema_pointer = JSONPointer(self._schema, join_upward_nodes(self._schema_nodes))
+            self._schema_nodes = None
+            self._schema = None
+        return self._schema_pointer
+
+    @schema_pointer.setter
+    def schema_pointer(self, schema_pointer):
+        self._schema_pointer = schema_pointer
+        self._schema_nodes = None
+        self._schema = None
 
     def add_upward_document_and_schema_nodes(self, document_nodes, schema_nodes):
         """
@@ -127,25 +223,64 @@ class Response:
         :param schema_nodes: Upward nodes to insert in `self.schema_pointer`.
         """
 
-        self.document_pointer.add_upward_nodes(document_nodes)
-        self.schema_pointer.add_upward_nodes(schema_nodes)
+        if self._document_nodes is not None:
+            self._document_nodes.append(document_nodes)
+        else:
+            self._document_pointer.add_upward_nodes(document_nodes)
+        if self._schema_nodes is not None:
+            self._schema_nodes.append(schema_nodes)
+        else:
+            self._schema_pointer.add_upward_nodes(schema_nodes)
 
     def set_document(self, document):
         """
         Sets the document that `self.document_pointer` points to.
         """
 
-        self.document_pointer.document = document
+        if self._document_nodes is not None:
+            self._document = document
+        else:
+            self._document_pointer.document = document
+
+    def set_document_loader(self, load):
+        """
+        Sets the document that `self.document_pointer` points to, loading it only if the pointer is read.
+        :param load: function without arguments that returns the document.
+        """
+
+        if self._document_nodes is not None:
+            self._document = DocumentLoader(load)
+        else:
+            self._document_pointer.document = load()
+
+    def copy(self):
+        """
+        Copies this response, so nodes can be added to the copy without changing this one.
+        :return: Response object.
+        """
+
+        if self.is_valid:
+            return self
+        response = Response(False, self._document_pointer, self._schema_pointer)
+        if self._document_nodes is not None:
+            response._document = self._document
+            response._document_nodes = list(self._document_nodes)
+        else:
+            response._document_pointer = JSONPointer(self._document_pointer.document,
+                                                     list(self._document_pointer.nodes))
+        if self._schema_nodes is not None:
+            response._schema = self._schema
+            response._schema_nodes = list(self._schema_nodes)
+        else:
+            response._schema_pointer = JSONPointer(self._schema_pointer.document, list(self._schema_pointer.nodes))
+        return response
 
     def set_true(self):
         """
-        Sets this response to True.
+        Returns the valid response. This response is left untouched.
         """
 
-        self.is_valid = True
-        self.document_pointer = None
-        self.schema_pointer = None
-        return self
+        return VALID
 
     def __repr__(self):
         if self.is_valid:
@@ -158,6 +293,23 @@ class Response:
         return self.is_valid
 
 
+VALID = Response(True, None, None)
+"""Response shared by every successful validation. It must never be modified."""
+
+
+def join_upward_nodes(upward_nodes):
+    """
+    Joins node lists that were added from the innermost to the outermost into a single list of nodes.
+    :param upward_nodes: list of node lists.
+    :return: list of nodes.
+    """
+
+    nodes = []
+    for i in range(len(upward_nodes) - 1, -1, -1):
+        nodes.extend(upward_nodes[i])
+    return nodes
+
+
 def has_key(dictionary, key):
     """
     :param dictionary: Dict.
@@ -175,11 +327,263 @@ def check_pattern(pattern, string):
     :return:True if the string matches the patter.
     """
 
-    p = re.compile(pattern)
-    for index in range(0, len(string)):
-        if p.match(string, index):
-            return True
-    return False
+    return search_pattern(re.compile(pattern), string)
+
+
+def search_pattern(compiled_pattern, string):
+    """
+    Same as `check_pattern`, with an already compiled pattern. The pattern may match anywhere in the string, but
+    the match must start before its end, so the empty string never matches.
+    :param compiled_pattern: compiled regular expression.
+    :param string: Any string.
+    :return: True if the string matches the pattern.
+    """
+
+    match = compiled_pattern.search(string)
+    return match is not None and match.start() < len(string)
+
+
+class PatternMatcher:
+    """
+    Finds the first of several regular expressions that matches a string, as `check_pattern` does with each of them.
+    Patterns are compiled once into a single expression that has a lookahead alternative per pattern, tried in order,
+    so one search finds the first pattern that matches. Patterns that can't be combined (because they have groups or
+    global flags) are matched one by one instead.
+    """
+
+    __slots__ = ("patterns", "compiled", "combined")
+
+    def __init__(self, patterns):
+        """
+        :param patterns: iterable of regular expressions.
+        """
+
+        self.patterns = list(patterns)
+        self.compiled = [re.compile(pattern) for pattern in self.patterns]
+        self.combined = None
+        """Combined expression, or None if the patterns are matched one by one."""
+
+        if self.patterns and all(compiled.groups == 0 and compiled.flags == re.UNICODE for compiled in self.compiled):
+            try:
+                self.combined = re.compile("|".join(rf"(?=[\s\S]*?(?=[\s\S])(?:{pattern}))()"
+                                                    for pattern in self.patterns))
+            except re.error:
+                self.combined = None
+
+    def first_match(self, string):
+        """
+        :param string: Any string.
+        :return: the first pattern that matches the string, or None if none of them does.
+        """
+
+        if self.combined is not None:
+            match = self.combined.match(string)
+            return self.patterns[match.lastindex - 1] if match is not None else None
+        if string:
+            for pattern, compiled in zip(self.patterns, self.compiled):
+                if search_pattern(compiled, string):
+                    return pattern
+        return None
+
+    def matches_any(self, string):
+        """
+        :param string: Any string.
+        :return: True if at least one pattern matches the string.
+        """
+
+        return self.first_match(string) is not None
+
+
+class BranchIndex:
+    """
+    Index of the branches of an anyOf or oneOf, built from cheap conditions each branch needs a document to meet to be
+    valid against it: its type, the keys it requires and the values some of its keys may have. It finds the branches
+    a document may be valid against, so the rest don't need to be validated. The values of a single key are indexed,
+    the one that most branches constrain (the discriminator of a tagged union).
+    """
+
+    __slots__ = ("size", "by_type", "untyped", "key", "by_value", "other_value", "key_absent", "required")
+
+    def __init__(self, conditions):
+        """
+        :param conditions: list with a dict for each branch with its `type` (a schema type or None if it accepts any),
+        its `required` keys and its `values`: a dict with the list of values some keys may have, by key.
+        """
+
+        self.size = len(conditions)
+        accepted_types = [JSON_TYPES[condition["type"]] if condition["type"] else None for condition in conditions]
+        self.untyped = tuple(i for i, types in enumerate(accepted_types) if types is None)
+        self.by_type = {}
+        """Indexes of the branches that accept each type tag."""
+
+        for tag in JSON_TYPES:
+            self.by_type[tag] = tuple(i for i, accepted in enumerate(accepted_types)
+                                      if accepted is None or tag in accepted)
+        objects = self.by_type["object"]
+        constrained = {}
+        for i in objects:
+            for key in conditions[i]["values"]:
+                constrained[key] = constrained.get(key, 0) + 1
+        self.key = None
+        if constrained and max(constrained.values()) > 1:
+            self.key = max(constrained, key=constrained.get)
+            allowed = {i: frozenset(typed_fingerprint(value) for value in conditions[i]["values"][self.key])
+                       for i in objects if self.key in conditions[i]["values"]}
+            self.by_value = {value: tuple(i for i in objects if i not in allowed or value in allowed[i])
+                             for value in frozenset().union(*allowed.values())}
+            self.other_value = tuple(i for i in objects if i not in allowed)
+            self.key_absent = tuple(i for i in objects if self.key not in conditions[i]["required"])
+        self.required = [tuple(condition["required"]) for condition in conditions]
+
+    def is_useful(self):
+        """
+        :return: True if there are documents for which some branch can be skipped.
+        """
+
+        return len(self.untyped) < self.size or self.key is not None or any(self.required)
+
+    def candidates(self, document, tag=None):
+        """
+        :param document: document about to be validated against the branches.
+        :param tag: type tag of the document, if it's already known.
+        :return: indexes of the branches the document may be valid against, in increasing order.
+        """
+
+        if tag is None:
+            tag = type_tag(document)
+        if tag != "object":
+            return self.by_type.get(tag, self.untyped)
+        if self.key is None:
+            indexes = self.by_type["object"]
+        elif self.key in document:
+            indexes = self.by_value.get(typed_fingerprint(document[self.key]), self.other_value)
+        else:
+            indexes = self.key_absent
+        return [i for i in indexes if has_all_keys(document, self.required[i])]
+
+
+class BranchOrder:
+    """
+    Order in which the branches of an anyOf are tried. A document is valid against an anyOf as soon as it's valid
+    against one branch, so the order doesn't change results, only how fast a valid branch is found. It counts the
+    branch each valid document matched, and after `warm_up` of them (and then every `period`) it puts the branches
+    that matched the most first. Once frozen it doesn't count nor change anymore.
+    """
+
+    __slots__ = ("order", "ranks", "successes", "seen", "next_reorder", "period", "frozen")
+
+    def __init__(self, size, warm_up, period):
+        """
+        :param size: number of branches.
+        :param warm_up: number of valid documents counted before the first reordering.
+        :param period: number of valid documents counted between later reorderings.
+        """
+
+        self.order = tuple(range(0, size))
+        """Indexes of the branches, in the order they are tried."""
+
+        self.ranks = list(range(0, size))
+        """Position of each branch inside `self.order`."""
+
+        self.successes = [0] * size
+        self.seen = 0
+        self.next_reorder = warm_up
+        self.period = period
+        self.frozen = False
+
+    def arrange(self, indexes):
+        """
+        :param indexes: indexes of some branches, in increasing order.
+        :return: the same indexes, in the order they must be tried.
+        """
+
+        if len(indexes) < 2:
+            return indexes
+        return sorted(indexes, key=self.ranks.__getitem__)
+
+    def record(self, index):
+        """
+        Counts a document that was valid against a branch, reordering the branches if it's time to.
+        :param index: index of the branch.
+        """
+
+        if self.frozen:
+            return
+        self.successes[index] += 1
+        self.seen += 1
+        if self.seen >= self.next_reorder:
+            self.next_reorder += self.period
+            self.set_order(sorted(range(0, len(self.successes)), key=lambda i: -self.successes[i]))
+
+    def set_order(self, order):
+        """
+        :param order: list with the index of every branch, in the order they must be tried.
+        """
+
+        self.order = tuple(order)
+        for rank, index in enumerate(self.order):
+            self.ranks[index] = rank
+
+    def freeze(self):
+        """
+        Keeps the current order from now on.
+        """
+
+        self.frozen = True
+
+    def export(self):
+        """
+        :return: dict with the current order and how many documents matched each branch.
+        """
+
+        return dict(order=list(self.order), successes=list(self.successes))
+
+
+class KeyClassifier:
+    """
+    Classifies the keys of documents according to the properties, required and patternProperties keywords of an
+    object schema. When there are patterns, the classification of the most recently seen keys is remembered, since
+    documents tend to repeat the same keys.
+    """
+
+    __slots__ = ("declared", "matcher", "memo")
+
+    def __init__(self, declared, patterns, memo_size):
+        """
+        :param declared: keys that are never additional properties (the properties and required keys).
+        :param patterns: regular expressions of the patternProperties keyword.
+        :param memo_size: maximum number of keys whose classification is remembered.
+        """
+
+        self.declared = frozenset(declared)
+        self.matcher = PatternMatcher(patterns)
+        self.memo = LRUCache(memo_size) if self.matcher.patterns else None
+        """LRUCache with the classification of each key, or None if there are no patterns to match."""
+
+    def classify(self, key):
+        """
+        :param key: key of a document.
+        :return: tuple with the first pattern that matches the key (None if none does) and whether the key is an
+        additional property.
+        """
+
+        if self.memo is None:
+            return None, key not in self.declared
+        classification = self.memo.get(key)
+        if classification is None:
+            pattern = self.matcher.first_match(key)
+            classification = (pattern, pattern is None and key not in self.declared)
+            self.memo.put(key, classification)
+        return classification
+
+    def stats(self):
+        """
+        :return: dict with the stats of the memo, or None if there's no memo.
+        """
+
+        if self.memo is None:
+            return None
+        return self.memo.stats()
 
 
 def get_size_of_smaller(list1, list2):
@@ -209,17 +613,209 @@ def has_all_keys(document, list_of_keys):
     return True
 
 
+def lookup_type(table, document):
+    """
+    Gets the value a table holds for the python type of a document, or for the nearest of its base classes.
+    :param table: dict keyed by python types.
+    :param document: document whose type is looked up.
+    :return: the value, or None if the table holds none for the document's type.
+    """
+
+    value = table.get(type(document))
+    if value is None:
+        for cls in type(document).__mro__[1:]:
+            value = table.get(cls)
+            if value is not None:
+                break
+    return value
+
+
+def type_tag(value):
+    """
+    Classifies a document by its json type. Booleans are never integers nor numbers, and floats with no fractional
+    part are integers. Hot loops look the type up in `TYPE_TAGS` first and only call this when it isn't there.
+    :param value: document.
+    :return: one of the `JSON_TYPES` keys, or None if the document isn't a json value.
+    """
+
+    tag = TYPE_TAGS.get(type(value))
+    if tag is not None:
+        return tag
+    if isinstance(value, float):
+        return "integer" if value.is_integer() else "number"
+    return lookup_type(TYPE_TAGS, value)
+
+
+def fingerprint(value):
+    """
+    Builds a hashable value that is equal for two JSON values only if they are equal as JSON values. Object keys
+    order doesn't matter, numbers are compared by value (1 and 1.0 are equal) and booleans are never equal to numbers.
+    Containers are nested tuples and frozensets built without recursion, unless they are nested deeper than
+    `FINGERPRINT_NESTING`, since python compares (and hashes) those recursively: deeper values get a digest instead.
+    :param value: JSON value.
+    :return: hashable object.
+    """
+
+    if isinstance(value, bool):
+        return "boolean", value
+    if not isinstance(value, (dict, list)):
+        return value
+    # Each entry holds a container being fingerprinted, an iterator of its items and the fingerprints of the items
+    # already done. The key of an object item whose fingerprint is being built waits at the end of that list.
+    stack = [(value, iter(value.items()) if isinstance(value, dict) else iter(value), [])]
+    while True:
+        container, items, parts = stack[-1]
+        is_object = isinstance(container, dict)
+        for item in items:
+            if is_object:
+                key, item = item
+            if isinstance(item, (dict, list)):
+                if len(stack) == FINGERPRINT_NESTING:
+                    return deep_fingerprint(value)
+                if is_object:
+                    parts.append(key)
+                stack.append((item, iter(item.items()) if isinstance(item, dict) else iter(item), []))
+                break
+            item_fingerprint = ("boolean", item) if isinstance(item, bool) else item
+            parts.append((key, item_fingerprint) if is_object else item_fingerprint)
+        else:
+            stack.pop()
+            container_fingerprint = ("object", frozenset(parts)) if is_object else ("array", tuple(parts))
+            if not stack:
+                return container_fingerprint
+            parent, _, parent_parts = stack[-1]
+            if isinstance(parent, dict):
+                parent_parts.append((parent_parts.pop(), container_fingerprint))
+            else:
+                parent_parts.append(container_fingerprint)
+
+
+def deep_fingerprint(value):
+    """
+    Fingerprint of a container by its digest, which `fingerprint` uses for containers nested deeper than
+    `FINGERPRINT_NESTING`. Digests are built bottom-up without recursion with `ContainerDigest`, from the digests of the
+    inner containers.
+    :param value: list or dict.
+    :return: tuple with the container type and its digest.
+    """
+
+    fingerprints = {}
+    stack = [value]
+    while stack:
+        container = stack[-1]
+        items = container.values() if isinstance(container, dict) else container
+        pending = [item for item in items if isinstance(item, (dict, list)) and id(item) not in fingerprints]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        if id(container) in fingerprints:
+            continue
+        digest = ContainerDigest(isinstance(container, dict))
+        if digest.is_object:
+            for key, item in container.items():
+                digest.add(fingerprints[id(item)][1] if isinstance(item, (dict, list)) else scalar_encoding(item), key)
+        else:
+            for item in container:
+                digest.add(fingerprints[id(item)][1] if isinstance(item, (dict, list)) else scalar_encoding(item))
+        fingerprints[id(container)] = digest.fingerprint()
+    return fingerprints[id(value)]
+
+
+def scalar_encoding(value):
+    """
+    Serializes a scalar for `ContainerDigest`, so that scalars equal as JSON values are serialized the same way.
+    :param value: JSON scalar.
+    :return: string.
+    """
+
+    if isinstance(value, (bool, str)) or value is None:
+        return json.dumps(value)
+    if isinstance(value, float) and value.is_integer():
+        return repr(int(value))
+    return repr(value)
+
+
+class ContainerDigest:
+    """
+    Digest of a list or dict, built item by item, so the items don't need to be kept. The items of an array are
+    hashed in order. Each entry of an object is hashed on its own and the hashes are added up, so their order doesn't
+    matter.
+    """
+
+    __slots__ = ("is_object", "state")
+
+    def __init__(self, is_object):
+        """
+        :param is_object: True for a dict, False for a list.
+        """
+
+        self.is_object = is_object
+        self.state = 0 if is_object else hashlib.blake2b(digest_size=16)
+        """Sum of the entry hashes of an object, or the hash of the items of an array so far."""
+
+    def add(self, encoding, key=None):
+        """
+        Adds an item to the digest.
+        :param encoding: `scalar_encoding` of the item, or the digest of its fingerprint if it's a container.
+        :param key: key of the item, if the container is an object.
+        """
+
+        if self.is_object:
+            entry = hashlib.blake2b(f"{json.dumps(key)}:{encoding}".encode("utf-8"), digest_size=16).digest()
+            self.state = (self.state + int.from_bytes(entry, "big")) & OBJECT_DIGEST_MASK
+        else:
+            self.state.update(f"{encoding},".encode("utf-8"))
+
+    def fingerprint(self):
+        """
+        :return: fingerprint of the container: a tuple with its type and digest. Digests start with "#", so they are
+        never mistaken for the encoding of a scalar.
+        """
+
+        if self.is_object:
+            return "object", f"#{{{self.state:032x}"
+        return "array", f"#[{self.state.hexdigest()}"
+
+
+def typed_digest(value):
+    """
+    Same as `typed_fingerprint`, except that containers are always fingerprinted by their digest, as the streaming
+    validator fingerprints the containers it doesn't build.
+    :param value: JSON value.
+    :return: hashable object.
+    """
+
+    if isinstance(value, (dict, list)):
+        return type(value), deep_fingerprint(value)
+    return typed_fingerprint(value)
+
+
+def typed_fingerprint(value):
+    """
+    Fingerprint used to compare documents with enum and const values. Besides being equal as JSON values, both values
+    must have the same python type, so 1 and 1.0 are different.
+    :param value: JSON value.
+    :return: hashable object.
+    """
+
+    return type(value), fingerprint(value)
+
+
 def find_repeated_item(a_list):
     """
-    Returns the index of the first repeated item in a list. If there's none returns -1.
+    Returns the index of the first item of a list that is repeated somewhere in it. If there's none returns -1.
     :param a_list: list object.
     :return: int.
     """
 
-    for item in a_list:
-        if a_list.count(item) > 1:
-            return a_list.index(item)
-    return -1
+    first_indexes = {}
+    repeated_index = -1
+    for index, item in enumerate(a_list):
+        first_index = first_indexes.setdefault(fingerprint(item), index)
+        if first_index != index and (repeated_index == -1 or first_index < repeated_index):
+            repeated_index = first_index
+    return repeated_index
 
 
 def list_has_repetition(a_list):
@@ -229,9 +825,12 @@ def list_has_repetition(a_list):
     :return: bool.
     """
 
+    seen = set()
     for item in a_list:
-        if a_list.count(item) > 1:
+        item_fingerprint = fingerprint(item)
+        if item_fingerprint in seen:
             return True
+        seen.add(item_fingerprint)
     return False
 
 
@@ -260,13 +859,206 @@ def __is_valid_scheme(scheme):
     return False
 
 
+def canonical_json(value):
+    """
+    Serializes a json value so that equal values always produce the same string. Keys are kept in their order, since
+    the class of a schema depends on its first type specific keyword (see `infer_type`).
+    :param value: json value.
+    :return: string.
+    """
+
+    return json.dumps(value, separators=(",", ":"))
+
+
+def schema_hash(json_schema):
+    """
+    Content hash of a json schema, stable across runs and processes.
+    :param json_schema: json value representing a schema.
+    :return: hexadecimal string.
+    """
+
+    return hashlib.sha256(canonical_json(json_schema).encode("utf-8")).hexdigest()
+
+
+def structural_key(value, memo):
+    """
+    Key of a json value such that equal json values with their keys in the same order, and only them, have equal keys.
+    Key order matters since the class of a schema depends on its first type specific keyword (see `infer_type`), so
+    schemas that only differ in it can't be shared. It's computed bottom-up: the key of a container is a number given
+    to the tuple of the keys of its items, which is quick to hash since its items are numbers or scalars. The number of
+    every container is kept in `memo`, so finding the key of every sub value of a json value takes linear time overall.
+    :param value: json value.
+    :param memo: dict with the number of every container seen so far, by id together with the container, and the
+    number given to each tuple of item keys.
+    :return: hashable value.
+    """
+
+    if not isinstance(value, (dict, list)):
+        return type(value), value
+    stack = [value]
+    while stack:
+        container = stack[-1]
+        items = container.values() if isinstance(container, dict) else container
+        pending = [item for item in items if isinstance(item, (dict, list)) and not has_key_of(item, memo)]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        if has_key_of(container, memo):
+            continue
+        if isinstance(container, dict):
+            structure = (dict,) + tuple((key, item_key(item, memo)) for key, item in container.items())
+        else:
+            structure = (list,) + tuple(item_key(item, memo) for item in container)
+        # Containers are kept together with their number, and compared when they are looked up, since a memo that was
+        # pickled holds the ids the containers had in another process.
+        memo[id(container)] = (memo.setdefault(structure, len(memo)), container)
+    return memo[id(value)][0]
+
+
+def has_key_of(container, memo):
+    """
+    :return: True if `memo` holds the number of that same container.
+    """
+
+    entry = memo.get(id(container))
+    return entry is not None and entry[1] is container
+
+
+def item_key(item, memo):
+    """
+    :return: the number of a container that is already in `memo`, or the key of a scalar.
+    """
+
+    if isinstance(item, (dict, list)):
+        return memo[id(item)][0]
+    return type(item), item
+
+
+class LRUCache:
+    """
+    Bounded mapping that evicts its least recently used entry when it grows past `max_size`.
+    """
+
+    def __init__(self, max_size):
+        """
+        :param max_size: maximum number of entries kept in the cache.
+        """
+
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """
+        Retrieves the value stored under `key` and marks it as the most recently used.
+        :param key: Cache key.
+        :param default: Value returned if the key is not cached.
+        :return: Cached value or `default`.
+        """
+
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        """
+        Stores a value, evicting the least recently used entries if the cache is full.
+        :param key: Cache key.
+        :param value: Value to store.
+        """
+
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_build(self, key, build):
+        """
+        Retrieves the value stored under `key`, building and storing it with `build()` on a miss.
+        :param key: Cache key.
+        :param build: Function without arguments that returns the value to cache.
+        :return: Cached value.
+        """
+
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        value = build()
+        self.put(key, value)
+        return value
+
+    def stats(self):
+        """
+        :return: dict with the size of the cache and its hit, miss and eviction counters.
+        """
+
+        return dict(size=len(self.entries), max_size=self.max_size, hits=self.hits, misses=self.misses,
+                    evictions=self.evictions)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+
+class Stopwatch(threading.local):
+    """
+    Accumulates the time spent inside its `measure()` blocks. Each thread has its own accumulated time, so time
+    measured by one thread is never attributed to what another one is timing.
+    """
+
+    def __init__(self):
+        self.elapsed_ns = 0
+
+    @contextmanager
+    def measure(self):
+        """
+        Context manager that adds the time spent inside it to `self.elapsed_ns`.
+        """
+
+        start = time.monotonic_ns()
+        try:
+            yield
+        finally:
+            self.elapsed_ns += time.monotonic_ns() - start
+
+    def reset(self):
+        """
+        Sets the accumulated time back to 0.
+        :return: the time accumulated before the reset, in nanoseconds.
+        """
+
+        elapsed_ns = self.elapsed_ns
+        self.elapsed_ns = 0
+        return elapsed_ns
+
+
+RESOLUTION_STOPWATCH = Stopwatch()
+"""Time spent loading documents pointed by a `$ref` to a file or an url."""
+
+
 def get_json_from_file(path):
-    with open(path, encoding='utf-8') as data:
-        return json.load(data)
+    with RESOLUTION_STOPWATCH.measure():
+        with open(path, encoding='utf-8') as data:
+            return json.load(data)
 
 
 def get_json_from_url(url):
-    f = urlopen(url)
-    json_string = f.read().decode("utf-8").replace("\n", "").replace("\t", "")
-    return json.loads(json_string)
+    # urllib.request pulls in the whole http stack, so it's only imported once a remote document is needed.
+    from urllib.request import urlopen
+
+    with RESOLUTION_STOPWATCH.measure():
+        f = urlopen(url)
+        json_string = f.read().decode("utf-8").replace("\n", "").replace("\t", "")
+        return json.loads(json_string)
 